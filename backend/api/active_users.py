@@ -0,0 +1,106 @@
+"""
+Heartbeat-based presence ("X lidí právě čte") with a per-content-type leaderboard.
+
+Every page keeps a sorted set ``presence:<type>:<id>`` of visitor ids scored
+by their last heartbeat. Members older than ``PRESENCE_TTL`` are trimmed
+whenever the set is touched or read, so a closed browser that never sent its
+"leave" simply drops out and the counts correct themselves. The current count
+is mirrored into ``active_users_rank:<type>`` by the same Lua script, so the
+"top most read" query stays a single ``ZREVRANGE``.
+"""
+import hashlib
+import re
+import time
+
+from .redis_client import get_redis
+
+PRESENCE_TTL = 90  # s – frontend posílá heartbeat každých 30 s
+PRESENCE_KEY = 'presence:{content_type}:{content_id}'
+RANK_KEY = 'active_users_rank:{content_type}'
+
+VISITOR_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+# KEYS: presence, rank; ARGV: now, ttl, content_id, action (touch/leave/count), visitor_id
+PRESENCE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+if ARGV[4] == 'touch' then
+    redis.call('ZADD', KEYS[1], now, ARGV[5])
+elseif ARGV[4] == 'leave' then
+    redis.call('ZREM', KEYS[1], ARGV[5])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+local count = redis.call('ZCARD', KEYS[1])
+if count > 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+    redis.call('ZADD', KEYS[2], count, ARGV[3])
+else
+    redis.call('ZREM', KEYS[2], ARGV[3])
+end
+return count
+"""
+
+_script = None
+
+
+def _presence(content_type, content_id, action, visitor_id='', client=None):
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(PRESENCE_SCRIPT)
+    keys = [
+        PRESENCE_KEY.format(content_type=content_type, content_id=content_id),
+        RANK_KEY.format(content_type=content_type),
+    ]
+    return _script(keys=keys, args=[time.time(), PRESENCE_TTL, content_id, action, visitor_id], client=client)
+
+
+def visitor_id_for(request):
+    """
+    Visitor id sent by the frontend (``?visitor_id=``); older clients without
+    one are identified by a hash of their IP address and user agent.
+    """
+    visitor_id = request.GET.get('visitor_id') or request.POST.get('visitor_id') or ''
+    if VISITOR_ID_RE.match(visitor_id):
+        return visitor_id
+    fingerprint = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def heartbeat(content_type, content_id, visitor_id):
+    return int(_presence(content_type, content_id, 'touch', visitor_id))
+
+
+def leave(content_type, content_id, visitor_id):
+    return int(_presence(content_type, content_id, 'leave', visitor_id))
+
+
+def get_count(content_type, content_id):
+    return int(_presence(content_type, content_id, 'count'))
+
+
+def top(content_type, limit):
+    """
+    Returns ``[(content_id, active_users), ...]`` ordered by active users.
+
+    Leaderboard scores are only refreshed when a page is touched, so the
+    candidates are recounted (one pipelined round trip) before ranking.
+    """
+    client = get_redis()
+    candidates = [
+        int(member)
+        for member in client.zrevrange(RANK_KEY.format(content_type=content_type), 0, limit * 2 - 1)
+    ]
+    if not candidates:
+        return []
+
+    pipe = client.pipeline(transaction=False)
+    for content_id in candidates:
+        _presence(content_type, content_id, 'count', client=pipe)
+    counts = pipe.execute()
+
+    ranked = sorted(
+        ((content_id, int(count)) for content_id, count in zip(candidates, counts) if int(count) > 0),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return ranked[:limit]
@@ -0,0 +1,222 @@
+"""
+Search-as-you-type suggestions for game titles (``/api/games/autocomplete/``).
+
+Every worker keeps a sorted array of ``(key, game id)`` for all live games,
+where keys are the unaccented lowercase title, every word-start suffix of it
+("elden ring" -> "ring") and the SEO title. A lookup is a ``bisect`` plus a
+short scan and never touches the database or Redis, so it stays well under a
+millisecond.
+
+Publishing, unpublishing or deleting a game appends its id to a change log
+in Redis (see ``signals.py``). Workers poll the log at most once per
+``SYNC_INTERVAL`` and reload only the changed games; a gap in the log (e.g.
+after a Redis restart) triggers a full rebuild. Ranking values (searches in
+the last 7 days from ``api.search_stats`` and ``like_count``) are refreshed
+every ``SCORE_REFRESH`` seconds.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings # type: ignore
+from django.db import transaction # type: ignore
+
+from . import search_stats
+from .models import Game
+from .redis_client import get_redis
+from .search import normalize
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'autocomplete:version'
+CHANGES_KEY = 'autocomplete:changes'
+
+# Atomicky: nová verze a záznam v logu (jinak by worker mohl vidět verzi bez změny)
+RECORD_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+redis.call('RPUSH', KEYS[2], version .. ':' .. ARGV[1])
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+return version
+"""
+
+WORD_RE = re.compile(r'\w+')
+
+_script = None
+
+
+def get_config():
+    return settings.AUTOCOMPLETE
+
+
+def words(text):
+    """ "Zaklínač 3: Divoký hon" -> ['zaklinac', '3', 'divoky', 'hon'] """
+    return WORD_RE.findall(normalize(text))
+
+
+def keys_for(title, seo_title=''):
+    """ Full title, every word-start suffix and the SEO title, normalized """
+    title_words = words(title)
+    keys = {' '.join(title_words[i:]) for i in range(len(title_words))}
+    if seo_title:
+        keys.add(' '.join(words(seo_title)))
+    keys.discard('')
+    return keys
+
+
+def game_data(game, searches):
+    return {
+        'id': game.pk,
+        'title': game.title,
+        'slug': game.slug,
+        'search_week': searches.get(game.pk, 0),
+        'like_count': game.like_count,
+    }
+
+
+def load_searches():
+    try:
+        return search_stats.scores('7d')
+    except Exception as e:
+        logger.warning(f"Search statistics unavailable: {e}")
+        return {}
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []  # seřazené (klíč, id hry)
+        self.keys_of = {}
+        self.games = {}
+        self.searches = {}
+        self.version = None
+        self.synced_at = 0
+        self.scored_at = 0
+
+    def load(self, game_ids=None):
+        queryset = Game.objects.live().only('id', 'title', 'seo_title', 'slug', 'like_count')
+        if game_ids is not None:
+            queryset = queryset.filter(pk__in=game_ids)
+        return list(queryset)
+
+    def add(self, game):
+        self.games[game.pk] = game_data(game, self.searches)
+        self.keys_of[game.pk] = keys_for(game.title, game.seo_title)
+        for key in self.keys_of[game.pk]:
+            insort(self.entries, (key, game.pk))
+
+    def remove(self, game_id):
+        for key in self.keys_of.pop(game_id, ()):
+            position = bisect_left(self.entries, (key, game_id))
+            if position < len(self.entries) and self.entries[position] == (key, game_id):
+                del self.entries[position]
+        self.games.pop(game_id, None)
+
+    def rebuild(self, version):
+        games = self.load()
+        searches = load_searches()
+        entries, keys_of, data = [], {}, {}
+        for game in games:
+            keys_of[game.pk] = keys_for(game.title, game.seo_title)
+            entries.extend((key, game.pk) for key in keys_of[game.pk])
+            data[game.pk] = game_data(game, searches)
+        entries.sort()
+        with self.lock:
+            self.entries, self.keys_of, self.games, self.searches, self.version = entries, keys_of, data, searches, version
+            self.scored_at = time.monotonic()
+
+    def apply(self, game_ids, version):
+        games = self.load(game_ids)
+        with self.lock:
+            for game_id in game_ids:
+                self.remove(game_id)
+            for game in games:
+                self.add(game)
+            self.version = version
+
+    def refresh_scores(self):
+        likes = Game.objects.live().values_list('id', 'like_count')
+        searches = load_searches()
+        with self.lock:
+            for game_id, like_count in likes:
+                if game_id in self.games:
+                    self.games[game_id]['search_week'] = searches.get(game_id, 0)
+                    self.games[game_id]['like_count'] = like_count
+            self.searches = searches
+            self.scored_at = time.monotonic()
+
+    def sync(self):
+        """
+        Brings the index up to date with the Redis change log.
+        """
+        config = get_config()
+        now = time.monotonic()
+        if self.version is not None and now - self.synced_at < config['SYNC_INTERVAL']:
+            return
+        self.synced_at = now
+
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.get(VERSION_KEY)
+            pipe.lrange(CHANGES_KEY, 0, -1)
+            version, log = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Autocomplete change log unavailable: {e}")
+            if self.version is None:
+                self.rebuild(0)
+            return
+
+        version = int(version or 0)
+        if version != self.version:
+            changes = [tuple(int(part) for part in entry.split(b':')) for entry in log]
+            pending = [(change, game_id) for change, game_id in changes if change > (self.version or 0)]
+            if self.version is None or version < self.version or not pending or pending[0][0] != self.version + 1:
+                self.rebuild(version)
+            else:
+                self.apply({game_id for _, game_id in pending}, pending[-1][0])
+
+        if now - self.scored_at >= config['SCORE_REFRESH']:
+            self.refresh_scores()
+
+    def lookup(self, prefix, limit):
+        candidates = set()
+        with self.lock:
+            position = bisect_left(self.entries, (prefix,))
+            while position < len(self.entries) and len(candidates) < get_config()['MAX_CANDIDATES']:
+                key, game_id = self.entries[position]
+                if not key.startswith(prefix):
+                    break
+                candidates.add(game_id)
+                position += 1
+            games = [self.games[game_id] for game_id in candidates]
+        return heapq.nlargest(limit, games, key=lambda game: (game['search_week'], game['like_count'], -game['id']))
+
+
+_index = PrefixIndex()
+
+
+def suggest(query, limit=None):
+    config = get_config()
+    limit = max(1, min(limit or config['LIMIT'], config['MAX_LIMIT']))
+    prefix = ' '.join(words(query))
+    if not prefix:
+        return []
+    _index.sync()
+    return [dict(game) for game in _index.lookup(prefix, limit)]
+
+
+def record_change(game_id):
+    """
+    Logs a changed game once the current transaction commits.
+    """
+    def record():
+        global _script
+        try:
+            if _script is None:
+                _script = get_redis().register_script(RECORD_SCRIPT)
+            _script(keys=[VERSION_KEY, CHANGES_KEY], args=[game_id, get_config()['MAX_CHANGES']])
+        except Exception as e:
+            logger.error(f"Recording autocomplete change of game {game_id} failed: {e}")
+    transaction.on_commit(record)
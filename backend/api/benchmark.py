@@ -0,0 +1,251 @@
+"""
+Benchmarks of the public routes in ``backend/urls.py``.
+
+Every route is discovered from the URL resolver (the admin, CMS and documents
+are left out), its parameters are filled with sample objects from the
+database, ideally the synthetic dataset (``api.synthetic``), and it is
+requested in-process with the Django test client. Per route we record the
+first ("cold") request and the median and p95 of the following ones, SQL
+queries of both and the payload size.
+
+Results are compared with a stored baseline (``BENCHMARK['BASELINE']``):
+any extra query, a payload growth over ``PAYLOAD_TOLERANCE`` or a median over
+``LATENCY_TOLERANCE`` (and ``LATENCY_SLACK_MS``, against noise) counts as a
+regression. Routes that write, call external APIs or are not API endpoints
+are listed in ``SKIPPED``; a new route with parameters the benchmark cannot
+fill is reported, so it does not silently go unmeasured.
+"""
+import json
+import os
+import re
+import statistics
+import time
+from contextlib import ExitStack
+
+from django.conf import settings # type: ignore
+from django.db import connections # type: ignore
+from django.test import Client # type: ignore
+from django.urls import URLPattern, URLResolver, get_resolver, reverse # type: ignore
+from wagtail.images import get_image_model # type: ignore
+
+from . import synthetic
+from .models import (
+    Aktualita, ArticleCategory, BlogIndexPage, BlogPost, Comment, Game, GameIndexPage, HomePage, ProductIndexPage,
+    Review, ReviewIndexPage,
+)
+
+EXCLUDED_PREFIXES = ('admin/', 'cms/', 'documents/')
+
+# Název (nebo vzor) routy -> proč ji benchmark nevolá
+SKIPPED = {
+    'like_article': 'writes',
+    'dislike_article': 'writes',
+    'like_review': 'writes',
+    'dislike_review': 'writes',
+    'like_game': 'writes',
+    'dislike_game': 'writes',
+    'increment-read-count': 'writes',
+    'increment_active_users': 'writes',
+    'decrement_active_users': 'writes',
+    'increment_search_week': 'writes',
+    'contact_message': 'writes',
+    'contest_api': 'writes',
+    'live_esports_matches': 'external API',
+    'recent_esports_results': 'external API',
+    'wagtailcore_authenticate_with_password': 'Wagtail form',
+    'wagtailcore_login': 'Wagtail form',
+    'wagtail_serve': 'headless site, pages are served by the frontend',
+    'metrics': 'monitoring, grows with traffic',
+    '': 'redirect',
+    '^media/(?P<path>.*)$': 'media files',
+}
+
+# Query parametry rout, které bez nich nedávají smysl
+QUERY_STRINGS = {
+    'search': 'q=drak',
+    'game-autocomplete': 'q=te',
+    'trending': 'type=article',
+    'most_searched_games': 'window=7d',
+}
+
+# Basename routeru -> model, jehož první objekt doplní <pk>
+ROUTER_MODELS = {
+    'blogpost': BlogPost,
+    'review': Review,
+    'game': Game,
+    'blogindexpage': BlogIndexPage,
+    'reviewindexpage': ReviewIndexPage,
+    'gameindexpage': GameIndexPage,
+    'productindexpage': ProductIndexPage,
+    'homepage': HomePage,
+    'comment': Comment,
+    'categories': ArticleCategory,
+    'aktuality': Aktualita,
+}
+
+PARAMETER_RE = re.compile(r'<(?:\w+:)?(\w+)>|\(\?P<(\w+)>')
+
+
+def get_config():
+    return settings.BENCHMARK
+
+
+def walk(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            if not route.startswith(EXCLUDED_PREFIXES):
+                yield from walk(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern.name
+
+
+def routes():
+    """ ``[(key, route pattern, url name, parameter names)]`` of all public routes """
+    found = []
+    for route, name in walk(get_resolver().url_patterns):
+        parameters = [left or right for left, right in PARAMETER_RE.findall(route)]
+        if 'format' in parameters:
+            continue  # varianty routeru s příponou (.json) jsou tytéž view
+        found.append((name or route, route, name, parameters))
+    return found
+
+
+def first_pk(model, **filters):
+    queryset = model.objects.live() if hasattr(model.objects, 'live') else model.objects.all()
+    return queryset.filter(**filters).order_by('pk').values_list('pk', flat=True).first()
+
+
+def sample_parameters():
+    """ Values for URL parameters, preferring synthetic content """
+    post = BlogPost.objects.live().filter(slug__startswith='synthetic-').order_by('pk').first() or BlogPost.objects.live().order_by('pk').first()
+    return {
+        'username': post.owner.username if post and post.owner else None,
+        'image_id': get_image_model().objects.order_by('pk').values_list('pk', flat=True).first(),
+        'content_type': 'article',
+        'content_id': post.pk if post else None,
+    }
+
+
+def build_url(key, route, name, parameters, samples):
+    """ Returns ``(url, None)`` or ``(None, reason to skip)`` """
+    if key in SKIPPED:
+        return None, SKIPPED[key]
+    kwargs = {}
+    for parameter in parameters:
+        if parameter == 'pk' and name and '-' in name:
+            model = ROUTER_MODELS.get(name.rsplit('-', 1)[0])
+            value = first_pk(model) if model else None
+        else:
+            value = samples.get(parameter)
+        if value is None:
+            return None, f'no value for <{parameter}>'
+        kwargs[parameter] = value
+    if name:
+        url = reverse(name, kwargs=kwargs)
+    elif not parameters:
+        url = '/' + route
+    else:
+        return None, 'unnamed route with parameters'
+    query = QUERY_STRINGS.get(key)
+    return (f'{url}?{query}' if query else url), None
+
+
+def count_queries(counter):
+    def wrapper(execute, sql, params, many, context):
+        counter[0] += 1
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+def request(client, url):
+    counter = [0]
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(count_queries(counter)))
+        start = time.perf_counter()
+        response = client.get(url)
+        content = b''.join(response) if response.streaming else response.content
+        elapsed = time.perf_counter() - start
+    return response.status_code, elapsed * 1000, counter[0], len(content)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(client, url, iterations, cold):
+    if cold:
+        synthetic.invalidate_caches()
+    status, cold_ms, queries, size = request(client, url)
+    warm = [request(client, url) for _ in range(max(iterations - 1, 1))]
+    timings = [ms for _, ms, _, _ in warm]
+    return {
+        'url': url,
+        'status': status,
+        'cold_ms': round(cold_ms, 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': queries,
+        'warm_queries': max(count for _, _, count, _ in warm),
+        'bytes': size,
+    }
+
+
+def run(iterations=None, cold=False, only=None):
+    """
+    Returns ``({key: result}, {key: reason skipped})``.
+    """
+    iterations = iterations or get_config()['ITERATIONS']
+    client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+    samples = sample_parameters()
+    results, skipped = {}, {}
+    for key, route, name, parameters in routes():
+        if only and not any(pattern in key for pattern in only):
+            continue
+        url, reason = build_url(key, route, name, parameters, samples)
+        if url is None:
+            skipped[key] = reason
+            continue
+        results[key] = measure(client, url, iterations, cold)
+    return results, skipped
+
+
+def load_baseline(path=None):
+    path = path or get_config()['BASELINE']
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results, path=None):
+    path = path or get_config()['BASELINE']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+
+def regressions(results, baseline):
+    """ ``{key: [description]}`` of routes worse than the baseline """
+    config = get_config()
+    found = {}
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        problems = []
+        for field in ('queries', 'warm_queries'):
+            if result[field] > previous[field]:
+                problems.append(f"{field} {previous[field]} -> {result[field]}")
+        limit = max(previous['median_ms'] * (1 + config['LATENCY_TOLERANCE']), previous['median_ms'] + config['LATENCY_SLACK_MS'])
+        if result['median_ms'] > limit:
+            problems.append(f"median {previous['median_ms']} -> {result['median_ms']} ms")
+        if result['bytes'] > previous['bytes'] * (1 + config['PAYLOAD_TOLERANCE']):
+            problems.append(f"payload {previous['bytes']} -> {result['bytes']} B")
+        if result['status'] != previous['status']:
+            problems.append(f"status {previous['status']} -> {result['status']}")
+        if problems:
+            found[key] = problems
+    return found
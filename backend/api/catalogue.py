@@ -0,0 +1,197 @@
+"""
+Faceted game catalogue (``/api/games/catalogue/``).
+
+The facet index is built from all live games in a handful of queries and
+kept in the Django cache; every worker also holds the current snapshot in
+memory and only checks its version per request. Publishing, unpublishing or
+deleting a game and saving a genre, platform, developer or publisher bumps
+the version (see ``signals.py``), so the next request rebuilds it once.
+
+Games get positions in catalogue order (newest release first). Multi-valued
+facets (genres, platforms) store one bitset per value, single-valued ones
+(developer, publisher, release year) store the value per position plus the
+positions of each value. Filtering is AND across facets and OR within one;
+the counts of a facet are computed with the filters of the other facets
+applied, so every offered value narrows the current result.
+"""
+import logging
+from collections import Counter, defaultdict
+
+from django.core.cache import cache # type: ignore
+from django.db.models import F # type: ignore
+
+from .models import Developer, Game, Genre, Platform, Publisher
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = 'catalogue:index'
+VERSION_KEY = 'catalogue:version'
+
+MULTI_FACETS = ('genre', 'platform')
+SINGLE_FACETS = ('developer', 'publisher', 'year')
+FACETS = MULTI_FACETS + SINGLE_FACETS
+
+FACET_MODELS = {
+    'genre': Genre,
+    'platform': Platform,
+    'developer': Developer,
+    'publisher': Publisher,
+}
+
+# Modely, jejichž změna mění index (hry nebo názvy hodnot facet)
+INDEXED_MODELS = ('api.game', 'api.genre', 'api.platform', 'api.developer', 'api.publisher')
+
+_local = None
+
+
+def to_bitset(positions):
+    bits = bytearray((max(positions) >> 3) + 1 if positions else 0)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def from_bitset(bits):
+    """ Positions of set bits in ascending order """
+    return [position for position, bit in enumerate(bin(bits)[:1:-1]) if bit == '1']
+
+
+def popcount(bits):
+    return bin(bits).count('1')
+
+
+def build(version):
+    games = Game.objects.live().order_by(F('release_date').desc(nulls_last=True), 'pk').values_list(
+        'id', 'developer_id', 'publisher_id', 'release_date'
+    )
+    ids, columns = [], {facet: [] for facet in SINGLE_FACETS}
+    for game_id, developer_id, publisher_id, release_date in games:
+        ids.append(game_id)
+        columns['developer'].append(developer_id)
+        columns['publisher'].append(publisher_id)
+        columns['year'].append(release_date.year if release_date else None)
+    position_of = {game_id: position for position, game_id in enumerate(ids)}
+
+    positions = {facet: defaultdict(list) for facet in FACETS}
+    for facet in SINGLE_FACETS:
+        for position, value in enumerate(columns[facet]):
+            if value is not None:
+                positions[facet][value].append(position)
+    for facet, through in (('genre', Game.genres.through), ('platform', Game.platforms.through)):
+        for game_id, value in through.objects.filter(game__live=True).values_list('game_id', f'{facet}_id'):
+            if game_id in position_of:
+                positions[facet][value].append(position_of[game_id])
+
+    labels = {
+        facet: dict(model.objects.filter(pk__in=list(positions[facet])).values_list('pk', 'name'))
+        for facet, model in FACET_MODELS.items()
+    }
+    labels['year'] = {year: str(year) for year in positions['year']}
+
+    return {
+        'version': version,
+        'ids': ids,
+        'all': (1 << len(ids)) - 1,
+        'bitsets': {facet: {value: to_bitset(items) for value, items in positions[facet].items()} for facet in MULTI_FACETS},
+        'columns': columns,
+        'positions': {facet: dict(positions[facet]) for facet in SINGLE_FACETS},
+        'labels': labels,
+    }
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_index():
+    """
+    Returns the current index: from memory when the version still matches,
+    then from the cache, built only when both are stale.
+    """
+    global _local
+    try:
+        version = get_version()
+        if _local is not None and _local['version'] == version:
+            return _local
+        index = cache.get(INDEX_KEY)
+    except Exception as e:
+        logger.warning(f"Catalogue cache unavailable: {e}")
+        return build(None)
+
+    if index is None or index['version'] != version:
+        index = build(version)
+        try:
+            cache.set(INDEX_KEY, index, None)
+        except Exception as e:
+            logger.warning(f"Catalogue cache unavailable: {e}")
+    _local = index
+    return index
+
+
+def invalidate(model):
+    if model._meta.label_lower not in INDEXED_MODELS:
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, None)  # verze vypadla z cache, nový index se sestaví tak jako tak
+
+
+def facet_mask(index, facet, values):
+    if facet in MULTI_FACETS:
+        mask = 0
+        for value in values:
+            mask |= index['bitsets'][facet].get(value, 0)
+        return mask
+    return to_bitset([position for value in values for position in index['positions'][facet].get(value, ())])
+
+
+def query(filters, year_from=None, year_to=None, offset=0, limit=20):
+    """
+    ``filters`` maps a facet to the selected values, ``year_from`` and
+    ``year_to`` narrow release years to a range. Returns ``(count, ids of the
+    requested page, {facet: [{'id', 'name', 'count'}]})``.
+    """
+    index = get_index()
+    if year_from is not None or year_to is not None:
+        years = [
+            year for year in filters.get('year') or index['positions']['year']
+            if (year_from is None or year >= year_from) and (year_to is None or year <= year_to)
+        ]
+        filters = dict(filters, year=years or [None])  # prázdný rozsah nesmí znamenat "bez filtru"
+    masks = {facet: facet_mask(index, facet, values) for facet, values in filters.items() if values}
+
+    def matching(exclude=None):
+        bits = index['all']
+        for facet, mask in masks.items():
+            if facet != exclude:
+                bits &= mask
+        return bits
+
+    facets = {}
+    for facet in FACETS:
+        others = matching(exclude=facet)
+        if facet in MULTI_FACETS:
+            counts = {value: popcount(bits & others) for value, bits in index['bitsets'][facet].items()}
+        elif others == index['all']:
+            counts = {value: len(items) for value, items in index['positions'][facet].items()}
+        else:
+            column = index['columns'][facet]
+            counts = Counter(column[position] for position in from_bitset(others))
+        selected = set(filters.get(facet) or ())
+        facets[facet] = sorted(
+            (
+                {'id': value, 'name': index['labels'][facet].get(value, ''), 'count': count}
+                for value, count in counts.items()
+                if value is not None and (count or value in selected)
+            ),
+            key=lambda item: (-item['count'], item['name']),
+        )
+
+    positions = from_bitset(matching())
+    page = [index['ids'][position] for position in positions[offset:offset + limit]]
+    return len(positions), page, facets
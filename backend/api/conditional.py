@@ -0,0 +1,97 @@
+"""
+Conditional GET (``ETag`` / ``Last-Modified``) for content endpoints.
+
+The validators are computed from cheap content versions before anything is
+serialized: ``MAX(last_published_at)`` and ``COUNT(*)`` of the filtered
+queryset for lists, the live revision for details, plus the response cache
+tag versions (bumped by publish/unpublish/delete, snippet saves and counter
+flushes, see ``api.response_cache``). A matching ``If-None-Match`` or
+``If-Modified-Since`` is answered with ``304`` after one aggregate query.
+
+``Last-Modified`` is the newest of the publication time and the tag versions
+(``time_ns`` timestamps), so changes that leave ``last_published_at`` alone
+(unpublishing, deleting, counter flushes) move it forward as well.
+"""
+import hashlib
+
+from django.db.models import Count, Max # type: ignore
+from django.utils.cache import get_conditional_response # type: ignore
+from django.utils.http import http_date, quote_etag # type: ignore
+
+from . import response_cache
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def list_version(queryset):
+    """
+    Returns ``(max last_published_at, row count)`` in one query.
+    """
+    version = queryset.order_by().aggregate(last_published=Max('last_published_at'), count=Count('pk'))
+    return version['last_published'], version['count']
+
+
+def last_modified_at(last_modified, versions):
+    """
+    Newest of ``last_modified`` and the tag ``versions`` in whole seconds, or
+    None when a tag version is unknown (the cache is unavailable) and the
+    time of the last change cannot be told.
+    """
+    if None in versions:
+        return None
+    timestamps = [version // 10**9 for version in versions]
+    if last_modified:
+        timestamps.append(int(last_modified.timestamp()))
+    return max(timestamps, default=None)
+
+
+def conditional_response(request, build, version, tags=(), last_modified=None):
+    """
+    Answers ``304`` when the client already has ``version``; otherwise
+    returns ``build()`` with ``ETag`` and ``Last-Modified`` set.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return build()
+
+    versions = response_cache.get_versions(tags)
+    etag = make_etag(request.get_full_path(), *version, *versions)
+    timestamp = last_modified_at(last_modified, versions)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    response = not_modified if not_modified is not None else build()
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response['ETag'] = etag
+        if timestamp:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Adds conditional GET to ``list`` and ``retrieve`` of page viewsets. Uses
+    the cache tags declared for ``CachedResponseMixin``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        last_published, count = list_version(self.filter_queryset(self.get_queryset()))
+        return conditional_response(
+            request, lambda: build(request, *args, **kwargs),
+            (last_published, count), self.list_cache_tags(), last_published,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        build = super().retrieve
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            version = self.get_queryset().filter(pk=pk).values_list('live_revision_id', 'last_published_at').first()
+        except (ValueError, TypeError):
+            version = None  # neplatné id
+        if version is None:
+            return build(request, *args, **kwargs)  # 404 vyřeší DRF
+        return conditional_response(
+            request, lambda: build(request, *args, **kwargs),
+            version, self.detail_cache_tags(pk), version[1],
+        )
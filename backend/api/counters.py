@@ -0,0 +1,367 @@
+"""
+Write-behind counters for like/dislike/read counts.
+
+Increments are recorded in Redis (or an in-process stand-in) with a single
+O(1) command and periodically flushed to the page tables as one ``F()``
+UPDATE per model, so a popular article no longer rewrites its whole Wagtail
+page row on every click. Reads merge the persisted value with the pending
+delta; columns listed in ``LIVE_FIELDS`` are replaced by their live value.
+
+A flush takes the pending deltas as one batch with an id, applies them and
+only then drops the batch from the store. The id of the last applied batch
+is saved in the same transaction (``CounterFlush``), so a batch whose flush
+died after the database commit is not applied a second time. Between that
+commit and dropping the batch (normally milliseconds), merged reads count
+the batch twice: the value is already persisted and still pending.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import redis # type: ignore
+from django.apps import apps # type: ignore
+from django.conf import settings # type: ignore
+from django.db import transaction # type: ignore
+from django.db.models import Case, F, IntegerField, Value, When # type: ignore
+
+from . import response_cache, search_stats
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'counters:pending'
+FLUSHING_KEY = 'counters:flushing'
+FLUSH_ID_KEY = 'counters:flush_id'
+FLUSH_MUTEX_KEY = 'counters:flush_mutex'
+FLUSH_THROTTLE_KEY = 'counters:flush_throttle'
+FLUSHED_AT_KEY = 'counters:flushed_at'
+
+# Smaže zámek jen tomu, kdo ho drží; po vypršení TTL ho mezitím mohl získat jiný worker
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Počítadla, která se zapisují přes write-behind (model label -> pole)
+COUNTER_FIELDS = {
+    'api.blogpost': ('read_count', 'like_count', 'dislike_count'),
+    'api.review': ('read_count', 'like_count', 'dislike_count'),
+    'api.game': ('like_count', 'dislike_count'),
+}
+
+# Sloupce, které se už nezapisují a čtou se živě odjinud (model label -> pole -> {pk: hodnota} podle pk)
+LIVE_FIELDS = {
+    'api.game': {'search_week': search_stats.counts},  # hledání za 7 dní (api/search_stats.py)
+}
+
+
+def _member(label, pk, field):
+    return f"{label}:{pk}:{field}"
+
+
+def _parse_member(member):
+    label, pk, field = member.rsplit(':', 2)
+    return label, int(pk), field
+
+
+class RedisCounterStore:
+    """
+    Pending deltas live in one Redis hash. A flush atomically renames it so
+    increments arriving during the flush start a fresh hash.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.release_script = client.register_script(RELEASE_SCRIPT)
+
+    def incr(self, member, amount=1):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(PENDING_KEY, member, amount)
+        pipe.hget(FLUSHING_KEY, member)
+        pending, flushing = pipe.execute()
+        return int(pending) + int(flushing or 0)
+
+    def pending(self, members):
+        if not members:
+            return {}
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hmget(PENDING_KEY, members)
+        pipe.hmget(FLUSHING_KEY, members)
+        pending, flushing = pipe.execute()
+        return {
+            member: int(p or 0) + int(f or 0)
+            for member, p, f in zip(members, pending, flushing)
+        }
+
+    def drain(self):
+        """ ``(batch id, {member: delta})`` of the batch being flushed """
+        # Nedokončený flush (např. pád DB) má přednost před novými přírůstky
+        if not self.client.exists(FLUSHING_KEY):
+            self.client.delete(FLUSH_ID_KEY)  # id patří jen k dávce ve "flushing"
+            try:
+                self.client.renamenx(PENDING_KEY, FLUSHING_KEY)
+            except redis.exceptions.ResponseError:
+                return None, {}  # nic nečeká na zápis
+        self.client.set(FLUSH_ID_KEY, uuid.uuid4().hex, nx=True)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(FLUSH_ID_KEY)
+        pipe.hgetall(FLUSHING_KEY)
+        flush_id, deltas = pipe.execute()
+        return flush_id.decode(), {member.decode(): int(delta) for member, delta in deltas.items()}
+
+    def commit(self):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(FLUSHING_KEY, FLUSH_ID_KEY)
+        pipe.set(FLUSHED_AT_KEY, time.time())
+        pipe.execute()
+
+    def status(self):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hlen(PENDING_KEY)
+        pipe.hlen(FLUSHING_KEY)
+        pipe.get(FLUSHED_AT_KEY)
+        pending, flushing, flushed_at = pipe.execute()
+        return pending + flushing, float(flushed_at) if flushed_at else None
+
+    def acquire(self, key, timeout):
+        """ Token of the acquired lock, or None when someone else holds it """
+        token = uuid.uuid4().hex
+        return token if self.client.set(key, token, nx=True, ex=timeout) else None
+
+    def release(self, key, token):
+        self.release_script(keys=[key], args=[token])
+
+
+class LocalCounterStore:
+    """
+    In-process stand-in for development and tests. Deltas are only visible to
+    (and flushed by) the current process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending_deltas = defaultdict(int)
+        self.flushing_deltas = {}
+        self.flush_id = None
+        self.locks = {}
+        self.flushed_at = None
+
+    def incr(self, member, amount=1):
+        with self.lock:
+            self.pending_deltas[member] += amount
+            return self.pending_deltas[member] + self.flushing_deltas.get(member, 0)
+
+    def pending(self, members):
+        with self.lock:
+            return {
+                member: self.pending_deltas.get(member, 0) + self.flushing_deltas.get(member, 0)
+                for member in members
+            }
+
+    def drain(self):
+        with self.lock:
+            if not self.flushing_deltas:
+                self.flushing_deltas = dict(self.pending_deltas)
+                self.pending_deltas = defaultdict(int)
+                self.flush_id = uuid.uuid4().hex
+            return self.flush_id, dict(self.flushing_deltas)
+
+    def commit(self):
+        with self.lock:
+            self.flushing_deltas = {}
+            self.flush_id = None
+            self.flushed_at = time.time()
+
+    def status(self):
+        with self.lock:
+            return len(set(self.pending_deltas) | set(self.flushing_deltas)), self.flushed_at
+
+    def acquire(self, key, timeout):
+        now = time.monotonic()
+        with self.lock:
+            if key in self.locks and now < self.locks[key][0]:
+                return None
+            token = uuid.uuid4().hex
+            self.locks[key] = (now + timeout, token)
+            return token
+
+    def release(self, key, token):
+        with self.lock:
+            if key in self.locks and self.locks[key][1] == token:
+                del self.locks[key]
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        if settings.COUNTERS.get('BACKEND') == 'local':
+            _store = LocalCounterStore()
+        else:
+            _store = RedisCounterStore(get_redis())
+    return _store
+
+
+def is_tracked(model, field):
+    return field in COUNTER_FIELDS.get(model._meta.label_lower, ())
+
+
+def increment(model, pk, field, persisted=0, amount=1):
+    """
+    Records an increment and returns the merged value (persisted + pending).
+    """
+    if not is_tracked(model, field):
+        raise ValueError(f"{model._meta.label}.{field} is not a write-behind counter")
+    pending = get_store().incr(_member(model._meta.label_lower, pk, field), amount)
+    maybe_flush()
+    return persisted + pending
+
+
+def overlay_many(instances, items):
+    """
+    Adds pending deltas to the counter values of already serialized items.
+    """
+    return _overlay([(instance._meta.label_lower, instance.pk) for instance in instances], items)
+
+
+def overlay_rows(model, items):
+    """
+    Same as ``overlay_many`` for cached payloads that only carry an ``id``.
+    """
+    label = model._meta.label_lower
+    return _overlay([(label, item['id']) for item in items], items)
+
+
+def _overlay_live(keys, items):
+    for label, fields in LIVE_FIELDS.items():
+        for field, load in fields.items():
+            pks = [pk for (item_label, pk), item in zip(keys, items) if item_label == label and field in item]
+            if not pks:
+                continue
+            try:
+                values = load(pks)
+            except Exception as e:
+                logger.warning(f"Live values of {label}.{field} unavailable: {e}")
+                continue
+            for (item_label, pk), item in zip(keys, items):
+                if item_label == label and field in item:
+                    item[field] = values.get(pk, 0)
+
+
+def _overlay(keys, items):
+    _overlay_live(keys, items)
+    members = []
+    for (label, pk), item in zip(keys, items):
+        for field in COUNTER_FIELDS.get(label, ()):
+            if field in item:
+                members.append(_member(label, pk, field))
+    if not members:
+        return items
+
+    try:
+        pending = get_store().pending(members)
+    except Exception as e:
+        # Čítače nesmí shodit čtení obsahu – vrátíme uložené hodnoty
+        logger.warning(f"Pending counters unavailable: {e}")
+        return items
+
+    for (label, pk), item in zip(keys, items):
+        for field in COUNTER_FIELDS.get(label, ()):
+            if field in item:
+                item[field] = (item[field] or 0) + pending.get(_member(label, pk, field), 0)
+    return items
+
+
+def overlay(instance, item):
+    return overlay_many([instance], [item])[0]
+
+
+def flush():
+    """
+    Writes all pending deltas to the database and returns the number of
+    updated counters. Issues one UPDATE per model regardless of traffic.
+    """
+    store = get_store()
+    token = store.acquire(FLUSH_MUTEX_KEY, 60)
+    if not token:
+        return 0  # flush už běží v jiném procesu
+    try:
+        return _flush(store)
+    finally:
+        store.release(FLUSH_MUTEX_KEY, token)
+
+
+def _flush(store):
+    flush_id, deltas = store.drain()
+    if not deltas:
+        return 0
+
+    grouped = defaultdict(lambda: defaultdict(dict))  # label -> field -> {pk: delta}
+    for member, delta in deltas.items():
+        label, pk, field = _parse_member(member)
+        if delta:
+            grouped[label][field][pk] = delta
+
+    with transaction.atomic():
+        state, _ = apps.get_model('api.counterflush').objects.select_for_update().get_or_create(pk=1)
+        if state.last_flush_id == flush_id:
+            # Dávka se zapsala, ale flush spadl před store.commit()
+            logger.warning(f"Counter batch {flush_id} was already written, dropping it")
+            grouped = {}
+        for label, fields in grouped.items():
+            model = apps.get_model(label)
+            pks = set()
+            updates = {}
+            for field, per_pk in fields.items():
+                pks.update(per_pk)
+                updates[field] = F(field) + Case(
+                    *[When(pk=pk, then=Value(delta)) for pk, delta in per_pk.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            model.objects.filter(pk__in=pks).update(**updates)
+        state.last_flush_id = flush_id
+        state.save(update_fields=['last_flush_id', 'flushed_at'])
+
+    store.commit()
+    # Odpovědi v cache drží uložené hodnoty, po zápisu je třeba je obnovit
+    response_cache.invalidate(
+        tag
+        for label, fields in grouped.items()
+        for pk in set().union(*fields.values())
+        for tag in (label, response_cache.object_tag(label, pk))
+    )
+    logger.info(f"Flushed {len(deltas)} pending counters")
+    return len(deltas)
+
+
+def status():
+    """
+    ``(pending counters, seconds since the last flush or None)``; the lag
+    is 0 when nothing waits to be written.
+    """
+    pending, flushed_at = get_store().status()
+    if not pending:
+        return 0, 0.0
+    return pending, time.time() - flushed_at if flushed_at else None
+
+
+def maybe_flush():
+    """
+    Flushes at most once per ``COUNTERS['FLUSH_INTERVAL']`` seconds across all
+    workers; the ``flush_counters`` command covers idle periods.
+    """
+    interval = settings.COUNTERS.get('FLUSH_INTERVAL', 30)
+    if not get_store().acquire(FLUSH_THROTTLE_KEY, interval):
+        return
+    try:
+        flush()
+    except Exception as e:
+        # Delta zůstává ve "flushing" a zapíše se při dalším pokusu
+        logger.error(f"Counter flush failed: {e}")
@@ -0,0 +1,113 @@
+"""
+Read-replica routing (``ReplicaRouter`` and ``DatabaseRoutingMiddleware``).
+
+Only reads of safe (GET/HEAD) requests to the read-only public routes
+(``DATABASE_ROUTING['READ_PREFIXES']``: the REST API, RSS feeds, sitemap) go
+to the replica. Everything else uses the primary (``default``): writes,
+form submissions and counters (POST), the admin and CMS, management commands
+and background threads, which run outside of any request.
+
+Read-your-writes:
+
+* within a request, the first write or an open transaction switches the
+  remaining reads to the primary;
+* a write request sets a short-lived cookie (``PIN_COOKIE``) and the
+  following requests of that browser read from the primary for
+  ``PIN_SECONDS``, longer than the expected replication lag;
+* ``api.response_cache`` builds responses on the primary while one of their
+  tags was invalidated less than ``PIN_SECONDS`` ago, so a response rebuilt
+  right after publishing never caches the replica's old content.
+
+Without a ``replica`` alias in ``DATABASES`` the router does nothing. Locally
+the replica can be an SQLite copy of the primary database (a copy made
+before a write also simulates replication lag)::
+
+    DATABASES = {
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'},
+        'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'replica.sqlite3',
+                    'TEST': {'MIRROR': 'default'}},
+    }
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings # type: ignore
+from django.db import DEFAULT_DB_ALIAS, connections # type: ignore
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Kam jdou čtení aktuálního requestu; mimo request (příkazy, vlákna) None = primární
+_target = contextvars.ContextVar('db_target', default=None)
+
+
+def get_config():
+    return settings.DATABASE_ROUTING
+
+
+def replica_alias():
+    """ Alias of the replica, or None when none is configured """
+    alias = get_config()['REPLICA']
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def request_target(request):
+    """ PRIMARY or REPLICA for the reads of ``request`` """
+    config = get_config()
+    if request.method not in SAFE_METHODS or request.COOKIES.get(config['PIN_COOKIE']):
+        return PRIMARY
+    return REPLICA if request.path.startswith(tuple(config['READ_PREFIXES'])) else PRIMARY
+
+
+@contextmanager
+def use_primary():
+    """ Reads inside the block go to the primary """
+    token = _target.set(PRIMARY)
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _target.get() != REPLICA:
+            return None
+        alias = replica_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None  # v transakci musí čtení vidět její vlastní zápisy
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if _target.get() == REPLICA:
+            _target.set(PRIMARY)  # zbytek requestu čte po zápisu z primární databáze
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False  # replika přebírá schéma z primární databáze
+        return None
+
+
+class DatabaseRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _target.set(request_target(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _target.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 500:
+            config = get_config()
+            response.set_cookie(config['PIN_COOKIE'], '1', max_age=config['PIN_SECONDS'], httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,227 @@
+"""
+Shared rich-text enrichment for the API serializers.
+
+Wagtail stores images in rich text as ``<embed embedtype="image" id="..."/>``.
+The enricher first collects embed ids from every object in a response, loads
+them with one ``in_bulk`` query and then rewrites each HTML fragment in a
+single BeautifulSoup pass, so the query count no longer depends on how many
+images an article contains.
+
+Enriched output only changes when an editor publishes, so it is also cached
+per page and live revision: built on ``page_published`` (see ``signals.py``),
+evicted on unpublish/delete and served without any HTML parsing.
+"""
+import logging
+import re
+
+from bs4 import BeautifulSoup # type: ignore
+from django.core.cache import cache # type: ignore
+from wagtail.images.models import Image # type: ignore
+
+IMAGE_EMBED_RE = re.compile(r'<embed\b[^>]*\bembedtype="image"[^>]*>')
+EMBED_ID_RE = re.compile(r'\bid="(\d+)"')
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'enriched:{label}:{pk}'
+
+YOUTUBE_IFRAME_ALLOW = 'accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture'
+
+
+def rich_text_source(value):
+    if hasattr(value, 'source'):
+        return value.source
+    return value
+
+
+def parse_image_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RichTextEnricher:
+    """
+    One instance lives in the serializer context for the whole response, so
+    images are resolved once no matter how many serializers share them.
+    """
+
+    def __init__(self):
+        self.images = {}
+        self.pending_ids = set()
+
+    def collect(self, *values):
+        for value in values:
+            value = rich_text_source(value)
+            if not value:
+                continue
+            for tag in IMAGE_EMBED_RE.findall(value):
+                match = EMBED_ID_RE.search(tag)
+                if match and int(match.group(1)) not in self.images:
+                    self.pending_ids.add(int(match.group(1)))
+
+    def resolve(self):
+        if not self.pending_ids:
+            return
+        found = Image.objects.in_bulk(self.pending_ids)
+        for image_id in self.pending_ids:
+            self.images[image_id] = found.get(image_id)
+        self.pending_ids = set()
+
+    def enrich(self, value, embed_media=True, as_tags=False):
+        """
+        Rewrites image (and optionally YouTube media) embeds.
+
+        ``as_tags=False`` keeps the historic output of the article and review
+        endpoints, where the replacement markup is inserted as escaped text
+        that the frontend decodes. ``as_tags=True`` inserts real elements
+        (game descriptions).
+        """
+        value = rich_text_source(value)
+        if not value:
+            return ''
+        soup = BeautifulSoup(value, 'html.parser')
+
+        embeds = soup.find_all('embed', {'embedtype': 'image'})
+        for embed_tag in embeds:
+            image_id = parse_image_id(embed_tag.get('id'))
+            if image_id is not None and image_id not in self.images:
+                self.pending_ids.add(image_id)
+        self.resolve()  # no-op pro předem posbírané odpovědi
+
+        for embed_tag in embeds:
+            image = self.images.get(parse_image_id(embed_tag.get('id')))
+            if image is None:
+                embed_tag.replace_with('[Image not found]')
+            elif as_tags:
+                embed_tag.replace_with(soup.new_tag('img', src=image.file.url, alt=embed_tag.get('alt', '')))
+            else:
+                embed_tag.replace_with(f'<img src="{image.file.url}" alt="{embed_tag.get("alt", "")}" />')
+
+        if embed_media:
+            for embed_tag in soup.find_all('embed', {'embedtype': 'media'}):
+                if as_tags:
+                    self.replace_media_tag(soup, embed_tag)
+                else:
+                    self.replace_media_text(embed_tag)
+        return str(soup)
+
+    def replace_media_text(self, embed_tag):
+        embed_url = embed_tag.get('url')
+        if embed_url and 'youtube.com' in embed_url:
+            video_id = embed_url.split('v=')[-1]
+            embed_tag.replace_with(
+                f'<iframe width="560" height="315" src="https://www.youtube.com/embed/{video_id}" '
+                f'frameborder="0" allow="{YOUTUBE_IFRAME_ALLOW}" allowfullscreen></iframe>'
+            )
+
+    def replace_media_tag(self, soup, embed_tag):
+        media_url = embed_tag.get('url')
+        if not media_url:
+            return
+        if "youtube.com" in media_url or "youtu.be" in media_url:
+            if "youtube.com" in media_url:
+                video_id = media_url.split('v=')[-1].split('&')[0]
+            else:
+                video_id = media_url.split('/')[-1]
+            iframe_tag = soup.new_tag('iframe')
+            iframe_tag.attrs = {
+                'src': f'https://www.youtube.com/embed/{video_id}',
+                'width': '560',
+                'height': '315',
+                'frameborder': '0',
+                'allow': YOUTUBE_IFRAME_ALLOW,
+                'allowfullscreen': True
+            }
+            embed_tag.replace_with(iframe_tag)
+        else:
+            embed_tag.replace_with(f'[Unsupported media: {media_url}]')
+
+
+def enrich_blogpost(page, enricher):
+    return {
+        'body': {
+            index: enricher.enrich(block.value, embed_media=False)
+            for index, block in enumerate(page.body)
+            if block.block_type == 'paragraph'
+        },
+    }
+
+
+def enrich_review(page, enricher):
+    return {
+        'body': enricher.enrich(page.body),
+        'attributes': {attribute.pk: enricher.enrich(attribute.text) for attribute in page.attributes.all()},
+    }
+
+
+def enrich_game(page, enricher):
+    return {
+        'description': enricher.enrich(page.description, as_tags=True) if page.description else None,
+    }
+
+
+# Model label -> funkce, která vrací obohacené části stránky
+ENRICHERS = {
+    'api.blogpost': enrich_blogpost,
+    'api.review': enrich_review,
+    'api.game': enrich_game,
+}
+
+
+def cache_key(page):
+    return CACHE_KEY.format(label=page._meta.label_lower, pk=page.pk)
+
+
+def content_version(page):
+    """
+    Identifies the live content of a page; changes with every published
+    revision. Drafts and unpublished pages are never cached.
+    """
+    if not page.live:
+        return None
+    if page.live_revision_id:
+        return f"r{page.live_revision_id}"
+    if page.last_published_at:
+        return f"t{page.last_published_at.timestamp()}"
+    return None
+
+
+def get_cached_many(pages):
+    """
+    Returns ``{(label, pk): parts}`` for pages whose cached entry matches their
+    live revision, using one cache round trip.
+    """
+    keys = {cache_key(page): page for page in pages if content_version(page)}
+    if not keys:
+        return {}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"Enriched content cache unavailable: {e}")
+        return {}
+    hits = {}
+    for key, entry in found.items():
+        page = keys[key]
+        if entry.get('version') == content_version(page):
+            hits[(page._meta.label_lower, page.pk)] = entry['parts']
+    return hits
+
+
+def build(page, enricher=None):
+    """
+    Enriches a page and stores the result for its live revision.
+    """
+    parts = ENRICHERS[page._meta.label_lower](page, enricher or RichTextEnricher())
+    version = content_version(page)
+    if version:
+        try:
+            cache.set(cache_key(page), {'version': version, 'parts': parts}, None)
+        except Exception as e:
+            logger.warning(f"Enriched content cache unavailable: {e}")
+    return parts
+
+
+def evict(page):
+    cache.delete(cache_key(page))
@@ -1,14 +1,86 @@
+import logging
+import mimetypes
+
 from django.contrib.syndication.views import Feed # type: ignore
+from django.core.cache import cache # type: ignore
+from django.db.models import Prefetch # type: ignore
+from django.http import HttpResponse # type: ignore
+from wagtail.images import get_image_model # type: ignore
+
+from . import renditions
+from .conditional import conditional_response, list_version
 from .models import BlogPost, Review
 
+logger = logging.getLogger(__name__)
+
+FEED_CACHE_KEY = 'feed:{path}'
+
+
+class CachedFeedMixin:
+    """
+    Hotové XML feedu se drží v cache a sestavuje se znovu jen po změně obsahu
+    (publikace mění MAX(last_published_at), odpublikování a smazání počet).
+    Čtečky, které feed už mají, dostanou 304 po jednom agregačním dotazu.
+    Feed nastaví ``model``, položky bere z jeho živých stránek.
+    """
+    model = None
+
+    def get_queryset(self):
+        return self.model.objects.live()
+
+    def get_version(self):
+        return list_version(self.get_queryset())
+
+    def __call__(self, request, *args, **kwargs):
+        version = self.get_version()
+        return conditional_response(
+            request, lambda: self.cached_feed(version, request, *args, **kwargs),
+            version, (self.model._meta.label_lower,), version[0],
+        )
+
+    def cached_feed(self, version, request, *args, **kwargs):
+        key = FEED_CACHE_KEY.format(path=request.path)
+        try:
+            entry = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Feed cache unavailable: {e}")
+            entry = None
+        if entry is None or entry['version'] != version:
+            response = super().__call__(request, *args, **kwargs)
+            entry = {'version': version, 'content': response.content, 'content_type': response['Content-Type']}
+            try:
+                cache.set(key, entry, None)
+            except Exception as e:
+                logger.warning(f"Feed cache unavailable: {e}")
+        return HttpResponse(entry['content'], content_type=entry['content_type'])
+
 
-class BlogPostFeed(Feed):
+class BlogPostFeed(CachedFeedMixin, Feed):
     title = "Blog Posts Feed"
     link = "/rss/blog/"
     description = "Updates on new blog posts."
+    model = BlogPost
+
+    def enclosures(self):
+        return get_image_model().get_rendition_model().objects.filter(
+            filter_spec=renditions.get_specs()['feed_enclosure']
+        )
+
+    def get_version(self):
+        """
+        Renditions se po publikaci generují na pozadí; feed sestavený dřív
+        obsahuje původní obrázek, proto verze zahrnuje i počet hotových renditions.
+        """
+        queryset = self.get_queryset()
+        enclosures = self.enclosures().filter(image__in=queryset.values('main_image')).count()
+        return (*list_version(queryset), enclosures)
 
     def items(self):
-        return BlogPost.objects.live().order_by('-first_published_at')[:500]
+        # Jen předgenerované renditions (api/renditions.py), jedním dotazem pro celý feed
+        enclosures = self.enclosures()
+        return self.get_queryset().select_related('main_image').prefetch_related(
+            Prefetch('main_image__renditions', queryset=enclosures)
+        ).order_by('-first_published_at')[:500]
 
     def item_title(self, item):
         return item.title
@@ -23,34 +95,39 @@ class BlogPostFeed(Feed):
         """ Přidání správného <pubDate> """
         return item.first_published_at
 
+    def item_enclosure(self, item):
+        """ Předgenerovaná rendition 800x450, dokud neexistuje, tak původní obrázek """
+        if not item.main_image:
+            return None
+        if not hasattr(item, '_enclosure'):
+            item._enclosure = renditions.find(item.main_image, 'feed_enclosure') or item.main_image
+        return item._enclosure
+
     def item_enclosure_url(self, item):
         """ Vrátí URL obrázku v požadovaném rozměru (800x450 px) """
-        if item.main_image:
-            try:
-                # Vygeneruje obrázek v rozměru 800x450 px
-                rendition = item.main_image.get_rendition("fill-800x450")
-                return f"https://superparmeni.eu{rendition.url}"
-            except Exception as e:
-                print(f"Chyba při generování obrázku: {e}")  # Logování chyby
-                return f"https://superparmeni.eu{item.main_image.file.url}"  # Fallback na původní obrázek
-        return None
+        enclosure = self.item_enclosure(item)
+        return f"https://superparmeni.eu{enclosure.file.url}" if enclosure else None
 
     def item_enclosure_length(self, item):
-        """ Odhad velikosti obrázku (můžeš upravit podle potřeby) """
-        return "300000" if item.main_image else None
+        """ Skutečná velikost souboru (feed se sestavuje jen po publikaci) """
+        enclosure = self.item_enclosure(item)
+        return str(enclosure.file.size) if enclosure else None
 
     def item_enclosure_mime_type(self, item):
-        """ Nastavení MIME typu obrázku """
-        return "image/jpeg" if item.main_image else None
+        enclosure = self.item_enclosure(item)
+        if not enclosure:
+            return None
+        return mimetypes.guess_type(enclosure.file.name)[0] or "image/jpeg"
 
 
-class ReviewFeed(Feed):
+class ReviewFeed(CachedFeedMixin, Feed):
     title = "Reviews Feed"
     link = "/rss/reviews/"
     description = "Updates on new reviews."
+    model = Review
 
     def items(self):
-        return Review.objects.live().order_by('-first_published_at')[:20]
+        return self.get_queryset().order_by('-first_published_at')[:20]
 
     def item_title(self, item):
         return item.title
@@ -0,0 +1,65 @@
+from datetime import datetime, time
+
+from django.utils import timezone # type: ignore
+from django.utils.dateparse import parse_date, parse_datetime # type: ignore
+from rest_framework.exceptions import ValidationError # type: ignore
+
+
+def parse_int(value):
+    return int(value)
+
+
+def parse_moment(value):
+    """ Accepts an ISO date or datetime; naive values are read in the current time zone. """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def query_param_list(request, name):
+    """ ``?expand=a,b`` -> ``['a', 'b']`` """
+    value = request.query_params.get(name, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class QueryParamFilterMixin:
+    """
+    Filters a viewset queryset by whitelisted query parameters, e.g.
+    ``/api/posts/?linked_game=5&published_after=2024-01-01``.
+
+    ``filter_params`` maps a query parameter to ``(lookup, parser)``. Every
+    lookup must hit an indexed column so the cost follows the page size, not
+    the table size.
+    """
+    filter_params = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        distinct = False
+        for param, (lookup, parser) in self.filter_params.items():
+            value = self.request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                parsed = parser(value)
+            except ValueError:
+                raise ValidationError({param: f"Neplatná hodnota: {value}"})
+            queryset = queryset.filter(**{lookup: parsed})
+            distinct = distinct or lookup.endswith('__in')
+        return queryset.distinct() if distinct else queryset
+
+
+PUBLISHED_FILTERS = {
+    'published_after': ('first_published_at__gte', parse_moment),
+    'published_before': ('first_published_at__lte', parse_moment),
+}
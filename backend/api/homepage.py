@@ -0,0 +1,333 @@
+"""
+Precomputed homepage sections.
+
+Every section (latest posts, most liked article, upcoming games, ...) is
+built once and kept in the Django cache. ``signals.py`` deletes only the
+sections that depend on the model that changed, so ``/api/homepage-bundle/``
+is normally a single ``get_many``. Counter values (reads, likes) are merged
+in on read, so they stay current without rebuilding the snapshot.
+
+The standalone endpoints (``/api/latest-posts/`` etc.) serve the same
+cached sections.
+"""
+import logging
+from collections import namedtuple
+
+from django.core.cache import cache # type: ignore
+from django.utils import timezone # type: ignore
+
+from . import active_users, counters, db_routing, renditions, search_stats, trending
+from .models import Aktualita, BlogPost, Game, HomePage, Review
+from .serializers import AktualitaSerializer, HomePageContentSerializer, HomePageSerializer, ReviewSerializer
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'homepage:{section}'
+
+TOP_MOST_READ_LIMIT = 3
+LATEST_REVIEWS_LIMIT = 3
+
+# Typ obsahu v URL -> model
+CONTENT_MODELS = {
+    'article': BlogPost,
+    'review': Review,
+}
+
+
+def build_seo():
+    homepage = HomePage.objects.select_related('main_image').first()
+    return HomePageSerializer(homepage).data if homepage else None
+
+
+def build_homepage_content():
+    homepage = HomePage.objects.live().first()
+    return HomePageContentSerializer(homepage).data if homepage else None
+
+
+def build_aktuality():
+    return AktualitaSerializer(Aktualita.objects.filter(is_active=True), many=True).data
+
+
+def owner_data(owner):
+    return {
+        "id": owner.id,
+        "username": owner.username,
+        "first_name": owner.first_name,
+        "last_name": owner.last_name
+    }
+
+
+def build_latest_posts():
+    latest_posts = BlogPost.objects.live().select_related('owner', 'main_image').prefetch_related('categories').order_by('-first_published_at')[:5]
+
+    post_data = []
+    for post in latest_posts:
+        post_data.append({
+            "id": post.id,
+            "title": post.title,
+            "slug": post.slug,
+            "intro": post.intro,
+            "read_count": post.read_count,
+            "first_published_at": post.first_published_at,
+            "main_image": {
+                "id": post.main_image.id,
+                "url": post.main_image.file.url
+            } if post.main_image else None,
+            "owner": owner_data(post.owner) if post.owner else {
+                "id": None,
+                "username": "Unknown",
+                "first_name": "",
+                "last_name": ""
+            },
+            "categories": [{"id": category.id, "name": category.name} for category in post.categories.all()]
+        })
+    return post_data
+
+
+def trending_items(content_type, limit=10):
+    """
+    Precomputed trending items (see api/trending.py) with one query for
+    their titles; counters are persisted values, callers overlay pending ones.
+    """
+    model = trending.CONTENT_MODELS[content_type]
+    ranked = trending.top(content_type, limit)
+    contents = model.objects.live().select_related('main_image').in_bulk([content_id for content_id, _ in ranked])
+    return [
+        {
+            'id': content.id,
+            'title': content.title,
+            'slug': content.slug,
+            'read_count': getattr(content, 'read_count', None),
+            'like_count': content.like_count,
+            'main_image': content.main_image.file.url if content.main_image else None,
+            'trending_score': round(value, 3),
+            'content_type': content_type,
+        }
+        for content, value in ((contents.get(content_id), value) for content_id, value in ranked)
+        if content is not None
+    ]
+
+
+def build_most_liked_article():
+    # Nejvýš v trendech (lajky a čtení tlumené stářím), ne absolutně nejlajkovanější
+    most_liked = None
+    try:
+        top = trending.top('article', 1)
+    except Exception as e:
+        logger.warning(f"Trending scores unavailable: {e}")
+        top = []
+    articles = BlogPost.objects.live().select_related('owner', 'main_image').prefetch_related('categories')
+    if top:
+        most_liked = articles.filter(pk=top[0][0]).first()
+    if most_liked is None:
+        most_liked = articles.order_by('-like_count').first()
+    if not most_liked:
+        return None
+
+    return {
+        "id": most_liked.id,
+        "title": most_liked.title,
+        "slug": most_liked.slug,
+        "first_published_at": most_liked.first_published_at,
+        "like_count": most_liked.like_count,
+        "read_count": most_liked.read_count,
+        "main_image": {
+            "id": most_liked.main_image.id,
+            "url": most_liked.main_image.file.url
+        } if most_liked.main_image else None,
+        "owner": owner_data(most_liked.owner) if most_liked.owner else None,
+        "categories": [{"id": cat.id, "name": cat.name} for cat in most_liked.categories.all()]
+    }
+
+
+def build_latest_reviews():
+    reviews = ReviewSerializer.setup_eager_loading(Review.objects.live()).order_by('-first_published_at')[:LATEST_REVIEWS_LIMIT]
+    # Čítače doplňuje až overlay sekce, v cache jsou jen uložené hodnoty
+    return ReviewSerializer(reviews, many=True, context={'overlay_counters': False}).data
+
+
+def build_upcoming_games():
+    upcoming_games = Game.objects.filter(release_date__gte=timezone.now()).select_related('main_image').order_by('release_date')[:3]
+    return [
+        {
+            "id": game.id,
+            "title": game.title,
+            "slug": game.slug,
+            "release_date": game.release_date,
+            "main_image": game.main_image.file.url if game.main_image else None,
+        }
+        for game in upcoming_games
+    ]
+
+
+def searched_game_data(game, searches):
+    main_image_url = None
+    if game.main_image:
+        # Získáme URL k obrázku, včetně domény, pokud je dostupná
+        main_image_url = renditions.url(game.main_image, 'original')
+
+    return {
+        'id': game.id,
+        'title': game.title,
+        'description': game.description,
+        'slug': game.slug,
+        'search_week': searches,
+        'main_image': {
+            'url': main_image_url
+        },
+        'release_date': game.release_date,
+    }
+
+
+def most_searched_games(window=search_stats.DEFAULT_WINDOW, limit=10):
+    """
+    Most searched live games in ``window`` from the precomputed Redis windows
+    (one ``ZREVRANGE``) and one query for the games.
+    """
+    # Rezerva pro hry, které mezitím přestaly být živé
+    ranked = search_stats.top(window, limit * 2)
+    games = Game.objects.live().select_related('main_image').in_bulk([game_id for game_id, _ in ranked])
+    return [searched_game_data(games[game_id], searches) for game_id, searches in ranked if game_id in games][:limit]
+
+
+def build_most_searched_game():
+    try:
+        ranked = most_searched_games(limit=1)
+    except Exception as e:
+        logger.warning(f"Search statistics unavailable: {e}")
+        ranked = []
+    if ranked:
+        return ranked[0]
+
+    # Zatím nikdo nic nehledal – nejnovější hra, ať sekce není prázdná
+    game = Game.objects.live().select_related('main_image').order_by('-first_published_at').first()
+    return searched_game_data(game, 0) if game else None
+
+
+def top_most_read(content_type):
+    """
+    Top content by active readers, padded with the newest content at 0
+    readers when fewer people are online.
+    """
+    model = CONTENT_MODELS[content_type]
+
+    # Žebříček drží Redis – jeden ZREVRANGE a jeden dotaz na titulky a slugy
+    ranked = active_users.top(content_type, TOP_MOST_READ_LIMIT)
+    contents = model.objects.live().only('id', 'title', 'slug', 'read_count').in_bulk([content_id for content_id, _ in ranked])
+    ranked = [(contents[content_id], count) for content_id, count in ranked if content_id in contents]
+
+    if len(ranked) < TOP_MOST_READ_LIMIT:
+        # Málo čtenářů online – doplníme nejnovějším obsahem s nulou aktivních uživatelů
+        filler = model.objects.live().only('id', 'title', 'slug', 'read_count').exclude(
+            pk__in=[content.pk for content, _ in ranked]
+        ).order_by('-first_published_at')[:TOP_MOST_READ_LIMIT - len(ranked)]
+        ranked += [(content, 0) for content in filler]
+
+    return [
+        {
+            'id': content.id,
+            'title': content.title,
+            'slug': content.slug,
+            'read_count': content.read_count,
+            'active_users': count,
+            'content_type': content_type,  # Add content_type to the response
+        }
+        for content, count in ranked
+    ]
+
+
+def build_top_most_read():
+    return {content_type: top_most_read(content_type) for content_type in CONTENT_MODELS}
+
+
+def overlay_top_most_read(data):
+    for content_type, items in data.items():
+        counters.overlay_rows(CONTENT_MODELS[content_type], items)
+    return data
+
+
+def overlay_one(model):
+    def overlay(data):
+        if data:
+            counters.overlay_rows(model, [data])
+        return data
+    return overlay
+
+
+def overlay_list(model):
+    def overlay(data):
+        return counters.overlay_rows(model, data)
+    return overlay
+
+
+# build: sestavení sekce, models: změna kterých modelů ji zneplatní,
+# timeout: pro sekce závislé na čase/počítadlech, overlay: doplnění čekajících počítadel
+Section = namedtuple('Section', ['build', 'models', 'timeout', 'overlay'])
+
+SECTIONS = {
+    'seo': Section(build_seo, ('api.homepage',), None, None),
+    'homepage_content': Section(build_homepage_content, ('api.homepage', 'api.partner'), None, None),
+    'aktuality': Section(build_aktuality, ('api.aktualita',), None, None),
+    'latest_posts': Section(build_latest_posts, ('api.blogpost', 'api.articlecategory'), None, overlay_list(BlogPost)),
+    # Pořadí podle lajků se mění i bez publikace
+    'most_liked_article': Section(build_most_liked_article, ('api.blogpost', 'api.articlecategory'), 5 * 60, overlay_one(BlogPost)),
+    'latest_reviews': Section(build_latest_reviews, ('api.review',), None, overlay_list(Review)),
+    'upcoming_games': Section(build_upcoming_games, ('api.game',), 15 * 60, None),
+    'most_searched_game': Section(build_most_searched_game, ('api.game',), 5 * 60, None),
+    # Aktivní čtenáři se mění neustále
+    'top_most_read': Section(build_top_most_read, (), 15, overlay_top_most_read),
+}
+
+
+def cache_key(name):
+    return CACHE_KEY.format(section=name)
+
+
+def get_sections(names):
+    """
+    Returns ``{name: data}``; missing sections are built and stored, the rest
+    come from one cache round trip.
+    """
+    try:
+        found = cache.get_many([cache_key(name) for name in names])
+    except Exception as e:
+        logger.warning(f"Homepage cache unavailable: {e}")
+        found = {}
+
+    data = {}
+    for name in names:
+        key = cache_key(name)
+        if key in found:
+            data[name] = found[key]['data']
+            continue
+        section = SECTIONS[name]
+        # Sekce se mažou při změně obsahu; z repliky by se mohla uložit ještě stará verze
+        with db_routing.use_primary():
+            data[name] = section.build()
+        try:
+            cache.set(key, {'data': data[name]}, section.timeout)
+        except Exception as e:
+            logger.warning(f"Homepage cache unavailable: {e}")
+
+    for name in names:
+        if SECTIONS[name].overlay:
+            data[name] = SECTIONS[name].overlay(data[name])
+    return data
+
+
+def get_section(name):
+    return get_sections([name])[name]
+
+
+def get_bundle():
+    return get_sections(list(SECTIONS))
+
+
+def invalidate(model):
+    """
+    Deletes the sections built from ``model`` (any instance of it changed).
+    """
+    label = model._meta.label_lower
+    keys = [cache_key(name) for name, section in SECTIONS.items() if label in section.models]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,175 @@
+"""
+Per-request cost instrumentation (``InstrumentationMiddleware``).
+
+For every request the middleware counts SQL queries and their time (a
+``connection.execute_wrapper`` on every database alias), Redis round trips
+(``Redis.execute_command`` and ``Pipeline.execute``, which also covers the
+django-redis cache) and outbound HTTP time (``requests.Session.send``). The
+totals are sent back in a ``Server-Timing`` header, so they show up in the
+browser devtools next to the request, and aggregated per resolved URL name
+into Prometheus histograms (``api.metrics``). Cache lookups through
+django-redis are counted as hits or misses on the way.
+
+The Redis and HTTP hooks are installed once per process and only do work
+while a request is being measured; per request the cost is a context
+variable lookup and two ``perf_counter`` calls per query or round trip.
+"""
+import contextvars
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings # type: ignore
+from django.db import connections # type: ignore
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('instrumentation', default=None)
+
+_installed = False
+_missing = object()
+
+
+def get_config():
+    return settings.INSTRUMENTATION
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db', 'redis_calls', 'redis', 'http_calls', 'http')
+
+    def __init__(self):
+        self.queries = self.redis_calls = self.http_calls = 0
+        self.db = self.redis = self.http = 0.0
+
+
+def current():
+    """ Stats of the request being measured in this context, or None """
+    return _current.get()
+
+
+def measure_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db += time.perf_counter() - start
+
+
+def timed(function, counter, timer):
+    """ Wraps ``function`` so it adds its calls and time to the current stats """
+    def wrapper(*args, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            setattr(stats, counter, getattr(stats, counter) + 1)
+            setattr(stats, timer, getattr(stats, timer) + time.perf_counter() - start)
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def counted_get(function):
+    def get(self, key, default=None, *args, **kwargs):
+        value = function(self, key, _missing, *args, **kwargs)
+        metrics.observe_cache(key, value is not _missing)
+        return default if value is _missing else value
+    get.__wrapped__ = function
+    return get
+
+
+def counted_get_many(function):
+    def get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        found = function(self, keys, *args, **kwargs)
+        for key in keys:
+            metrics.observe_cache(key, key in found)
+        return found
+    get_many.__wrapped__ = function
+    return get_many
+
+
+def install():
+    """
+    Hooks Redis, cache and outbound HTTP calls (once per process).
+    """
+    global _installed
+    if _installed:
+        return
+    import redis.client # type: ignore
+    import requests # type: ignore
+
+    # Pipeline si příkazy jen skládá, po síti jde až execute()
+    redis.client.Redis.execute_command = timed(redis.client.Redis.execute_command, 'redis_calls', 'redis')
+    redis.client.Pipeline.execute = timed(redis.client.Pipeline.execute, 'redis_calls', 'redis')
+    requests.Session.send = timed(requests.Session.send, 'http_calls', 'http')
+    if 'django_redis' in settings.CACHES['default']['BACKEND']:
+        from django_redis.client import DefaultClient # type: ignore
+        DefaultClient.get = counted_get(DefaultClient.get)
+        DefaultClient.get_many = counted_get_many(DefaultClient.get_many)
+    _installed = True
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else 'unresolved'
+
+
+def server_timing(stats, total):
+    app = max(total - stats.db - stats.redis - stats.http, 0)
+    return ', '.join([
+        f'db;dur={stats.db * 1000:.1f};desc="{stats.queries} queries"',
+        f'redis;dur={stats.redis * 1000:.1f};desc="{stats.redis_calls} calls"',
+        f'http;dur={stats.http * 1000:.1f};desc="{stats.http_calls} calls"',
+        f'app;dur={app * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        if self.config['ENABLED']:
+            install()
+
+    def __call__(self, request):
+        if not self.config['ENABLED'] or _current.get() is not None:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(measure_query))
+                response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            _current.reset(token)
+
+        route = route_name(request)
+        try:
+            metrics.observe_request(route, request.method, response.status_code, stats, total)
+            metrics.observe_pools()
+        except Exception as e:
+            logger.warning(f"Recording request metrics failed: {e}")
+        if self.config['SERVER_TIMING']:
+            response['Server-Timing'] = server_timing(stats, total)
+        if total * 1000 >= self.config['SLOW_REQUEST_MS'] or stats.queries >= self.config['MAX_QUERIES']:
+            logger.warning(
+                f"Expensive request {request.method} {request.path} ({route}): {total * 1000:.0f} ms, "
+                f"{stats.queries} queries / {stats.db * 1000:.0f} ms, "
+                f"{stats.redis_calls} Redis calls / {stats.redis * 1000:.0f} ms, "
+                f"{stats.http_calls} HTTP calls / {stats.http * 1000:.0f} ms"
+            )
+        return response
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand # type: ignore
+
+from api import recommendations
+
+
+class Command(BaseCommand):
+    help = "Spočítá podobné hry a články (api/recommendations.py) a uloží je pro /related/ endpointy (spouštět cronem)."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        built = recommendations.build_all()
+        summary = ', '.join(f"{content_type}: {count}" for content_type, count in built.items())
+        self.stdout.write(self.style.SUCCESS(f"Recommendations built in {time.perf_counter() - started:.2f} s ({summary})"))
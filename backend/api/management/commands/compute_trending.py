@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings # type: ignore
+from django.core.management.base import BaseCommand # type: ignore
+
+from api import trending
+
+
+class Command(BaseCommand):
+    help = "Přepočítá trendy (api/trending.py) článků, recenzí a her a uloží je do Redisu (spouštět cronem nebo s --watch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help="Běžet trvale a přepočítávat každých --interval sekund")
+        parser.add_argument('--interval', type=float, default=None, help="Výchozí TRENDING['INTERVAL']")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or settings.TRENDING['INTERVAL']
+        while True:
+            started = time.perf_counter()
+            stored = trending.compute_all()
+            summary = ', '.join(f"{content_type}: {count}" for content_type, count in stored.items())
+            self.stdout.write(self.style.SUCCESS(f"Trending computed in {time.perf_counter() - started:.2f} s ({summary})"))
+            if not options['watch']:
+                return
+            time.sleep(interval)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.files.storage import default_storage # type: ignore
+from django.core.management.base import BaseCommand # type: ignore
+
+from api import webp
+
+
+class Command(BaseCommand):
+    help = "Převede obrázky čekající ve frontě na WebP (paralelně v procesech) a vypíše časy."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Počet procesů (výchozí WEBP_CONVERT['WORKERS'])")
+        parser.add_argument('--watch', action='store_true', help="Běžet trvale a frontu kontrolovat každých --interval sekund")
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            report = webp.convert_pending(default_storage, workers=options['workers'])
+            for name, original_size, size, seconds in report:
+                self.stdout.write(f"{name}: {original_size} -> {size} B ({seconds:.2f} s)")
+            if report:
+                total = sum(seconds for *_, seconds in report)
+                self.stdout.write(self.style.SUCCESS(f"Converted {len(report)} images, {total:.2f} s of encoding"))
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand # type: ignore
+
+from api import counters
+
+
+class Command(BaseCommand):
+    help = "Zapíše čekající přírůstky like/dislike/read čítačů do databáze (spouštět cronem)."
+
+    def handle(self, *args, **options):
+        flushed = counters.flush()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} counters"))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management import call_command # type: ignore
+from django.core.management.base import BaseCommand # type: ignore
+
+from api import synthetic
+
+
+class Command(BaseCommand):
+    help = "Vygeneruje syntetická data (hry, články, recenze, komentáře) pro benchmarky; předchozí syntetická data nahradí."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--images', type=int, default=40)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--indexes', action='store_true', help="Poté přestavět vyhledávací indexy a doporučení")
+        parser.add_argument('--clear', action='store_true', help="Jen smazat syntetická data")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['clear']:
+            deleted = synthetic.clear()
+            self.stdout.write(self.style.SUCCESS(f"Removed {deleted} synthetic sections in {time.perf_counter() - started:.2f} s"))
+            return
+
+        created = synthetic.generate(
+            games=options['games'],
+            posts=options['posts'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            images=options['images'],
+            seed=options['seed'],
+        )
+        summary = ', '.join(f"{name}: {count}" for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated in {time.perf_counter() - started:.2f} s ({summary})"))
+        if options['indexes']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+            call_command('build_recommendations', stdout=self.stdout)
+            call_command('update_index', stdout=self.stdout)
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand # type: ignore
+
+from api import search
+from api.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = "Znovu sestaví vyhledávací dokumenty (api/search.py) všech publikovaných her, článků a recenzí."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed = 0
+        for model in search.CONTENT_MODELS.values():
+            pages = model.objects.live().prefetch_related(*search.PREFETCH[model])
+            for page in pages.iterator(chunk_size=200):
+                search.index_page(page)
+                indexed += 1
+        # Dokumenty stránek, které mezitím přestaly být živé
+        stale, _ = SearchDocument.objects.exclude(page__live=True).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} pages, removed {stale} stale documents in {time.perf_counter() - started:.2f} s"
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError # type: ignore
+
+from api import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Změří latenci, počet SQL dotazů a velikost odpovědi všech veřejných rout (api/benchmark.py) "
+        "a porovná je s uloženým baseline; s regresí skončí chybou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=None, help="Výchozí BENCHMARK['ITERATIONS']")
+        parser.add_argument('--cold', action='store_true', help="Před první žádostí každé routy zneplatnit cache odpovědí")
+        parser.add_argument('--only', nargs='*', help="Jen routy, jejichž název obsahuje některý z řetězců")
+        parser.add_argument('--baseline', default=None, help="Soubor s baseline, výchozí BENCHMARK['BASELINE']")
+        parser.add_argument('--save-baseline', action='store_true', help="Uložit výsledky jako nový baseline")
+
+    def handle(self, *args, **options):
+        results, skipped = benchmark.run(iterations=options['iterations'], cold=options['cold'], only=options['only'])
+
+        self.stdout.write(f"{'route':<40} {'status':>6} {'cold ms':>9} {'median':>9} {'p95':>9} {'queries':>8} {'warm q':>7} {'bytes':>10}")
+        for key, result in sorted(results.items()):
+            self.stdout.write(
+                f"{key:<40} {result['status']:>6} {result['cold_ms']:>9.1f} {result['median_ms']:>9.1f} "
+                f"{result['p95_ms']:>9.1f} {result['queries']:>8} {result['warm_queries']:>7} {result['bytes']:>10}"
+            )
+        for key, reason in sorted(skipped.items()):
+            self.stdout.write(f"skipped {key or '/'}: {reason}")
+
+        if options['save_baseline']:
+            benchmark.save_baseline(results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved ({len(results)} routes)"))
+            return
+
+        baseline = benchmark.load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING("No baseline yet, run with --save-baseline"))
+            return
+        found = benchmark.regressions(results, baseline)
+        for key, problems in sorted(found.items()):
+            self.stdout.write(self.style.ERROR(f"{key}: {', '.join(problems)}"))
+        if found:
+            raise CommandError(f"{len(found)} routes regressed against the baseline")
+        self.stdout.write(self.style.SUCCESS(f"No regressions in {len(results)} routes"))
@@ -0,0 +1,41 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand # type: ignore
+from django.db import close_old_connections # type: ignore
+from wagtail.images import get_image_model # type: ignore
+
+from api import renditions
+
+
+def warm_image(image_id):
+    close_old_connections()
+    try:
+        started = time.perf_counter()
+        renditions.warm(get_image_model().objects.get(pk=image_id))
+        return time.perf_counter() - started
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Vygeneruje chybějící renditions (RENDITION_SPECS) pro všechny existující obrázky paralelně."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Počet vláken (Pillow při změně velikosti uvolňuje GIL)")
+
+    def handle(self, *args, **options):
+        image_ids = list(get_image_model().objects.order_by('pk').values_list('pk', flat=True))
+        started = time.perf_counter()
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(warm_image, image_id): image_id for image_id in image_ids}
+            for future in as_completed(futures):
+                try:
+                    self.stdout.write(f"Image {futures[future]}: {future.result():.2f} s")
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Image {futures[future]} failed: {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {len(image_ids) - failed} images in {time.perf_counter() - started:.2f} s ({failed} failed)"
+        ))
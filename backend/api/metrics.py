@@ -0,0 +1,167 @@
+"""
+Prometheus metrics (``/metrics``).
+
+Per-route request counts and histograms of latency, SQL queries and time,
+Redis round trips and outbound HTTP time are fed by
+``api.instrumentation.InstrumentationMiddleware``; p50/p95/p99 come from
+``histogram_quantile()`` over the ``*_bucket`` series. The same hooks count
+django-redis cache hits and misses per key family (``response``,
+``enriched``, ``catalogue``, ...), database connections opened per alias and
+the Redis connection pool usage of every worker. Pending write-behind
+counters and the time since their last flush are read from the counter
+store when scraped.
+
+With several gunicorn workers set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory before the workers start; every worker then writes its values to
+memory-mapped files there and a scrape of any worker returns the sum over all
+of them. Dead workers are cleaned up by the gunicorn hook::
+
+    # gunicorn.conf.py
+    def child_exit(server, worker):
+        from api.metrics import mark_process_dead
+        mark_process_dead(worker.pid)
+"""
+import logging
+import os
+
+from django.conf import settings # type: ignore
+from django.db.backends.signals import connection_created # type: ignore
+from prometheus_client import ( # type: ignore
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily # type: ignore
+
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+REQUESTS = Counter('http_requests_total', 'Requests by route, method and status', ['route', 'method', 'status'])
+LATENCY = Histogram('http_request_duration_seconds', 'Request latency', ['route'], buckets=LATENCY_BUCKETS)
+DB_TIME = Histogram('http_request_db_seconds', 'SQL time per request', ['route'], buckets=LATENCY_BUCKETS)
+QUERIES = Histogram('http_request_queries', 'SQL queries per request', ['route'], buckets=COUNT_BUCKETS)
+REDIS_TIME = Histogram('http_request_redis_seconds', 'Redis time per request', ['route'], buckets=LATENCY_BUCKETS)
+REDIS_CALLS = Histogram('http_request_redis_calls', 'Redis round trips per request', ['route'], buckets=COUNT_BUCKETS)
+HTTP_TIME = Histogram('http_request_outbound_seconds', 'Outbound HTTP time per request', ['route'], buckets=LATENCY_BUCKETS)
+
+CACHE_REQUESTS = Counter('cache_requests_total', 'Django cache lookups by key family', ['family', 'result'])
+DB_CONNECTIONS = Counter('db_connections_opened_total', 'New database connections', ['alias'])
+REDIS_POOL = Gauge(
+    'redis_pool_connections', 'Redis pool connections of the worker', ['pool', 'state'], multiprocess_mode='livesum'
+)
+
+
+def observe_request(route, method, status, stats, total):
+    REQUESTS.labels(route, method, status).inc()
+    LATENCY.labels(route).observe(total)
+    DB_TIME.labels(route).observe(stats.db)
+    QUERIES.labels(route).observe(stats.queries)
+    REDIS_TIME.labels(route).observe(stats.redis)
+    REDIS_CALLS.labels(route).observe(stats.redis_calls)
+    HTTP_TIME.labels(route).observe(stats.http)
+
+
+def key_family(key):
+    """ 'response:ab12...' -> 'response' """
+    return str(key).split(':', 1)[0]
+
+
+def observe_cache(key, hit):
+    CACHE_REQUESTS.labels(key_family(key), 'hit' if hit else 'miss').inc()
+
+
+def cache_pool():
+    if 'django_redis' not in settings.CACHES['default']['BACKEND']:
+        return None
+    from django_redis import get_redis_connection # type: ignore
+    return get_redis_connection('default').connection_pool
+
+
+def pool_usage(pool):
+    """
+    ``(in use, idle)`` connections of a redis-py pool, or None. redis-py has
+    no public API for it, so other pool classes or versions are skipped.
+    """
+    in_use = getattr(pool, '_in_use_connections', None)
+    created = getattr(pool, '_created_connections', None)
+    if not isinstance(in_use, (set, list)) or not isinstance(created, int):
+        return None
+    return len(in_use), max(created - len(in_use), 0)
+
+
+def observe_pools():
+    """ Updates the pool gauges of this worker (after every request) """
+    from . import redis_client
+    pools = {'cache': cache_pool()}
+    if redis_client._client is not None:
+        pools['client'] = redis_client._client.connection_pool
+    for name, pool in pools.items():
+        usage = pool_usage(pool) if pool is not None else None
+        if usage is None:
+            continue
+        REDIS_POOL.labels(name, 'in_use').set(usage[0])
+        REDIS_POOL.labels(name, 'idle').set(usage[1])
+
+
+def count_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS.labels(connection.alias).inc()
+
+
+connection_created.connect(count_connection, dispatch_uid='metrics_count_connection')
+
+
+class CounterCollector:
+    """ Write-behind counter backlog, read from the shared store at scrape time """
+
+    def describe(self):
+        return []  # jinak by registrace volala collect() už při importu
+
+    def collect(self):
+        try:
+            pending, lag = counters.status()
+        except Exception as e:
+            logger.warning(f"Counter status unavailable: {e}")
+            return
+        yield GaugeMetricFamily('counters_pending', 'Counters waiting to be flushed', value=pending)
+        if lag is not None:
+            yield GaugeMetricFamily('counters_flush_lag_seconds', 'Time since the last flush while counters wait', value=lag)
+
+
+def multiprocess_mode():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+if not multiprocess_mode():
+    REGISTRY.register(CounterCollector())
+
+
+def get_registry():
+    if not multiprocess_mode():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(CounterCollector())
+    return registry
+
+
+def mark_process_dead(pid):
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(pid)
+
+
+def is_allowed(request):
+    """
+    ``/metrics`` is closed unless ``METRICS['TOKEN']`` is set and sent as
+    ``Authorization: Bearer <token>`` or the client is in ``ALLOWED_IPS``.
+    """
+    config = settings.METRICS
+    if request.META.get('REMOTE_ADDR') in config['ALLOWED_IPS']:
+        return True
+    return bool(config['TOKEN']) and request.headers.get('Authorization') == f"Bearer {config['TOKEN']}"
+
+
+def render():
+    """ ``(body, content type)`` of the text exposition format """
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0062_alter_blogpost_body_advertisement'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='review_type',
+            field=models.CharField(choices=[('Game', 'Hra'), ('Keyboard', 'Klávesnice'), ('Mouse', 'Myš'), ('Monitor', 'Monitor'), ('Computer', 'Počítač'), ('Headphones', 'Sluchátka'), ('Console', 'Konzole'), ('Mobile', 'Mobil'), ('Notebook', 'Notebook'), ('Microphone', 'Mikrofon')], db_index=True, default='Game', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['page', 'is_approved', 'created_at'], name='comment_page_approved_idx'),
+        ),
+    ]
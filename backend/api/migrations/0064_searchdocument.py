@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Postgres nemá český stemmer; konfigurace aspoň odstraní diakritiku, aby "cesky" našlo "česky"
+CREATE_SEARCH_CONFIG = """
+CREATE TEXT SEARCH CONFIGURATION czech_unaccent (COPY = simple);
+ALTER TEXT SEARCH CONFIGURATION czech_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+"""
+
+DROP_SEARCH_CONFIG = "DROP TEXT SEARCH CONFIGURATION IF EXISTS czech_unaccent;"
+
+
+def create_search_config(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_CONFIG)
+
+
+def drop_search_config(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_CONFIG)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0094_alter_page_locale'),
+        ('wagtailimages', '0026_delete_uploadedimage'),
+        ('api', '0063_review_type_index_comment_page_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunPython(create_search_config, drop_search_config),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(db_index=True, max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('title_normalized', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('main_image', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wagtailimages.image')),
+                ('page', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='wagtailcore.page')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='searchdocument_vector_idx'), django.contrib.postgres.indexes.GinIndex(fields=['title_normalized'], name='searchdocument_title_trgm_idx', opclasses=['gin_trgm_ops'])],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0094_alter_page_locale'),
+        ('api', '0064_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedContent',
+            fields=[
+                ('page', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related_content', serialize=False, to='wagtailcore.page')),
+                ('content_type', models.CharField(db_index=True, max_length=20)),
+                ('items', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0065_relatedcontent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterFlush',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_flush_id', models.CharField(blank=True, max_length=32)),
+                ('flushed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
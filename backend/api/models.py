@@ -9,13 +9,11 @@ from wagtail.contrib.table_block.blocks import TableBlock # type: ignore
 from wagtail.snippets.blocks import SnippetChooserBlock  # type: ignore # Použijeme SnippetChooserBlock
 
 from django import forms # type: ignore
+from django.contrib.postgres.indexes import GinIndex # type: ignore
+from django.contrib.postgres.search import SearchVectorField # type: ignore
 from django.db import models # type: ignore
 from slugify import slugify # type: ignore
-from django.core.files.storage import FileSystemStorage # type: ignore
 from wagtail import blocks # type: ignore
-from PIL import Image # type: ignore
-from io import BytesIO
-import os
 
 @register_snippet  # ✅ Nutné pro zobrazení ve Wagtail adminu
 class ContestEntry(models.Model):
@@ -114,24 +112,6 @@ def generate_slug(title):
     slug = slugify(title)
     return translations.get(slug, slug)
 
-# Custom storage to handle WebP conversion
-class WebPStorage(FileSystemStorage):
-    def _save(self, name, content):
-        # Získáme příponu souboru
-        ext = os.path.splitext(name)[1].lower()
-        
-        # Pokud je obrázek v podporovaném formátu, zkomprimujeme a převedeme na WebP
-        if ext in ['.jpg', '.jpeg', '.png', '.gif']:
-            img = Image.open(content)
-            output = BytesIO()
-            img.save(output, format='WEBP', quality=85)  # kvalita komprese
-            output.seek(0)
-
-            name = os.path.splitext(name)[0] + '.webp'
-            content = output
-
-        return super()._save(name, content)
-
 # Home Page model
 class HomePage(Page):
     intro = models.CharField(max_length=250, default='')
@@ -519,7 +499,7 @@ class Review(Page, SEOFields, index.Indexed):
     linked_game = models.ForeignKey(
         'Game', on_delete=models.SET_NULL, null=True, blank=True, related_name='linked_reviews'
     )
-    review_type = models.CharField(max_length=50, choices=REVIEW_TYPES, default='Game')
+    review_type = models.CharField(max_length=50, choices=REVIEW_TYPES, default='Game', db_index=True)
 
     content_panels = Page.content_panels + [
         FieldPanel('intro'),
@@ -627,6 +607,12 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_approved = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Schválené komentáře jedné stránky seřazené podle data (/api/comments/?page=<id>)
+            models.Index(fields=['page', 'is_approved', 'created_at'], name='comment_page_approved_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author} on {self.page.title}"
 
@@ -664,3 +650,54 @@ class Aktualita(models.Model):
         FieldPanel('text'),
         FieldPanel('is_active'),
     ]
+
+
+# Search document (api/search.py)
+class SearchDocument(models.Model):
+    """ Předpočítaný fulltextový dokument jedné publikované stránky (hra, článek, recenze) """
+    page = models.OneToOneField(Page, on_delete=models.CASCADE, related_name='search_document')
+    content_type = models.CharField(max_length=20, db_index=True)
+    title = models.CharField(max_length=255)
+    # Titulek bez diakritiky a malými písmeny pro trigramovou podobnost (překlepy)
+    title_normalized = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    main_image = models.ForeignKey(
+        'wagtailimages.Image',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+    search_vector = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='searchdocument_vector_idx'),
+            GinIndex(fields=['title_normalized'], name='searchdocument_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type}: {self.title}"
+
+
+# Related content (api/recommendations.py)
+class RelatedContent(models.Model):
+    """ Předpočítaný podobný obsah ke stránce ("mohlo by vás zajímat"), čte se jedním dotazem podle PK """
+    page = models.OneToOneField(Page, on_delete=models.CASCADE, primary_key=True, related_name='related_content')
+    content_type = models.CharField(max_length=20, db_index=True)
+    items = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Related to {self.content_type} {self.page_id}"
+
+
+# Write-behind counters (api/counters.py)
+class CounterFlush(models.Model):
+    """ Poslední zapsaná dávka čítačů (jediný řádek), aby se dávka po pádu před potvrzením nezapsala dvakrát """
+    last_flush_id = models.CharField(max_length=32, blank=True)
+    flushed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Counter flush {self.last_flush_id}"
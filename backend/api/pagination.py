@@ -0,0 +1,41 @@
+from rest_framework.pagination import CursorPagination # type: ignore
+from rest_framework.response import Response # type: ignore
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Cursor pagination that only kicks in when the client asks for it with
+    ``?page_size=`` or ``?cursor=``. Plain requests keep returning a bare list,
+    which is what the current frontend expects, in the cursor ordering and
+    capped at ``max_unpaginated`` items.
+
+    The bare list is deprecated: new clients should always send
+    ``?page_size=``, and the cap will drop to ``max_page_size`` once the
+    frontend pages its lists.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    max_unpaginated = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.unpaginated = self.cursor_query_param not in params and self.page_size_query_param not in params
+        if self.unpaginated:
+            return list(queryset.order_by(*self.ordering)[:self.max_unpaginated])
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.unpaginated:
+            return Response(data)
+        return super().get_paginated_response(data)
+
+
+class PublishedCursorPagination(OptionalCursorPagination):
+    """ Stránkování stránek (článků, recenzí, her) podle data publikace """
+    ordering = ('-first_published_at', '-pk')
+
+
+class CreatedCursorPagination(OptionalCursorPagination):
+    """ Stránkování komentářů podle data vytvoření """
+    ordering = ('-created_at', '-pk')
@@ -0,0 +1,128 @@
+"""
+Caching proxy for the PandaScore API (esport matches).
+
+Responses are cached per endpoint in the Django cache with their own TTL
+(running matches change every few seconds, past results rarely). Once an
+entry is older than its TTL it is still served while a single background
+thread refreshes it, so visitors never wait for PandaScore unless the cache
+is completely empty. All requests share one pooled ``requests.Session``.
+
+``PANDASCORE['BASE_URL']`` can point at a local fake server for testing.
+"""
+import logging
+import threading
+import time
+
+import requests # type: ignore
+from django.conf import settings # type: ignore
+from django.core.cache import cache # type: ignore
+from requests.adapters import HTTPAdapter # type: ignore
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'pandascore:{endpoint}'
+REFRESH_LOCK_KEY = 'pandascore:refresh:{endpoint}'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_config():
+    return settings.PANDASCORE
+
+
+def get_session():
+    """
+    Returns the shared HTTP session (keep-alive connections to PandaScore).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            config = get_config()
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {settings.PANDASCORE_API_KEY}",
+                "Accept": "application/json",
+            })
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=config.get('POOL_SIZE', 10))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+
+def get_ttl(endpoint):
+    config = get_config()
+    return config['TTL'].get(endpoint, config['DEFAULT_TTL'])
+
+
+def request(endpoint):
+    config = get_config()
+    url = f"{config['BASE_URL'].rstrip('/')}/{endpoint}"
+    response = get_session().get(url, timeout=config['TIMEOUT'])
+    response.raise_for_status()
+    return response.json()
+
+
+def refresh(endpoint):
+    """
+    Downloads the endpoint and stores it; keeps the entry for ``STALE_TTL``
+    so it can still be served if PandaScore is down.
+    """
+    data = request(endpoint)
+    try:
+        cache.set(
+            CACHE_KEY.format(endpoint=endpoint),
+            {'data': data, 'fetched_at': time.time()},
+            max(get_config()['STALE_TTL'], get_ttl(endpoint)),
+        )
+    except Exception as e:
+        logger.warning(f"PandaScore cache unavailable: {e}")
+    return data
+
+
+def _refresh_in_background(endpoint):
+    lock_key = REFRESH_LOCK_KEY.format(endpoint=endpoint)
+    # Jediný refresh na endpoint napříč workery
+    try:
+        if not cache.add(lock_key, 1, get_config()['TIMEOUT'] * 2):
+            return
+    except Exception as e:
+        logger.warning(f"PandaScore cache unavailable: {e}")
+        return
+
+    def run():
+        try:
+            refresh(endpoint)
+        except Exception as e:
+            logger.warning(f"PandaScore refresh of {endpoint} failed: {e}")
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception as e:
+                logger.warning(f"PandaScore cache unavailable: {e}")
+
+    threading.Thread(target=run, name=f"pandascore-refresh-{endpoint}", daemon=True).start()
+
+
+def fetch(endpoint):
+    """
+    Returns cached data for the endpoint, refreshing it in the background when
+    stale. Only an empty (or unavailable) cache makes the caller wait for
+    PandaScore.
+    """
+    try:
+        entry = cache.get(CACHE_KEY.format(endpoint=endpoint))
+    except Exception as e:
+        logger.warning(f"PandaScore cache unavailable: {e}")
+        entry = None
+    if entry is not None:
+        if time.time() - entry['fetched_at'] >= get_ttl(endpoint):
+            _refresh_in_background(endpoint)
+        return entry['data']
+
+    try:
+        return refresh(endpoint)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning(f"PandaScore request to {endpoint} failed: {e}")
+        return {"error": str(e)}
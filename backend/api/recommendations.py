@@ -0,0 +1,155 @@
+"""
+Offline content-similarity recommendations ("mohlo by vás zajímat").
+
+Games are encoded as sparse vectors of genres, platforms, developer and
+publisher, articles as vectors of categories, the linked game and that
+game's genres. Features are IDF-weighted (a platform every game has says
+little) and rows L2-normalised, so ``X @ X.T`` is the cosine similarity.
+Neighbours are computed in row chunks with scipy, keeping only the top
+``K`` per row via ``argpartition``, so memory stays ``CHUNK_SIZE x n``.
+
+The ``build_recommendations`` command stores the result as one
+``RelatedContent`` row per page; ``/api/games/<id>/related/`` and
+``/api/posts/<id>/related/`` read it with a single primary-key lookup.
+"""
+from collections import namedtuple
+
+import numpy as np # type: ignore
+from django.conf import settings # type: ignore
+from django.db import transaction # type: ignore
+from scipy import sparse # type: ignore
+
+from .models import BlogPost, Game, RelatedContent
+
+Encoded = namedtuple('Encoded', ['pages', 'matrix'])
+
+
+def get_config():
+    return settings.RECOMMENDATIONS
+
+
+def encode(rows):
+    """
+    ``rows`` is a list of ``{feature: weight}``; returns a CSR matrix with
+    IDF-weighted, L2-normalised rows.
+    """
+    vocabulary = {}
+    data, indices, indptr = [], [], [0]
+    for features in rows:
+        for feature, weight in features.items():
+            indices.append(vocabulary.setdefault(feature, len(vocabulary)))
+            data.append(weight)
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(vocabulary)), dtype=np.float64)
+
+    if matrix.shape[0] and matrix.shape[1]:
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + matrix.shape[0]) / (1 + document_frequency)) + 1
+        matrix = matrix @ sparse.diags(idf)
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        norms[norms == 0] = 1
+        matrix = sparse.diags(1 / norms) @ matrix
+    return matrix.tocsr()
+
+
+def encode_games():
+    weights = get_config()['GAME_WEIGHTS']
+    games = list(
+        Game.objects.live().select_related('main_image').prefetch_related('genres', 'platforms').order_by('pk')
+    )
+    rows = []
+    for game in games:
+        features = {('genre', genre.pk): weights['genre'] for genre in game.genres.all()}
+        features.update({('platform', platform.pk): weights['platform'] for platform in game.platforms.all()})
+        if game.developer_id:
+            features[('developer', game.developer_id)] = weights['developer']
+        if game.publisher_id:
+            features[('publisher', game.publisher_id)] = weights['publisher']
+        rows.append(features)
+    return Encoded(games, encode(rows))
+
+
+def encode_posts():
+    weights = get_config()['POST_WEIGHTS']
+    posts = list(
+        BlogPost.objects.live().select_related('main_image').prefetch_related('categories', 'linked_game__genres').order_by('pk')
+    )
+    rows = []
+    for post in posts:
+        features = {('category', category.pk): weights['category'] for category in post.categories.all()}
+        if post.linked_game_id:
+            features[('game', post.linked_game_id)] = weights['linked_game']
+            features.update({('genre', genre.pk): weights['linked_game_genre'] for genre in post.linked_game.genres.all()})
+        rows.append(features)
+    return Encoded(posts, encode(rows))
+
+
+def nearest_neighbours(matrix, k, chunk_size):
+    """
+    Yields ``(row, [(neighbour row, similarity)])`` for every row, most
+    similar first, without the row itself and without zero similarities.
+    """
+    count = min(k, matrix.shape[0] - 1)
+    for start in range(0, matrix.shape[0], chunk_size):
+        # Řídká x hustý blok (features x CHUNK) je výrazně rychlejší než řídká x řídká s hustým výsledkem
+        similarities = np.ascontiguousarray((matrix @ matrix[start:start + chunk_size].T.toarray()).T)
+        rows = np.arange(similarities.shape[0])
+        similarities[rows, start + rows] = 0  # sám sebe nedoporučujeme
+        if count <= 0:
+            for row in rows:
+                yield start + row, []
+            continue
+
+        # Top-k celého bloku naráz, seřazené podle podobnosti (při shodě podle pořadí)
+        top = np.argpartition(similarities, -count, axis=1)[:, -count:]
+        scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.lexsort((top, -scores), axis=1)
+        top, scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(scores, order, axis=1)
+        for row in rows:
+            yield start + row, [
+                (int(index), float(score)) for index, score in zip(top[row], scores[row]) if score > 0
+            ]
+
+
+def item_data(page, score):
+    return {
+        'id': page.pk,
+        'title': page.title,
+        'slug': page.slug,
+        'main_image': page.main_image.file.url if page.main_image else None,
+        'score': round(score, 4),
+    }
+
+
+def build(content_type, encoded):
+    """
+    Computes and stores neighbours for every page of ``encoded``. Returns
+    the number of pages with at least one recommendation.
+    """
+    config = get_config()
+    pages = encoded.pages
+    related = [
+        RelatedContent(
+            page_id=pages[row].pk,
+            content_type=content_type,
+            items=[item_data(pages[index], score) for index, score in neighbours],
+        )
+        for row, neighbours in nearest_neighbours(encoded.matrix, config['K'], config['CHUNK_SIZE'])
+    ]
+    with transaction.atomic():
+        # Nahradíme celou sadu typu, stránky, které už nejsou živé, tím vypadnou
+        RelatedContent.objects.filter(content_type=content_type).delete()
+        RelatedContent.objects.bulk_create(related, batch_size=1000)
+    return sum(1 for item in related if item.items)
+
+
+def build_all():
+    return {
+        'game': build('game', encode_games()),
+        'article': build('article', encode_posts()),
+    }
+
+
+def related(page_id):
+    """ Stored recommendations of a page, one primary-key lookup """
+    return RelatedContent.objects.filter(pk=page_id).values_list('items', flat=True).first() or []
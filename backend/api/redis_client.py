@@ -0,0 +1,14 @@
+import redis # type: ignore
+from django.conf import settings # type: ignore
+
+_client = None
+
+
+def get_redis():
+    """
+    Returns the shared Redis client (one connection pool per process).
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
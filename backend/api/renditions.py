@@ -0,0 +1,83 @@
+"""
+Rendition specs used by the API and feeds, pre-generated in the background.
+
+``RENDITION_SPECS`` (settings) names every rendition the public endpoints
+serve. They are generated when an image is uploaded or a page with a
+``main_image`` is published (see ``signals.py``) and by the
+``warm_renditions`` command for existing images. Request code only looks
+renditions up with ``find()`` / ``url()``; a missing one falls back to the
+original file and is queued for generation, so no request ever resizes an
+image.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings # type: ignore
+from django.db import close_old_connections, transaction # type: ignore
+from wagtail.images import get_image_model # type: ignore
+from wagtail.images.models import Filter # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_specs():
+    return settings.RENDITION_SPECS
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='renditions')
+    return _executor
+
+
+def warm(image):
+    """
+    Generates all registered renditions of ``image`` that do not exist yet.
+    """
+    image.get_renditions(*dict.fromkeys(get_specs().values()))
+
+
+def _warm_by_id(image_id):
+    close_old_connections()
+    try:
+        image = get_image_model().objects.filter(pk=image_id).first()
+        if image is not None:
+            warm(image)
+    except Exception as e:
+        logger.error(f"Generating renditions of image {image_id} failed: {e}")
+    finally:
+        close_old_connections()
+
+
+def warm_in_background(image_id):
+    """
+    Generates renditions in a background thread once the current
+    transaction commits.
+    """
+    if image_id:
+        transaction.on_commit(lambda: get_executor().submit(_warm_by_id, image_id))
+
+
+def find(image, name):
+    """
+    Returns the registered rendition ``name`` of ``image`` if it exists;
+    never generates it, a missing one is queued and ``None`` returned.
+    """
+    Rendition = image.get_rendition_model()
+    try:
+        return image.find_existing_rendition(Filter(spec=get_specs()[name]))
+    except Rendition.DoesNotExist:
+        warm_in_background(image.pk)
+        return None
+
+
+def url(image, name):
+    """
+    URL of the registered rendition ``name`` of ``image``, falling back to
+    the original file until the rendition is generated.
+    """
+    rendition = find(image, name)
+    return rendition.url if rendition else image.file.url
@@ -0,0 +1,194 @@
+"""
+Response cache for the read endpoints with dependency tags.
+
+Every cached response remembers the versions of the tags it depends on
+(``api.blogpost`` for lists, ``api.blogpost:12`` for a detail, ``esport``,
+snippet labels, ...). Publishing, unpublishing or deleting content bumps the
+versions of its tags (see ``signals.py``), which invalidates exactly the
+responses built from it. A lookup is one ``get_many`` for the entry and its
+tag versions.
+
+Responses are cached without pending counter deltas; those are merged on
+every read (``api.counters``), and a counter flush bumps the tags of the
+flushed objects.
+"""
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings # type: ignore
+from django.core.cache import cache # type: ignore
+from rest_framework.response import Response # type: ignore
+
+from . import counters, db_routing
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'response:{digest}'
+TAG_KEY = 'response_tag:{tag}'
+
+ESPORT_TAG = 'esport'
+
+# Snippety, které se vykreslují uvnitř stránek (model label -> na čem závisí)
+BLOGPOST_DEPENDENCIES = ('api.articlecategory', 'api.advertisement')
+GAME_DEPENDENCIES = ('api.genre', 'api.platform', 'api.developer', 'api.publisher')
+
+
+def object_tag(label, pk):
+    return f"{label}:{pk}"
+
+
+def tags_for(instance):
+    """
+    Tags to bump when ``instance`` changes: its model (lists), the object
+    itself and the pages that embed it.
+    """
+    label = instance._meta.label_lower
+    tags = [label, object_tag(label, instance.pk)]
+    linked_game_id = getattr(instance, 'linked_game_id', None)
+    if linked_game_id:
+        # Detail i karty her obsahují propojené články a recenze
+        tags += ['api.game', object_tag('api.game', linked_game_id)]
+    if label == 'api.blogpost' and instance.pk and instance.categories.filter(name__iexact="Esport").exists():
+        tags.append(ESPORT_TAG)
+    return tags
+
+
+def request_key(request):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    digest = hashlib.sha1(f"{request.path}?{query}".encode()).hexdigest()
+    return CACHE_KEY.format(digest=digest)
+
+
+def new_version():
+    return time.time_ns()
+
+
+def tag_versions(tags, found):
+    """
+    Returns the current versions of ``tags``; unknown tags are initialised so
+    that an evicted tag can never match an old entry.
+    """
+    keys = [TAG_KEY.format(tag=tag) for tag in tags]
+    missing = [key for key in keys if found.get(key) is None]
+    if missing:
+        for key in missing:
+            cache.add(key, new_version(), None)
+        found = {**found, **cache.get_many(missing)}
+    return [found.get(key) for key in keys]
+
+
+def get_versions(tags):
+    if not tags:
+        return []
+    try:
+        return tag_versions(tags, cache.get_many([TAG_KEY.format(tag=tag) for tag in tags]))
+    except Exception as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return [None] * len(tags)
+
+
+def recently_invalidated(versions):
+    """ Whether a tag changed within the replica lag window """
+    threshold = new_version() - db_routing.get_config()['PIN_SECONDS'] * 10**9
+    return any(version is not None and version > threshold for version in versions)
+
+
+def overlay(model, data):
+    if model is None:
+        return data
+    if isinstance(data, dict) and 'results' in data:
+        counters.overlay_rows(model, data['results'])
+    elif isinstance(data, list):
+        counters.overlay_rows(model, data)
+    elif isinstance(data, dict) and 'id' in data:
+        counters.overlay_rows(model, [data])
+    return data
+
+
+def cached(request, tags, build, model=None):
+    """
+    Returns the cached response for ``request`` or ``build()``'s response,
+    storing it when successful. ``model`` gets pending counters overlaid.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return build()
+
+    key = request_key(request)
+    tag_keys = [TAG_KEY.format(tag=tag) for tag in tags]
+    try:
+        found = cache.get_many([key] + tag_keys)
+        versions = tag_versions(tags, found)
+    except Exception as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return build()
+
+    entry = found.get(key)
+    if entry is not None and entry['versions'] == versions:
+        return Response(overlay(model, entry['data']))
+
+    if recently_invalidated(versions):
+        # Replika ještě nemusí mít publikovanou změnu a stará data by zůstala v cache
+        with db_routing.use_primary():
+            response = build()
+    else:
+        response = build()
+    if response.status_code == 200:
+        try:
+            cache.set(key, {'versions': versions, 'data': response.data}, settings.RESPONSE_CACHE['TIMEOUT'])
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {e}")
+        overlay(model, response.data)
+    return response
+
+
+def invalidate(tags):
+    tags = set(tags)
+    if not tags:
+        return
+    version = new_version()
+    try:
+        cache.set_many({TAG_KEY.format(tag=tag): version for tag in tags}, None)
+    except Exception as e:
+        logger.error(f"Response cache invalidation failed for {sorted(tags)}: {e}")
+
+
+class CachedResponseMixin:
+    """
+    Caches ``list`` and ``retrieve`` of a viewset. Lists depend on the model
+    tag, details on the object tag; ``cache_dependencies`` adds tags of
+    snippets rendered inside the response.
+
+    Serializers must be given ``overlay_counters=False`` (done in
+    ``get_serializer_context``) so that cached data holds persisted values only.
+    """
+
+    cache_dependencies = ()
+
+    @property
+    def cache_model(self):
+        return self.queryset.model
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['overlay_counters'] = False
+        return context
+
+    def counter_model(self):
+        return self.cache_model if self.cache_model._meta.label_lower in counters.COUNTER_FIELDS else None
+
+    def list_cache_tags(self):
+        return (self.cache_model._meta.label_lower, *self.cache_dependencies)
+
+    def detail_cache_tags(self, pk):
+        return (object_tag(self.cache_model._meta.label_lower, pk), *self.cache_dependencies)
+
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        return cached(request, self.list_cache_tags(), lambda: build(request, *args, **kwargs), self.counter_model())
+
+    def retrieve(self, request, *args, **kwargs):
+        build = super().retrieve
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return cached(request, self.detail_cache_tags(pk), lambda: build(request, *args, **kwargs), self.counter_model())
@@ -0,0 +1,159 @@
+"""
+Full-text search across games, articles and reviews.
+
+Every live page has one ``SearchDocument`` with plain text extracted from its
+fields and a precomputed, GIN-indexed ``tsvector`` (title A, intro and
+metadata B, body C) in the ``czech_unaccent`` configuration. Documents are
+rebuilt on ``page_published`` and removed on unpublish (see ``signals.py``);
+the ``rebuild_search_index`` command indexes existing content.
+
+A query matches the vector (``websearch_to_tsquery``) or, for typos, the
+trigram index on the unaccented title. Results are ranked by ``ts_rank``
+plus weighted title similarity and come with ``<mark>`` highlighted
+snippets. Highlights are HTML: the title and the stored body are escaped, so
+``<mark>`` is the only markup in them.
+"""
+import html
+import unicodedata
+
+from django.conf import settings # type: ignore
+from django.contrib.postgres.search import ( # type: ignore
+    SearchHeadline, SearchQuery, SearchRank, SearchVector, TrigramSimilarity,
+)
+from django.db import connection # type: ignore
+from django.db.models import F, Q, Value # type: ignore
+from django.db.models.functions import Replace # type: ignore
+from django.utils.html import escape, strip_tags # type: ignore
+
+from .models import BlogPost, Game, Review, SearchDocument
+
+# Typ obsahu ve výsledcích -> model
+CONTENT_MODELS = {
+    'game': Game,
+    'article': BlogPost,
+    'review': Review,
+}
+
+
+def get_config():
+    return settings.SEARCH
+
+
+def normalize(text):
+    """ Malá písmena bez diakritiky ("Zaklínač" -> "zaklinac") """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def plain_text(value):
+    value = getattr(value, 'source', value)
+    return ' '.join(html.unescape(strip_tags(value or '')).split())
+
+
+def escaped(field):
+    """ SQL counterpart of ``escape`` for text shown in highlights """
+    expression = F(field)
+    for char, entity in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;')):
+        expression = Replace(expression, Value(char), Value(entity))
+    return expression
+
+
+def content_type_of(page):
+    for content_type, model in CONTENT_MODELS.items():
+        if isinstance(page, model):
+            return content_type
+    return None
+
+
+def extract_game(game):
+    meta = [game.developer, game.publisher, *game.genres.all(), *game.platforms.all()]
+    return ' '.join(str(item) for item in meta if item), plain_text(game.description)
+
+
+def extract_article(post):
+    paragraphs = [block.value for block in post.body if block.block_type == 'paragraph']
+    meta = [post.intro, *(category.name for category in post.categories.all())]
+    return ' '.join(meta), ' '.join(plain_text(paragraph) for paragraph in paragraphs)
+
+
+def extract_review(review):
+    parts = [plain_text(review.body)]
+    parts += [plain_text(attribute.text) for attribute in review.attributes.all()]
+    parts += [item.text for item in (*review.pros.all(), *review.cons.all())]
+    return review.intro, ' '.join(part for part in parts if part)
+
+
+# Vazby čtené extraktory (rebuild_search_index je načte dávkově)
+PREFETCH = {
+    Game: ('developer', 'publisher', 'genres', 'platforms'),
+    BlogPost: ('categories',),
+    Review: ('attributes', 'pros', 'cons'),
+}
+
+EXTRACTORS = {
+    'game': extract_game,
+    'article': extract_article,
+    'review': extract_review,
+}
+
+
+def search_vector(title, meta, body):
+    config = get_config()['CONFIG']
+    return (
+        SearchVector(Value(title), weight='A', config=config)
+        + SearchVector(Value(meta), weight='B', config=config)
+        + SearchVector(Value(body), weight='C', config=config)
+    )
+
+
+def index_page(page):
+    """
+    Creates or refreshes the search document of a live game, article or review.
+    """
+    page = page.specific
+    content_type = content_type_of(page)
+    if content_type is None:
+        return None
+
+    meta, body = EXTRACTORS[content_type](page)
+    document, _ = SearchDocument.objects.update_or_create(page_id=page.pk, defaults={
+        'content_type': content_type,
+        'title': page.title,
+        'title_normalized': normalize(page.title),
+        'body': escape(body),  # jen pro úryvky, ts_headline vrací text beze změny
+        'main_image_id': page.main_image_id,
+    })
+    if connection.vendor == 'postgresql':
+        # Vektor počítá databáze, aby odpovídal konfiguraci použité v dotazu
+        SearchDocument.objects.filter(pk=document.pk).update(search_vector=search_vector(page.title, meta, body))
+    return document
+
+
+def remove_page(page):
+    SearchDocument.objects.filter(page_id=page.pk).delete()
+
+
+def search(query, content_types=None, limit=None):
+    """
+    Returns the best matching documents annotated with ``rank``,
+    ``title_highlight`` and ``snippet``.
+    """
+    config = get_config()
+    limit = max(1, min(limit or config['LIMIT'], config['MAX_LIMIT']))
+    ts_query = SearchQuery(query, config=config['CONFIG'], search_type='websearch')
+    normalized = normalize(query)
+
+    documents = SearchDocument.objects.filter(
+        Q(search_vector=ts_query) | Q(title_normalized__trigram_similar=normalized)
+    )
+    if content_types:
+        documents = documents.filter(content_type__in=content_types)
+
+    highlight = {'start_sel': '<mark>', 'stop_sel': '</mark>', 'config': config['CONFIG']}
+    # Postgres počítá headline (nejdražší část) až pro řádky po ORDER BY ... LIMIT
+    return list(documents.annotate(
+        rank=SearchRank(F('search_vector'), ts_query)
+        + config['TRIGRAM_WEIGHT'] * TrigramSimilarity('title_normalized', normalized),
+        title_highlight=SearchHeadline(escaped('title'), ts_query, highlight_all=True, **highlight),
+        snippet=SearchHeadline('body', ts_query, max_words=config['SNIPPET_WORDS'], min_words=10, **highlight),
+    ).defer('body', 'search_vector').select_related('page', 'main_image').order_by('-rank', 'pk')[:limit])
@@ -0,0 +1,121 @@
+"""
+Time-bucketed game search statistics ("nejhledanější hry").
+
+Every search is one pipelined round trip: ``ZINCRBY`` into the current hourly
+bucket ``searches:hour:<hour>`` and into the sliding window sorted sets
+``searches:window:<24h|7d|30d>``; the Wagtail page row is never written.
+Once per hour the roll script (Lua, atomic) rebuilds each window from the
+hourly buckets it still covers, so searches older than the window drop out.
+Top-N for any window is a single ``ZREVRANGE`` of its precomputed set.
+"""
+import time
+
+from .redis_client import get_redis
+
+HOUR_KEY = 'searches:hour:{hour}'
+WINDOW_KEY = 'searches:window:{window}'
+ROLLED_KEY = 'searches:rolled_hour'
+
+# Okno -> počet hodinových bucketů
+WINDOWS = {
+    '24h': 24,
+    '7d': 7 * 24,
+    '30d': 30 * 24,
+}
+DEFAULT_WINDOW = '7d'
+
+# Buckety musí přežít nejdelší okno (+ rezerva na opožděné přepočítání)
+BUCKET_TTL = (max(WINDOWS.values()) + 2) * 3600
+
+# ARGV: current hour, bucket key prefix, then (window key, hours) pairs
+ROLL_SCRIPT = """
+local unpack = unpack or table.unpack
+local now = tonumber(ARGV[1])
+local rolled = tonumber(redis.call('GET', KEYS[1]) or '-1')
+if rolled >= now then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    local buckets = {}
+    for hour = now - tonumber(ARGV[i + 1]) + 1, now do
+        local bucket = ARGV[2] .. hour
+        if redis.call('EXISTS', bucket) == 1 then
+            table.insert(buckets, bucket)
+        end
+    end
+    if #buckets > 0 then
+        redis.call('ZUNIONSTORE', ARGV[i], #buckets, unpack(buckets))
+    else
+        redis.call('DEL', ARGV[i])
+    end
+end
+redis.call('SET', KEYS[1], now)
+return 1
+"""
+
+_script = None
+
+
+def current_hour():
+    return int(time.time() // 3600)
+
+
+def _roll(client):
+    """ Rebuilds the windows if the hour changed since the last roll """
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(ROLL_SCRIPT)
+    args = [current_hour(), HOUR_KEY.format(hour='')]
+    for window, hours in WINDOWS.items():
+        args += [WINDOW_KEY.format(window=window), hours]
+    return _script(keys=[ROLLED_KEY], args=args, client=client)
+
+
+def record(game_id):
+    """
+    Records one search of ``game_id`` and returns its count in every window.
+    """
+    client = get_redis()
+    bucket = HOUR_KEY.format(hour=current_hour())
+    pipe = client.pipeline(transaction=False)
+    _roll(pipe)
+    pipe.zincrby(bucket, 1, game_id)
+    pipe.expire(bucket, BUCKET_TTL)
+    for window in WINDOWS:
+        pipe.zincrby(WINDOW_KEY.format(window=window), 1, game_id)
+    results = pipe.execute()
+    return {window: int(count) for window, count in zip(WINDOWS, results[3:])}
+
+
+def top(window=DEFAULT_WINDOW, limit=10):
+    """
+    Returns ``[(game_id, searches)]`` for ``window``, most searched first.
+    """
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    _roll(pipe)
+    pipe.zrevrange(WINDOW_KEY.format(window=window), 0, limit - 1, withscores=True)
+    return [(int(game_id), int(count)) for game_id, count in pipe.execute()[-1]]
+
+
+def scores(window=DEFAULT_WINDOW):
+    """ ``{game_id: searches}`` of every game searched in ``window`` """
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    _roll(pipe)
+    pipe.zrange(WINDOW_KEY.format(window=window), 0, -1, withscores=True)
+    return {int(game_id): int(count) for game_id, count in pipe.execute()[-1]}
+
+
+def counts(game_ids, window=DEFAULT_WINDOW):
+    """ ``{game_id: searches}`` in ``window`` for the given games (one round trip) """
+    game_ids = list(game_ids)
+    if not game_ids:
+        return {}
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    _roll(pipe)
+    key = WINDOW_KEY.format(window=window)
+    for game_id in game_ids:
+        pipe.zscore(key, game_id)
+    return {game_id: int(count or 0) for game_id, count in zip(game_ids, pipe.execute()[1:])}
@@ -1,10 +1,14 @@
 import re
+from django.db.models import Prefetch # type: ignore
 from rest_framework import serializers # type: ignore
 from wagtail.images.models import Image # type: ignore
-from bs4 import BeautifulSoup # type: ignore
 from django.contrib.auth import get_user_model # type: ignore
 from wagtail.users.models import UserProfile # type: ignore
 from .models import ContestEntry
+from . import counters
+from . import enrichment
+from .enrichment import RichTextEnricher
+from .filters import query_param_list
 
 User = get_user_model()
 
@@ -47,8 +51,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return [group for group in obj.groups.values_list("name", flat=True) if group not in excluded_groups]
 
     def get_latest_posts(self, obj):
-        latest_blog_posts = BlogPost.objects.filter(owner=obj, live=True).order_by("-first_published_at")[:5]
-        latest_reviews = Review.objects.filter(owner=obj, live=True).order_by("-first_published_at")[:5]
+        latest_blog_posts = BlogPost.objects.filter(owner=obj, live=True).select_related("main_image").order_by("-first_published_at")[:5]
+        latest_reviews = Review.objects.filter(owner=obj, live=True).select_related("main_image").order_by("-first_published_at")[:5]
         
         all_posts = list(latest_blog_posts) + list(latest_reviews)
         all_posts.sort(key=lambda post: post.first_published_at, reverse=True)  # Seřazení podle data publikace
@@ -121,7 +125,83 @@ class PublisherSerializer(serializers.ModelSerializer):
         model = Publisher
         fields = ('id', 'name')
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class ContentListSerializer(serializers.ListSerializer):
+    """
+    Seznam stránek: nejdřív posbírá obrázky z rich textu všech položek (jeden
+    dotaz), pak serializuje a nakonec doplní čekající přírůstky čítačů jedním
+    dotazem do Redisu.
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if hasattr(data, 'all') else data)
+        self.child.prepare(instances)
+        items = super().to_representation(instances)
+        if not self.context.get('overlay_counters', True):
+            return items  # doplní až response cache (api.response_cache)
+        return counters.overlay_many(instances, items)
+
+
+class ContentSerializerMixin:
+    """
+    Společný základ pro BlogPost/Review/Game: obohacený rich text z cache
+    (api.enrichment), sdílený RichTextEnricher pro stránky mimo cache a
+    like/dislike/read čítače včetně přírůstků, které ještě nejsou v DB.
+    """
+
+    enriched_fields = ()  # pole, která čtou obohacený rich text
+
+    @property
+    def enricher(self):
+        return self.context.setdefault('enricher', RichTextEnricher())
+
+    @property
+    def enriched_entries(self):
+        return self.context.setdefault('enriched_parts', {})
+
+    def get_rich_text(self, obj):
+        """ Vrací všechny rich-text fragmenty objektu, které se budou obohacovat """
+        return []
+
+    def collect(self, instances):
+        """
+        Načte obohacený obsah z cache a posbírá obrázky stránek, které v ní
+        nejsou – včetně vnořených seznamů (např. články propojené se hrou).
+        """
+        if any(name in self.fields for name in self.enriched_fields):
+            entries = self.enriched_entries
+            missing = [i for i in instances if (i._meta.label_lower, i.pk) not in entries]
+            entries.update(enrichment.get_cached_many(missing))
+            for instance in missing:
+                if (instance._meta.label_lower, instance.pk) not in entries:
+                    self.enricher.collect(*self.get_rich_text(instance))
+
+        for field in self.fields.values():
+            if isinstance(field, ContentListSerializer):
+                field.child.collect([item for i in instances for item in getattr(i, field.source).all()])
+
+    def prepare(self, instances):
+        self.collect(instances)
+        self.enricher.resolve()
+
+    def get_enriched_parts(self, obj):
+        key = (obj._meta.label_lower, obj.pk)
+        entries = self.enriched_entries
+        if key not in entries:
+            entries[key] = enrichment.build(obj, self.enricher)
+        return entries[key]
+
+    def to_representation(self, instance):
+        if isinstance(self.parent, ContentListSerializer):
+            return super().to_representation(instance)  # seznam připraví a doplní čítače hromadně
+        self.prepare([instance])
+        item = super().to_representation(instance)
+        if not self.context.get('overlay_counters', True):
+            return item
+        return counters.overlay(instance, item)
+
+
+class BlogPostSerializer(ContentSerializerMixin, serializers.ModelSerializer):
+    enriched_fields = ('enriched_body',)
     enriched_body = serializers.SerializerMethodField()
     main_image = serializers.SerializerMethodField()  # Přidáme vlastní pole pro `main_image`
     categories = serializers.SerializerMethodField()  # Přidáme vlastní pole pro kategorie
@@ -131,6 +211,12 @@ class BlogPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = BlogPost
         fields = '__all__'  # Zachová všechna pole z modelu BlogPost + enriched_body, main_image, categories, owner a url_path
+        list_serializer_class = ContentListSerializer
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """ Relace, které serializer čte u každého článku (jinak dotaz na řádek) """
+        return queryset.select_related('owner', 'main_image').prefetch_related('categories')
 
     def get_url_path(self, obj):
         # Úprava url_path odstraněním slova "superpařmeni"
@@ -139,10 +225,10 @@ class BlogPostSerializer(serializers.ModelSerializer):
     def get_enriched_body(self, obj):
         body_content = []
     
-        for block in obj.body:  # Iterujeme přes StreamField obsah
+        enriched_paragraphs = self.get_enriched_parts(obj)['body']
+        for index, block in enumerate(obj.body):  # Iterujeme přes StreamField obsah
             if block.block_type == 'paragraph':
-                enriched_value = self.replace_embed_with_url(block.value)
-                body_content.append(enriched_value)
+                body_content.append(enriched_paragraphs[index])
 
             elif block.block_type == 'advertisement':  
                 ad_data = block.value.get("advertisement")
@@ -164,19 +250,8 @@ class BlogPostSerializer(serializers.ModelSerializer):
     
         return body_content
 
-    def replace_embed_with_url(self, value):
-        # Implementace pro manipulaci s HTML
-        if hasattr(value, 'source'):
-            value = value.source
-        soup = BeautifulSoup(value, 'html.parser')
-        for embed_tag in soup.find_all('embed', {'embedtype': 'image'}):
-            image_id = embed_tag.get('id')
-            try:
-                image = Image.objects.get(pk=image_id)
-                embed_tag.replace_with(f'<img src="{image.file.url}" alt="{embed_tag.get("alt", "")}" />')
-            except Image.DoesNotExist:
-                embed_tag.replace_with('[Image not found]')
-        return str(soup)
+    def get_rich_text(self, obj):
+        return [block.value for block in obj.body if block.block_type == 'paragraph']
 
     def get_main_image(self, obj):
         # Vrátí objekt s `id` a `url` pro main_image
@@ -212,29 +287,15 @@ class ReviewAttributeSerializer(serializers.ModelSerializer):
         fields = ['name', 'score', 'text', 'enriched_text']
 
     def get_enriched_text(self, obj):
+        # Obohacený text je součástí cache recenze, ke které atribut patří
+        review_parts = self.context.get('enriched_parts', {}).get(('api.review', obj.review_id))
+        if review_parts and obj.pk in review_parts['attributes']:
+            return review_parts['attributes'][obj.pk]
         return self.enrich_text(obj.text)
 
     def enrich_text(self, value):
-        # Zpracování HTML obsahu a náhrada embed tagů
-        if hasattr(value, 'source'):
-            value = value.source
-        soup = BeautifulSoup(value, 'html.parser')
-        for embed_tag in soup.find_all('embed', {'embedtype': 'image'}):
-            image_id = embed_tag.get('id')
-            try:
-                image = Image.objects.get(pk=image_id)
-                embed_tag.replace_with(f'<img src="{image.file.url}" alt="{embed_tag.get("alt", "")}" />')
-            except Image.DoesNotExist:
-                embed_tag.replace_with('[Image not found]')
-        for embed_tag in soup.find_all('embed', {'embedtype': 'media'}):
-            embed_url = embed_tag.get('url')
-            if embed_url and 'youtube.com' in embed_url:
-                video_id = embed_url.split('v=')[-1]
-                embed_tag.replace_with(
-                    f'<iframe width="560" height="315" src="https://www.youtube.com/embed/{video_id}" '
-                    f'frameborder="0" allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" allowfullscreen></iframe>'
-                )
-        return str(soup)
+        # Zpracování HTML obsahu a náhrada embed tagů (obrázky jsou načtené hromadně)
+        return self.context.setdefault('enricher', RichTextEnricher()).enrich(value)
 
 class ProSerializer(serializers.ModelSerializer):
     class Meta:
@@ -246,7 +307,8 @@ class ConSerializer(serializers.ModelSerializer):
         model = Con
         fields = ['text']
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(ContentSerializerMixin, serializers.ModelSerializer):
+    enriched_fields = ('enriched_body', 'attributes')
     main_image = serializers.SerializerMethodField()
     enriched_body = serializers.SerializerMethodField()
     attributes = ReviewAttributeSerializer(many=True, read_only=True)
@@ -258,6 +320,12 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
+        list_serializer_class = ContentListSerializer
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """ Relace, které serializer čte u každé recenze (jinak dotaz na řádek) """
+        return queryset.select_related('owner', 'main_image').prefetch_related('attributes', 'pros', 'cons')
 
     def get_url_path(self, obj):
         # Úprava url_path odstraněním slova "superpařmeni"
@@ -271,31 +339,14 @@ class ReviewSerializer(serializers.ModelSerializer):
             }
         return None
 
+    def get_rich_text(self, obj):
+        return [obj.body] + [attribute.text for attribute in obj.attributes.all()]
+
     def get_enriched_body(self, obj):
-        if hasattr(obj.body, 'source'):
-            body_content = obj.body.source
-        else:
-            body_content = obj.body
-        return self.enrich_text(body_content)
+        return self.get_enriched_parts(obj)['body']
 
     def enrich_text(self, value):
-        soup = BeautifulSoup(value, 'html.parser')
-        for embed_tag in soup.find_all('embed', {'embedtype': 'image'}):
-            image_id = embed_tag.get('id')
-            try:
-                image = Image.objects.get(pk=image_id)
-                embed_tag.replace_with(f'<img src="{image.file.url}" alt="{embed_tag.get("alt", "")}" />')
-            except Image.DoesNotExist:
-                embed_tag.replace_with('[Image not found]')
-        for embed_tag in soup.find_all('embed', {'embedtype': 'media'}):
-            embed_url = embed_tag.get('url')
-            if embed_url and 'youtube.com' in embed_url:
-                video_id = embed_url.split('v=')[-1]
-                embed_tag.replace_with(
-                    f'<iframe width="560" height="315" src="https://www.youtube.com/embed/{video_id}" '
-                    f'frameborder="0" allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" allowfullscreen></iframe>'
-                )
-        return str(soup)
+        return self.enricher.enrich(value)
 
     def get_owner(self, obj):
         # Vrací informace o ownerovi stejným způsobem jako v BlogPostSerializer
@@ -310,7 +361,40 @@ class ReviewSerializer(serializers.ModelSerializer):
         return None
 
 
-class GameSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    ``?fields=id,title`` omezí výstup na vybraná pole a ``?expand=linked_reviews``
+    nahradí kompaktní vnořenou relaci plnou reprezentací (viz ``expandable_fields``).
+    Platí jen pro serializer, který dostal request v kontextu (tj. z viewsetu).
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+
+        for name in query_param_list(request, 'expand'):
+            if name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[name]
+                self.fields[name] = serializer_class(read_only=True, **options)
+
+        requested = query_param_list(request, 'fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class LinkedPageSerializer(serializers.Serializer):
+    """ Kompaktní odkaz na propojený článek nebo recenzi """
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    slug = serializers.CharField(read_only=True)
+
+
+class GameSerializer(SparseFieldsetMixin, ContentSerializerMixin, serializers.ModelSerializer):
+    enriched_fields = ('enriched_description',)
     main_image = ImageSerializer(read_only=True)
     genres = GenreSerializer(many=True, read_only=True)
     platforms = PlatformSerializer(many=True, read_only=True)
@@ -324,44 +408,71 @@ class GameSerializer(serializers.ModelSerializer):
     class Meta:
         model = Game
         fields = '__all__'
+        list_serializer_class = ContentListSerializer
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """ Hra včetně celých propojených článků a recenzí """
+        return queryset.select_related('developer', 'publisher', 'main_image').prefetch_related(
+            'genres',
+            'platforms',
+            Prefetch('linked_blog_posts', queryset=BlogPostSerializer.setup_eager_loading(BlogPost.objects.all())),
+            Prefetch('linked_reviews', queryset=ReviewSerializer.setup_eager_loading(Review.objects.all())),
+        )
 
     def get_url_path(self, obj):
         # Úprava url_path odstraněním slova "superpařmeni"
         return obj.url_path.replace('/superpařmeni', '')
 
+    def get_rich_text(self, obj):
+        return [obj.description]
+
     def get_enriched_description(self, obj):
-        def process_embed_tags(value):
-            soup = BeautifulSoup(value, 'html.parser')
-            for embed_tag in soup.find_all('embed', {'embedtype': 'image'}):
-                image_id = embed_tag.get('id')
-                try:
-                    image = Image.objects.get(pk=image_id)
-                    img_tag = soup.new_tag('img', src=image.file.url, alt=embed_tag.get('alt', ''))
-                    embed_tag.replace_with(img_tag)
-                except Image.DoesNotExist:
-                    embed_tag.replace_with('[Image not found]')
-            for embed_tag in soup.find_all('embed', {'embedtype': 'media'}):
-                media_url = embed_tag.get('url')
-                if media_url:
-                    if "youtube.com" in media_url or "youtu.be" in media_url:
-                        if "youtube.com" in media_url:
-                            video_id = media_url.split('v=')[-1].split('&')[0]
-                        elif "youtu.be" in media_url:
-                            video_id = media_url.split('/')[-1]
-                        iframe_tag = soup.new_tag('iframe', src=f'https://www.youtube.com/embed/{video_id}')
-                        iframe_tag.attrs = {
-                            'width': '560',
-                            'height': '315',
-                            'frameborder': '0',
-                            'allow': 'accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture',
-                            'allowfullscreen': True
-                        }
-                        embed_tag.replace_with(iframe_tag)
-                    else:
-                        embed_tag.replace_with(f'[Unsupported media: {media_url}]')
-            return str(soup)
-
-        return process_embed_tags(obj.description) if obj.description else None
+        return self.get_enriched_parts(obj)['description']
+
+
+# Karty her zobrazují jen začátek popisu (GameCard, kalendář)
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+
+class GameCardSerializer(SparseFieldsetMixin, ContentSerializerMixin, serializers.ModelSerializer):
+    """
+    Kompaktní karta hry pro /api/games/ – místo popisu jen jeho začátek
+    (``?expand=description`` přidá celý) a s propojenými články/recenzemi jen
+    jako odkazy. Plný tvar vrací detail (GameSerializer).
+    """
+    main_image = ImageSerializer(read_only=True)
+    genres = GenreSerializer(many=True, read_only=True)
+    platforms = PlatformSerializer(many=True, read_only=True)
+    developer = DeveloperSerializer(read_only=True)
+    publisher = PublisherSerializer(read_only=True)
+    linked_blog_posts = LinkedPageSerializer(many=True, read_only=True)
+    linked_reviews = LinkedPageSerializer(many=True, read_only=True)
+    url_path = serializers.SerializerMethodField()
+    description_preview = serializers.SerializerMethodField()
+
+    expandable_fields = {
+        'description': (serializers.CharField, {}),
+        'linked_blog_posts': (BlogPostSerializer, {'many': True}),
+        'linked_reviews': (ReviewSerializer, {'many': True}),
+    }
+
+    class Meta:
+        model = Game
+        fields = (
+            'id', 'title', 'slug', 'url_path', 'main_image', 'release_date', 'description_preview',
+            'trailer_url', 'developer', 'publisher', 'genres', 'platforms', 'like_count',
+            'dislike_count', 'search_week', 'first_published_at', 'linked_blog_posts', 'linked_reviews',
+        )
+        list_serializer_class = ContentListSerializer
+
+    def get_url_path(self, obj):
+        return obj.url_path.replace('/superpařmeni', '')
+
+    def get_description_preview(self, obj):
+        # Začátek popisu načte dotaz seznamu (anotace description_start), celý sloupec se nečte
+        text = obj.description_start
+        return f"{text[:DESCRIPTION_PREVIEW_LENGTH]}..." if len(text) > DESCRIPTION_PREVIEW_LENGTH else text
 
 class BlogIndexPageSerializer(serializers.ModelSerializer):
     main_image = ImageSerializer(read_only=True)
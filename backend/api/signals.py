@@ -0,0 +1,118 @@
+import logging
+
+from django.db import transaction # type: ignore
+from django.db.models.signals import post_delete, post_save # type: ignore
+from django.dispatch import receiver # type: ignore
+from wagtail.images import get_image_model # type: ignore
+from wagtail.models import Page # type: ignore
+from wagtail.signals import page_published, page_unpublished # type: ignore
+
+from . import autocomplete, catalogue, enrichment, homepage, renditions, response_cache, search, webp
+from .models import (
+    Advertisement, Aktualita, ArticleCategory, BlogPost, Comment, Developer, Game, Genre, Partner, Platform, Publisher,
+    Review,
+)
+
+logger = logging.getLogger(__name__)
+
+ENRICHED_MODELS = (BlogPost, Review, Game)
+
+# Modely mimo stránky, ze kterých se skládají cachované odpovědi, homepage a katalog. Ostatní
+# (SearchDocument, RelatedContent, soutěže, zprávy) se zapisují často a v žádné cache nejsou.
+CACHED_MODELS = (Advertisement, Aktualita, ArticleCategory, Comment, Developer, Genre, Partner, Platform, Publisher)
+
+
+def invalidate_caches(model, tags):
+    # Až po commitu, jinak by souběžný request mohl cache znovu sestavit ze starých dat
+    def invalidate():
+        homepage.invalidate(model)
+        catalogue.invalidate(model)
+        response_cache.invalidate(tags)
+    transaction.on_commit(invalidate)
+
+
+@receiver(page_published)
+def build_enriched_content(sender, instance, **kwargs):
+    """ Předpočítá obohacené HTML hned při publikaci, API ho pak jen čte z cache """
+    if not isinstance(instance, ENRICHED_MODELS):
+        return
+    try:
+        enrichment.build(instance)
+    except Exception as e:
+        # Publikace nesmí selhat kvůli cache, obsah se dopočítá při prvním čtení
+        logger.error(f"Enriching {instance._meta.label} {instance.pk} failed: {e}")
+
+
+@receiver(page_unpublished)
+def evict_unpublished_content(sender, instance, **kwargs):
+    if isinstance(instance, ENRICHED_MODELS):
+        enrichment.evict(instance)
+
+
+@receiver(post_delete)
+def evict_deleted_content(sender, instance, **kwargs):
+    if isinstance(instance, ENRICHED_MODELS):
+        enrichment.evict(instance)
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def invalidate_caches_on_publish(sender, instance, **kwargs):
+    invalidate_caches(type(instance), response_cache.tags_for(instance))
+
+
+@receiver(post_save)
+def invalidate_caches_on_save(sender, instance, **kwargs):
+    # Stránky zneplatňuje až publikace, uložení konceptu na webu nic nemění
+    if issubclass(sender, CACHED_MODELS):
+        invalidate_caches(sender, response_cache.tags_for(instance))
+
+
+@receiver(post_delete)
+def invalidate_caches_on_delete(sender, instance, **kwargs):
+    if not issubclass(sender, CACHED_MODELS) and not (sender._meta.app_label == 'api' and isinstance(instance, Page)):
+        return
+    tags = response_cache.tags_for(instance)
+    if isinstance(instance, BlogPost):
+        tags.append(response_cache.ESPORT_TAG)  # kategorie už po smazání nezjistíme
+    invalidate_caches(sender, tags)
+
+
+@receiver(page_published)
+def warm_main_image_renditions(sender, instance, **kwargs):
+    renditions.warm_in_background(getattr(instance, 'main_image_id', None))
+
+
+@receiver(post_save)
+def warm_uploaded_image_renditions(sender, instance, created, **kwargs):
+    if created and sender is get_image_model():
+        renditions.warm_in_background(instance.pk)
+
+
+@receiver(post_save)
+def queue_uploaded_image_for_webp(sender, instance, created, **kwargs):
+    # Jen originály nahraných obrázků; renditions a dokumenty se nepřevádějí
+    if created and sender is get_image_model() and instance.file and webp.is_convertible(instance.file.name):
+        webp.enqueue(instance.file.name)
+
+
+@receiver(page_published)
+def update_search_document(sender, instance, **kwargs):
+    try:
+        search.index_page(instance)
+    except Exception as e:
+        # Publikace nesmí selhat kvůli vyhledávání, dokument dorovná rebuild_search_index
+        logger.error(f"Indexing {instance._meta.label} {instance.pk} for search failed: {e}")
+
+
+@receiver(page_unpublished)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_page(instance)
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_delete, sender=Game)
+def update_autocomplete(sender, instance, **kwargs):
+    if isinstance(instance, Game):
+        autocomplete.record_change(instance.pk)
@@ -0,0 +1,350 @@
+"""
+Synthetic dataset for benchmarks and query-budget tests.
+
+``generate()`` creates published games with genres, platforms, developers and
+publishers, articles whose StreamField bodies mix paragraphs with image
+embeds and tables, reviews with attributes, pros and cons, and comments on
+articles and reviews (mostly approved). Everything is seeded, so the same arguments always
+produce the same content.
+
+Pages are inserted in bulk: ``Page`` rows with precomputed treebeard paths go
+in with one ``bulk_create`` per batch, the rows of the specific page model
+with a raw ``save_base`` (how fixtures are loaded), so tens of thousands of
+pages take seconds instead of the minutes ``add_child`` plus publishing
+would. No revisions are created and publish signals do not fire; enriched
+HTML is built on first read and ``--indexes`` rebuilds the search index,
+recommendations and the Wagtail admin search index afterwards.
+
+All pages live under the index pages in ``INDEX_PAGES``; ``clear()`` removes
+them together with their subtrees.
+"""
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import BytesIO
+
+from django.contrib.auth import get_user_model # type: ignore
+from django.contrib.contenttypes.models import ContentType # type: ignore
+from django.core.files.images import ImageFile # type: ignore
+from django.db import transaction # type: ignore
+from django.db.models.signals import post_save # type: ignore
+from django.utils import timezone # type: ignore
+from PIL import Image as PILImage # type: ignore
+from wagtail.images import get_image_model # type: ignore
+from wagtail.models import Page, Site # type: ignore
+from wagtail.search.signal_handlers import post_save_signal_handler # type: ignore
+
+from . import catalogue, homepage, response_cache
+from .models import (
+    ArticleCategory, BlogIndexPage, BlogPost, Comment, Con, Developer, Game, GameIndexPage, Genre, Platform, Pro,
+    Publisher, Review, ReviewAttribute, ReviewIndexPage,
+)
+
+# Typ obsahu -> (model indexové stránky, slug)
+INDEX_PAGES = {
+    'article': (BlogIndexPage, 'synthetic-blog'),
+    'game': (GameIndexPage, 'synthetic-games'),
+    'review': (ReviewIndexPage, 'synthetic-reviews'),
+}
+
+GENRES = ['Akce', 'RPG', 'Strategie', 'Adventura', 'Závodní', 'Sportovní', 'Simulátor', 'Horor', 'Plošinovka', 'Střílečka', 'Logická', 'MMO']
+PLATFORMS = ['PC', 'PlayStation 5', 'PlayStation 4', 'Xbox Series X|S', 'Xbox One', 'Nintendo Switch', 'iOS', 'Android']
+CATEGORIES = ['Novinky', 'Esport', 'Hardware', 'Návody', 'Rozhovory', 'Recenze']
+ATTRIBUTES = ['Grafika', 'Zvuk', 'Hratelnost', 'Příběh', 'Cena/výkon', 'Ovládání']
+
+WORDS = (
+    'temný hrad rytíř drak hvězda válka legenda město les pevnost stín oheň led bouře cesta návrat říše kronika '
+    'zaklínač pilot závod liga turnaj hrdina meč kouzlo robot planeta flotila ostrov poklad lovec duch noc svítání '
+    'hra hráč mapa úroveň boss kampaň multiplayer grafika engine patch update sezóna kouzelník armáda'
+).split()
+
+STUDIO_COUNT = 300
+PUBLISHER_COUNT = 60
+AUTHOR_COUNT = 12
+USERNAME_PREFIX = 'synthetic-author-'
+# Podle prefixů clear() najde vygenerovaná data mimo stromy stránek
+STUDIO_PREFIX = 'Synthetic Studio '
+PUBLISHER_PREFIX = 'Synthetic Publisher '
+IMAGE_PREFIX = 'Synthetic image '
+BATCH_SIZE = 500
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def title(rng, count=3):
+    text = words(rng, count)
+    return text[0].upper() + text[1:]
+
+
+def paragraph(rng, image_ids, sentences=4):
+    text = ' '.join(f"{title(rng, rng.randint(6, 14))}." for _ in range(sentences))
+    if image_ids and rng.random() < 0.6:
+        image_id = rng.choice(image_ids)
+        text += f' <embed embedtype="image" id="{image_id}" alt="{words(rng, 2)}" format="fullwidth"/>'
+    return f'<p>{text}</p>'
+
+
+def table(rng):
+    rows = [['Parametr', 'Hodnota']] + [[title(rng, 1), str(rng.randint(1, 500))] for _ in range(rng.randint(2, 6))]
+    return {'data': rows, 'first_row_is_table_header': True, 'first_col_is_header': False, 'table_caption': ''}
+
+
+def blog_body(rng, image_ids):
+    blocks = []
+    for _ in range(rng.randint(3, 8)):
+        blocks.append({'type': 'paragraph', 'value': paragraph(rng, image_ids)})
+        if rng.random() < 0.25:
+            blocks.append({'type': 'table', 'value': table(rng)})
+    return blocks
+
+
+def published_at(rng, days=3 * 365):
+    return timezone.now() - timedelta(days=rng.random() * days)
+
+
+def create_images(rng, count):
+    """ Small generated images so embeds and renditions resolve to real files """
+    image_model = get_image_model()
+    images = []
+    for index in range(count):
+        buffer = BytesIO()
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        PILImage.new('RGB', (1200, 675), color).save(buffer, 'PNG')
+        images.append(image_model.objects.create(
+            title=f"{IMAGE_PREFIX}{index}", file=ImageFile(buffer, name=f'synthetic-{index}.png'),
+        ))
+    return [image.pk for image in images]
+
+
+def create_authors():
+    User = get_user_model()
+    authors = []
+    for index in range(AUTHOR_COUNT):
+        user, created = User.objects.get_or_create(
+            username=f'{USERNAME_PREFIX}{index}', defaults={'first_name': f'Autor {index}'},
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        authors.append(user)
+    return authors
+
+
+def get_or_create_index(content_type):
+    model, slug = INDEX_PAGES[content_type]
+    index_page = model.objects.filter(slug=slug).first()
+    if index_page is None:
+        root = Site.objects.get(is_default_site=True).root_page
+        index_page = root.add_child(instance=model(title=slug.replace('-', ' ').capitalize(), slug=slug, intro='Synthetic data'))
+    return Page.objects.get(pk=index_page.pk)
+
+
+@contextmanager
+def wagtail_search_updates_disabled(model):
+    """ Wagtail would index every inserted page on its own (``update_index`` does it in bulk) """
+    connected = post_save.disconnect(post_save_signal_handler, sender=model)
+    try:
+        yield
+    finally:
+        if connected:
+            post_save.connect(post_save_signal_handler, sender=model)
+
+
+def create_pages(parent, pages):
+    """
+    Inserts ``pages`` (unsaved instances of one specific page model) as
+    live children of ``parent`` and returns them with primary keys.
+    """
+    if not pages:
+        return pages
+    model = type(pages[0])
+    content_type = ContentType.objects.get_for_model(model)
+    last_child = parent.get_last_child()
+    step = last_child._get_lastpos_in_path() if last_child else 0
+
+    for page in pages:
+        step += 1
+        page.path = Page._get_path(parent.path, parent.depth + 1, step)
+        page.depth = parent.depth + 1
+        page.numchild = 0
+        page.url_path = f'{parent.url_path}{page.slug}/'
+        page.content_type = content_type
+        page.locale_id = parent.locale_id
+        page.draft_title = page.title
+        page.live = True
+        page.has_unpublished_changes = False
+        page.last_published_at = page.first_published_at
+
+    page_fields = [field.attname for field in Page._meta.concrete_fields if not field.primary_key]
+    with wagtail_search_updates_disabled(model):
+        for start in range(0, len(pages), BATCH_SIZE):
+            batch = pages[start:start + BATCH_SIZE]
+            rows = Page.objects.bulk_create([Page(**{name: getattr(page, name) for name in page_fields}) for page in batch])
+            for page, row in zip(batch, rows):
+                page.id = page.page_ptr_id = row.pk
+                # Raw uložení zapíše jen tabulku konkrétního modelu (rodičovský řádek už existuje)
+                page.save_base(raw=True, force_insert=True)
+
+    Page.objects.filter(pk=parent.pk).update(numchild=parent.numchild + len(pages))
+    parent.numchild += len(pages)
+    return pages
+
+
+def create_taxonomies():
+    # Existující žánry, platformy a kategorie se použijí, jen chybějící se založí
+    genres = [Genre.objects.filter(name=name).first() or Genre.objects.create(name=name) for name in GENRES]
+    platforms = [Platform.objects.filter(name=name).first() or Platform.objects.create(name=name) for name in PLATFORMS]
+    categories = [
+        ArticleCategory.objects.filter(name=name).first() or ArticleCategory.objects.create(name=name) for name in CATEGORIES
+    ]
+    developers = Developer.objects.bulk_create([Developer(name=f"{STUDIO_PREFIX}{index}") for index in range(STUDIO_COUNT)])
+    publishers = Publisher.objects.bulk_create([Publisher(name=f"{PUBLISHER_PREFIX}{index}") for index in range(PUBLISHER_COUNT)])
+    return genres, platforms, categories, developers, publishers
+
+
+def create_games(rng, parent, count, image_ids, genres, platforms, developers, publishers):
+    games = []
+    for index in range(count):
+        name = title(rng, rng.randint(1, 3)) + (f" {rng.randint(2, 5)}" if rng.random() < 0.2 else '')
+        games.append(Game(
+            title=name,
+            slug=f'synthetic-game-{index}',
+            description=paragraph(rng, image_ids, sentences=6),
+            developer_id=rng.choice(developers).pk,
+            publisher_id=rng.choice(publishers).pk,
+            release_date=date.today() + timedelta(days=rng.randint(-15 * 365, 365)),
+            like_count=rng.randint(0, 2000),
+            dislike_count=rng.randint(0, 200),
+            main_image_id=rng.choice(image_ids) if image_ids else None,
+            first_published_at=published_at(rng),
+        ))
+    games = create_pages(parent, games)
+
+    Game.genres.through.objects.bulk_create([
+        Game.genres.through(game_id=game.pk, genre_id=genre.pk)
+        for game in games for genre in rng.sample(genres, rng.randint(1, 3))
+    ], batch_size=BATCH_SIZE)
+    Game.platforms.through.objects.bulk_create([
+        Game.platforms.through(game_id=game.pk, platform_id=platform.pk)
+        for game in games for platform in rng.sample(platforms, rng.randint(1, 4))
+    ], batch_size=BATCH_SIZE)
+    return games
+
+
+def create_posts(rng, parent, count, image_ids, authors, categories, games):
+    posts = []
+    for index in range(count):
+        posts.append(BlogPost(
+            title=title(rng, rng.randint(4, 8)),
+            slug=f'synthetic-post-{index}',
+            intro=words(rng, 20)[:250],
+            body=blog_body(rng, image_ids),
+            owner=rng.choice(authors),
+            read_count=rng.randint(0, 50000),
+            like_count=rng.randint(0, 1000),
+            dislike_count=rng.randint(0, 100),
+            main_image_id=rng.choice(image_ids) if image_ids else None,
+            linked_game_id=rng.choice(games).pk if games and rng.random() < 0.7 else None,
+            first_published_at=published_at(rng),
+        ))
+    posts = create_pages(parent, posts)
+
+    BlogPost.categories.through.objects.bulk_create([
+        BlogPost.categories.through(blogpost_id=post.pk, articlecategory_id=category.pk)
+        for post in posts for category in rng.sample(categories, rng.randint(1, 2))
+    ], batch_size=BATCH_SIZE)
+    return posts
+
+
+def create_reviews(rng, parent, count, image_ids, authors, games):
+    reviews = []
+    for index in range(count):
+        reviews.append(Review(
+            title=title(rng, rng.randint(3, 6)),
+            slug=f'synthetic-review-{index}',
+            intro=words(rng, 20)[:250],
+            body=''.join(paragraph(rng, image_ids) for _ in range(rng.randint(3, 6))),
+            owner=rng.choice(authors),
+            read_count=rng.randint(0, 50000),
+            like_count=rng.randint(0, 1000),
+            dislike_count=rng.randint(0, 100),
+            main_image_id=rng.choice(image_ids) if image_ids else None,
+            linked_game_id=rng.choice(games).pk if games else None,
+            review_type='Game' if rng.random() < 0.8 else rng.choice(Review.REVIEW_TYPES)[0],
+            first_published_at=published_at(rng),
+        ))
+    reviews = create_pages(parent, reviews)
+
+    ReviewAttribute.objects.bulk_create([
+        ReviewAttribute(review_id=review.pk, name=name, score=rng.randint(1, 10), text=paragraph(rng, image_ids, sentences=2))
+        for review in reviews for name in rng.sample(ATTRIBUTES, 4)
+    ], batch_size=BATCH_SIZE)
+    Pro.objects.bulk_create([
+        Pro(review_id=review.pk, text=title(rng, 4)) for review in reviews for _ in range(rng.randint(2, 5))
+    ], batch_size=BATCH_SIZE)
+    Con.objects.bulk_create([
+        Con(review_id=review.pk, text=title(rng, 4)) for review in reviews for _ in range(rng.randint(1, 4))
+    ], batch_size=BATCH_SIZE)
+    return reviews
+
+
+def create_comments(rng, pages, count):
+    if not pages:
+        return []
+    return Comment.objects.bulk_create([
+        Comment(page_id=rng.choice(pages).pk, author=title(rng, 1), text=words(rng, rng.randint(5, 40)), is_approved=rng.random() < 0.9)
+        for _ in range(count)
+    ], batch_size=BATCH_SIZE)
+
+
+def invalidate_caches():
+    for model in (Game, BlogPost, Review, Genre, Platform, Developer, Publisher, ArticleCategory, Comment):
+        homepage.invalidate(model)
+        catalogue.invalidate(model)
+        response_cache.invalidate([model._meta.label_lower, response_cache.ESPORT_TAG])
+
+
+def generate(games=2000, posts=20000, reviews=2000, comments=50000, images=40, seed=1):
+    """
+    Replaces the previous synthetic dataset and returns ``{name: created
+    count}``.
+    """
+    rng = random.Random(seed)
+    clear()
+    with transaction.atomic():
+        image_ids = create_images(rng, images)
+        authors = create_authors()
+        genres, platforms, categories, developers, publishers = create_taxonomies()
+        game_pages = create_games(rng, get_or_create_index('game'), games, image_ids, genres, platforms, developers, publishers)
+        post_pages = create_posts(rng, get_or_create_index('article'), posts, image_ids, authors, categories, game_pages)
+        review_pages = create_reviews(rng, get_or_create_index('review'), reviews, image_ids, authors, game_pages)
+        created_comments = create_comments(rng, post_pages + review_pages, comments)
+        transaction.on_commit(invalidate_caches)
+    return {
+        'images': len(image_ids),
+        'games': len(game_pages),
+        'posts': len(post_pages),
+        'reviews': len(review_pages),
+        'comments': len(created_comments),
+    }
+
+
+def clear():
+    """
+    Deletes all synthetic pages (with their comments), studios, publishers,
+    images and authors. Returns the number of deleted index pages.
+    """
+    deleted = 0
+    with transaction.atomic():
+        for model, slug in INDEX_PAGES.values():
+            for index_page in Page.objects.filter(slug=slug, content_type=ContentType.objects.get_for_model(model)):
+                index_page.delete()  # treebeard smaže celý podstrom
+                deleted += 1
+        Developer.objects.filter(name__startswith=STUDIO_PREFIX).delete()
+        Publisher.objects.filter(name__startswith=PUBLISHER_PREFIX).delete()
+        get_image_model().objects.filter(title__startswith=IMAGE_PREFIX).delete()
+        get_user_model().objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        transaction.on_commit(invalidate_caches)
+    return deleted
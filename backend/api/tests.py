@@ -1,3 +1,653 @@
-from django.test import TestCase # type: ignore
+import io
+import shutil
+import tempfile
+import time
+from datetime import date
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np # type: ignore
+from django.conf import settings # type: ignore
+from django.core.cache import cache # type: ignore
+from django.core.management import call_command # type: ignore
+from django.db import DatabaseError, connection # type: ignore
+from django.http import HttpResponse # type: ignore
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings # type: ignore
+from django.test.utils import CaptureQueriesContext # type: ignore
+from wagtail.images import get_image_model # type: ignore
+
+from scipy import sparse # type: ignore
+
+from . import (
+    autocomplete, catalogue, counters, db_routing, recommendations, redis_client, renditions, response_cache, search,
+    search_stats, signals, synthetic, trending,
+)
+from .models import BlogPost, Developer, Game, Genre, Platform, Publisher, Review
+from .pagination import PublishedCursorPagination
+
+try:
+    import fakeredis # type: ignore
+    import lupa # type: ignore  # noqa: F401 (Lua skripty ve fakeredis)
+except ImportError:
+    fakeredis = None
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+# Malá syntetická data (api/synthetic.py), stačí na odhalení N+1 – budget musí být výrazně pod počtem položek
+DATASET = {'games': 30, 'posts': 60, 'reviews': 20, 'comments': 120, 'images': 3}
+
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_games(*specs):
+    """
+    Live games from ``(title, genres, platforms, developer, year)``; taxonomy
+    values are names and are created on first use.
+    """
+    def named(model, name):
+        return model.objects.get_or_create(name=name)[0] if name else None
+
+    parent = synthetic.get_or_create_index('game')
+    games = synthetic.create_pages(parent, [
+        Game(
+            title=title,
+            slug=f'test-game-{index}',
+            developer=named(Developer, developer),
+            publisher=named(Publisher, 'Publisher'),
+            release_date=date(year, 6, 1) if year else None,
+        )
+        for index, (title, _, _, developer, year) in enumerate(specs)
+    ])
+    # ParentalManyToManyField by vazby zapsal až při uložení stránky
+    for game, (_, genres, platforms, _, _) in zip(games, specs):
+        Game.genres.through.objects.bulk_create([
+            Game.genres.through(game_id=game.pk, genre_id=named(Genre, name).pk) for name in genres
+        ])
+        Game.platforms.through.objects.bulk_create([
+            Game.platforms.through(game_id=game.pk, platform_id=named(Platform, name).pk) for name in platforms
+        ])
+    return games
+
+
+def use_fake_redis(test):
+    """ Replaces the shared Redis client for the duration of ``test`` """
+    client = fakeredis.FakeRedis()
+    for module, name in ((redis_client, '_client'), (search_stats, '_script'), (autocomplete, '_script')):
+        patcher = mock.patch.object(module, name, client if name == '_client' else None)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    return client
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    COUNTERS=dict(settings.COUNTERS, BACKEND='local'),
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class QueryBudgetTestCase(TestCase):
+    """
+    Asserts an upper bound on SQL queries per endpoint that does not depend
+    on how many items the response contains. Every request starts with empty
+    caches, so the budget covers the uncached path.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        counters._store = None  # in-process čítače místo Redisu
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        counters._store = None
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        synthetic.generate(seed=1, **DATASET)
+
+    def setUp(self):
+        if fakeredis:
+            use_fake_redis(self)  # živé hodnoty (search_week) jinak sahají na skutečný Redis
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def assertQueryBudget(self, url, budget):
+        count = self.count_queries(url)
+        self.assertLessEqual(count, budget, f"{url} made {count} queries, budget is {budget}")
+
+    def assertPagedQueryBudget(self, url, budget, page_sizes=(2, 20)):
+        """ Same query count for a small and a large page, within ``budget`` """
+        separator = '&' if '?' in url else '?'
+        counts = [self.count_queries(f'{url}{separator}page_size={size}') for size in page_sizes]
+        self.assertEqual(counts[0], counts[-1], f"{url} queries grow with page size: {counts}")
+        self.assertLessEqual(counts[-1], budget, f"{url} made {counts[-1]} queries, budget is {budget}")
+
+
+class BlogPostQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertPagedQueryBudget('/api/posts/', 6)
+        self.assertQueryBudget('/api/posts/', 6)
+
+    def test_detail(self):
+        post = BlogPost.objects.live().first()
+        self.assertQueryBudget(f'/api/posts/{post.pk}/', 6)
+
+    def test_related(self):
+        post = BlogPost.objects.live().first()
+        self.assertQueryBudget(f'/api/posts/{post.pk}/related/', 2)
+
+    def test_related_unknown(self):
+        draft = BlogPost.objects.live().first()
+        BlogPost.objects.filter(pk=draft.pk).update(live=False)
+        for pk in (draft.pk, 999999, 'abc'):
+            self.assertEqual(self.client.get(f'/api/posts/{pk}/related/').status_code, 404, pk)
+        self.assertEqual(self.client.get('/api/games/999999/related/').status_code, 404)
+
+    def test_list_live_and_capped(self):
+        draft = BlogPost.objects.live().first()
+        BlogPost.objects.filter(pk=draft.pk).update(live=False)
+        cache.clear()
+        ids = [post['id'] for post in self.client.get('/api/posts/').json()]
+        self.assertNotIn(draft.pk, ids)
+        self.assertEqual(self.client.get(f'/api/posts/{draft.pk}/').status_code, 404)
+
+        cache.clear()
+        with mock.patch.object(PublishedCursorPagination, 'max_unpaginated', 5):
+            posts = self.client.get('/api/posts/').json()
+        newest = BlogPost.objects.live().order_by('-first_published_at', '-pk').values_list('pk', flat=True)[:5]
+        self.assertEqual([post['id'] for post in posts], list(newest))
+
+    def test_esport(self):
+        self.assertQueryBudget('/api/blogposts/esport/', 6)
+
+    def test_latest_posts(self):
+        self.assertQueryBudget('/api/latest-posts/', 3)
+
+
+class ReviewQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertPagedQueryBudget('/api/reviews/', 8)
+        self.assertQueryBudget('/api/reviews/', 8)
+
+    def test_detail(self):
+        review = Review.objects.live().first()
+        self.assertQueryBudget(f'/api/reviews/{review.pk}/', 8)
+
+
+class GameQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertPagedQueryBudget('/api/games/', 8)
+        self.assertQueryBudget('/api/games/', 8)
+
+    def test_list_expanded(self):
+        self.assertPagedQueryBudget('/api/games/?expand=linked_blog_posts,linked_reviews', 13)
+
+    def test_detail(self):
+        game = Game.objects.live().first()
+        self.assertQueryBudget(f'/api/games/{game.pk}/', 13)
+
+    def test_catalogue(self):
+        self.assertQueryBudget('/api/games/catalogue/?limit=2', 14)
+        self.assertQueryBudget('/api/games/catalogue/?limit=30', 14)
+
+    def test_upcoming(self):
+        self.assertQueryBudget('/api/upcoming-games/', 2)
+
+    def test_list_description_preview(self):
+        Game.objects.filter(pk=Game.objects.live().first().pk).update(description='<p>' + 'x' * 300 + '</p>')
+        Game.objects.exclude(description__startswith='<p>x').update(description='<p>Krátký popis</p>')
+        cards = self.client.get('/api/games/?page_size=50').json()['results']
+        previews = sorted(card['description_preview'] for card in cards)
+        self.assertEqual(previews[-1], '<p>' + 'x' * 197 + '...')
+        self.assertEqual(previews[0], '<p>Krátký popis</p>')
+        self.assertNotIn('description', cards[0])
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+class RedisQueryBudgetTests(QueryBudgetTestCase):
+    """ Endpoints that combine Redis rankings with database rows """
+
+    def setUp(self):
+        super().setUp()
+        game = Game.objects.live().first()
+        for _ in range(3):
+            search_stats.record(game.pk)
+        trending.compute_all()  # jinak by čtení spustilo přepočet na pozadí
+
+    def test_homepage_bundle(self):
+        self.assertQueryBudget('/api/homepage-bundle/', 20)
+
+    def test_trending(self):
+        self.assertQueryBudget('/api/trending/', 4)
+        self.assertQueryBudget('/api/trending/?type=article&limit=50', 2)
+
+    @skipUnless(connection.vendor == 'postgresql', "full-text search needs PostgreSQL")
+    def test_search(self):
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(self.count_queries('/api/search/?q=hra&limit=2'), self.count_queries('/api/search/?q=hra&limit=20'))
+        self.assertQueryBudget('/api/search/?q=hra&limit=20', 2)
+
+
+class OtherQueryBudgetTests(QueryBudgetTestCase):
+    def test_comments(self):
+        self.assertPagedQueryBudget('/api/comments/', 2)
+
+    def test_categories(self):
+        self.assertQueryBudget('/api/categories/', 2)
+
+    def test_user_profile(self):
+        username = BlogPost.objects.live().select_related('owner').first().owner.username
+        self.assertQueryBudget(f'/api/profile/{username}/', 7)
+
+    def test_feeds(self):
+        self.assertQueryBudget('/rss/blog/', 5)
+        self.assertQueryBudget('/rss/reviews/', 5)
+
+
+class ConditionalGetTests(QueryBudgetTestCase):
+    def test_detail_unknown(self):
+        for url in ('/api/posts/', '/api/reviews/', '/api/games/'):
+            for pk in (999999, 'abc'):
+                self.assertEqual(self.client.get(f'{url}{pk}/').status_code, 404, f'{url}{pk}/')
+
+    def test_list_last_modified_follows_unpublish(self):
+        response = self.client.get('/api/posts/')
+        last_modified = response['Last-Modified']
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        # MAX(last_published_at) se odpublikováním nezmění, verze tagu ano
+        post = BlogPost.objects.live().order_by('last_published_at').first()
+        later = time.time_ns() + 60 * 10**9
+        with mock.patch.object(response_cache, 'new_version', lambda: later):
+            with self.captureOnCommitCallbacks(execute=True):
+                post.unpublish()
+        response = self.client.get('/api/posts/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+
+class DatabaseRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = db_routing.ReplicaRouter()
+        patcher = mock.patch.object(db_routing, 'replica_alias', return_value='replica')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reads_from(self, request):
+        """ Alias the router picks for a read during ``request`` """
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(BlogPost) or 'default')
+            return HttpResponse()
+
+        response = db_routing.DatabaseRoutingMiddleware(view)(request)
+        return seen[0], response
+
+    def test_public_reads_use_replica(self):
+        for path in ('/api/posts/', '/rss/blog/', '/sitemap.xml'):
+            self.assertEqual(self.reads_from(self.factory.get(path))[0], 'replica', path)
+
+    def test_admin_and_writes_use_primary(self):
+        self.assertEqual(self.reads_from(self.factory.get('/cms/pages/'))[0], 'default')
+        self.assertEqual(self.reads_from(self.factory.post('/api/posts/1/like/'))[0], 'default')
+
+    def test_write_pins_browser_to_primary(self):
+        _, response = self.reads_from(self.factory.post('/api/contact_message/'))
+        cookie = response.cookies[settings.DATABASE_ROUTING['PIN_COOKIE']]
+        self.assertEqual(cookie['max-age'], settings.DATABASE_ROUTING['PIN_SECONDS'])
+
+        request = self.factory.get('/api/posts/')
+        request.COOKIES[cookie.key] = cookie.value
+        self.assertEqual(self.reads_from(request)[0], 'default')
+
+    def test_reads_after_write_use_primary(self):
+        def view(request):
+            before = self.router.db_for_read(BlogPost)
+            self.assertEqual(self.router.db_for_write(BlogPost), 'default')
+            return HttpResponse(f'{before},{self.router.db_for_read(BlogPost)}')
+
+        response = db_routing.DatabaseRoutingMiddleware(view)(self.factory.get('/api/posts/'))
+        self.assertEqual(response.content, b'replica,None')
+
+    def test_outside_request_uses_primary(self):
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+
+
+@override_settings(CACHES=LOCAL_CACHES, COUNTERS=dict(settings.COUNTERS, BACKEND='local'))
+class CounterTests(TestCase):
+    def setUp(self):
+        counters._store = None
+        self.addCleanup(setattr, counters, '_store', None)
+        # Automatický flush při inkrementu by testům přeskočil pod rukama
+        counters.get_store().acquire(counters.FLUSH_THROTTLE_KEY, 3600)
+        self.first, self.second = create_games(('First', (), (), None, None), ('Second', (), (), None, None))
+
+    def counts(self, game):
+        return Game.objects.values_list('like_count', 'dislike_count').get(pk=game.pk)
+
+    def test_increment_returns_merged_value(self):
+        self.assertEqual(counters.increment(Game, self.first.pk, 'like_count', persisted=10), 11)
+        self.assertEqual(counters.increment(Game, self.first.pk, 'like_count', persisted=10), 12)
+        self.assertEqual(counters.overlay_rows(Game, [{'id': self.first.pk, 'like_count': 10}])[0]['like_count'], 12)
+        with self.assertRaises(ValueError):
+            counters.increment(Game, self.first.pk, 'search_week')
+
+    def test_flush_applies_deltas_exactly_once(self):
+        for _ in range(3):
+            counters.increment(Game, self.first.pk, 'like_count')
+        counters.increment(Game, self.second.pk, 'like_count')
+        counters.increment(Game, self.second.pk, 'dislike_count', amount=2)
+
+        self.assertEqual(counters.flush(), 3)
+        self.assertEqual(self.counts(self.first), (3, 0))
+        self.assertEqual(self.counts(self.second), (1, 2))
+        self.assertEqual(counters.flush(), 0)
+        self.assertEqual(self.counts(self.first), (3, 0))
+        self.assertEqual(counters.status(), (0, 0.0))
+
+    def test_failed_flush_is_retried(self):
+        counters.increment(Game, self.first.pk, 'like_count', amount=5)
+        with mock.patch.object(counters.apps, 'get_model', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                counters.flush()
+        self.assertEqual(self.counts(self.first), (0, 0))
+
+        counters.increment(Game, self.first.pk, 'like_count')  # přijde během nedokončeného flushe
+        self.assertEqual(counters.flush(), 1)
+        self.assertEqual(self.counts(self.first), (5, 0))
+        self.assertEqual(counters.flush(), 1)
+        self.assertEqual(self.counts(self.first), (6, 0))
+
+    def test_written_batch_is_not_applied_again(self):
+        counters.increment(Game, self.first.pk, 'like_count', amount=2)
+        store = counters.get_store()
+        with mock.patch.object(store, 'commit', side_effect=ConnectionError):  # pád po commitu do DB
+            with self.assertRaises(ConnectionError):
+                counters.flush()
+        self.assertEqual(self.counts(self.first), (2, 0))
+
+        counters.flush()
+        self.assertEqual(self.counts(self.first), (2, 0))
+        self.assertEqual(counters.status(), (0, 0.0))
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+class RedisCounterStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.store = counters.RedisCounterStore(fakeredis.FakeRedis())
+
+    def test_increments_during_flush_wait_for_next_flush(self):
+        self.assertEqual(self.store.drain(), (None, {}))
+        self.store.incr('api.game:1:like_count', 2)
+        flush_id, deltas = self.store.drain()
+        self.assertEqual(deltas, {'api.game:1:like_count': 2})
+
+        # Hash se přejmenoval, nový přírůstek jde do čerstvého a čtení vidí obojí
+        self.assertEqual(self.store.incr('api.game:1:like_count'), 3)
+        self.assertEqual(self.store.drain(), (flush_id, {'api.game:1:like_count': 2}))  # opakovaný pokus, stejné id
+        self.store.commit()
+        self.assertEqual(self.store.pending(['api.game:1:like_count']), {'api.game:1:like_count': 1})
+        next_id, deltas = self.store.drain()
+        self.assertEqual(deltas, {'api.game:1:like_count': 1})
+        self.assertNotEqual(next_id, flush_id)
+        self.store.commit()
+        self.assertEqual(self.store.status()[0], 0)
+
+    def test_release_keeps_lock_of_another_owner(self):
+        token = self.store.acquire(counters.FLUSH_MUTEX_KEY, 60)
+        self.assertIsNone(self.store.acquire(counters.FLUSH_MUTEX_KEY, 60))
+        self.store.client.delete(counters.FLUSH_MUTEX_KEY)  # TTL vypršel
+        other = self.store.acquire(counters.FLUSH_MUTEX_KEY, 60)
+
+        self.store.release(counters.FLUSH_MUTEX_KEY, token)
+        self.assertEqual(self.store.client.get(counters.FLUSH_MUTEX_KEY).decode(), other)
+        self.store.release(counters.FLUSH_MUTEX_KEY, other)
+        self.assertIsNone(self.store.client.get(counters.FLUSH_MUTEX_KEY))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CatalogueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        catalogue._local = None
+        self.addCleanup(setattr, catalogue, '_local', None)
+        self.games = create_games(
+            ('Alpha', ('RPG',), ('PC',), 'North', 2020),
+            ('Beta', ('RPG', 'Action'), ('PC', 'PS5'), 'North', 2021),
+            ('Gamma', ('Action',), ('PS5',), 'South', 2021),
+            ('Delta', ('Puzzle',), ('PC',), 'South', 2019),
+            ('Epsilon', ('RPG',), ('Switch',), 'North', None),
+        )
+        self.ids = {game.title: game.pk for game in self.games}
+
+    def ids_of(self, facet, *names):
+        model = catalogue.FACET_MODELS[facet]
+        return [model.objects.get(name=name).pk for name in names]
+
+    def counts(self, facets, facet):
+        return {item['name']: item['count'] for item in facets[facet]}
+
+    def test_bitset_round_trip(self):
+        positions = [0, 3, 8, 65]
+        bits = catalogue.to_bitset(positions)
+        self.assertEqual(catalogue.from_bitset(bits), positions)
+        self.assertEqual(catalogue.popcount(bits), 4)
+        self.assertEqual(catalogue.to_bitset([]), 0)
+
+    def test_unfiltered(self):
+        count, page, facets = catalogue.query({})
+        self.assertEqual(count, 5)
+        # Nejnovější vydání první, hry bez data na konci
+        self.assertEqual(page, [self.ids[title] for title in ('Beta', 'Gamma', 'Alpha', 'Delta', 'Epsilon')])
+        self.assertEqual(self.counts(facets, 'genre'), {'RPG': 3, 'Action': 2, 'Puzzle': 1})
+        self.assertEqual(self.counts(facets, 'year'), {'2021': 2, '2020': 1, '2019': 1})
+
+    def test_facet_counts_ignore_own_filter(self):
+        count, page, facets = catalogue.query({'genre': self.ids_of('genre', 'RPG')})
+        self.assertEqual(count, 3)
+        self.assertEqual(self.counts(facets, 'genre'), {'RPG': 3, 'Action': 2, 'Puzzle': 1})
+        self.assertEqual(self.counts(facets, 'platform'), {'PC': 2, 'PS5': 1, 'Switch': 1})
+        self.assertEqual(self.counts(facets, 'developer'), {'North': 3})
+
+    def test_or_within_and_across_facets(self):
+        count, _, _ = catalogue.query({'genre': self.ids_of('genre', 'RPG', 'Puzzle')})
+        self.assertEqual(count, 4)
+
+        count, page, facets = catalogue.query({
+            'genre': self.ids_of('genre', 'RPG'), 'platform': self.ids_of('platform', 'PS5'),
+        })
+        self.assertEqual((count, page), (1, [self.ids['Beta']]))
+        self.assertEqual(self.counts(facets, 'genre'), {'RPG': 1, 'Action': 2})
+
+    def test_year_range_and_paging(self):
+        count, page, _ = catalogue.query({}, year_from=2020, offset=1, limit=1)
+        self.assertEqual((count, page), (3, [self.ids['Gamma']]))
+        count, page, _ = catalogue.query({}, year_from=2030)
+        self.assertEqual((count, page), (0, []))
+
+    def test_invalidate_rebuilds_index(self):
+        catalogue.query({})
+        Game.objects.filter(pk=self.ids['Delta']).update(live=False)
+        self.assertEqual(catalogue.query({})[0], 5)  # index je v paměti do změny verze
+        catalogue.invalidate(Game)
+        self.assertEqual(catalogue.query({})[0], 4)
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+@override_settings(AUTOCOMPLETE=dict(settings.AUTOCOMPLETE, SYNC_INTERVAL=0))
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.client_redis = use_fake_redis(self)
+        self.games = create_games(
+            ('Elden Ring', (), (), None, None),
+            ('Zaklínač 3: Divoký hon', (), (), None, None),
+            ('Zaklínač 2', (), (), None, None),
+        )
+        self.index = autocomplete.PrefixIndex()
+
+    def titles(self, prefix):
+        self.index.sync()
+        return [game['title'] for game in self.index.lookup(prefix, 10)]
+
+    def test_keys(self):
+        self.assertEqual(autocomplete.keys_for('Elden Ring'), {'elden ring', 'ring'})
+        self.assertIn('divoky hon', autocomplete.keys_for('Zaklínač 3: Divoký hon'))
+
+    def test_prefix_lookup(self):
+        self.assertEqual(self.titles('ring'), ['Elden Ring'])
+        self.assertEqual(self.titles('eld'), ['Elden Ring'])
+        self.assertEqual(self.titles('divoky'), ['Zaklínač 3: Divoký hon'])
+        self.assertEqual(self.titles('x'), [])
+
+    def test_ranking_by_searches(self):
+        for _ in range(2):
+            search_stats.record(self.games[2].pk)
+        self.assertEqual(self.titles('zaklinac'), ['Zaklínač 2', 'Zaklínač 3: Divoký hon'])
+
+    def test_change_log_applies_changed_games(self):
+        self.titles('ring')
+        Game.objects.filter(pk=self.games[0].pk).update(title='Hollow Knight')
+        with self.captureOnCommitCallbacks(execute=True):
+            autocomplete.record_change(self.games[0].pk)
+        with mock.patch.object(self.index, 'rebuild', wraps=self.index.rebuild) as rebuild:
+            self.assertEqual(self.titles('hollow'), ['Hollow Knight'])
+            self.assertEqual(self.titles('ring'), [])
+        rebuild.assert_not_called()
+        self.assertEqual(self.index.version, 1)
+
+    def test_gap_in_change_log_rebuilds(self):
+        self.titles('ring')
+        Game.objects.filter(pk=self.games[0].pk).update(title='Hollow Knight')
+        self.client_redis.set(autocomplete.VERSION_KEY, 5)  # log se mezitím ztratil
+        with mock.patch.object(self.index, 'rebuild', wraps=self.index.rebuild) as rebuild:
+            self.assertEqual(self.titles('hollow'), ['Hollow Knight'])
+        rebuild.assert_called_once_with(5)
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+class SearchStatsTests(SimpleTestCase):
+    def setUp(self):
+        use_fake_redis(self)
+        self.hour = 500000
+        patcher = mock.patch.object(search_stats, 'current_hour', lambda: self.hour)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_record_counts_every_window(self):
+        search_stats.record(1)
+        self.assertEqual(search_stats.record(1), {'24h': 2, '7d': 2, '30d': 2})
+        self.assertEqual(search_stats.counts([1, 2]), {1: 2, 2: 0})
+
+    def test_roll_drops_searches_outside_window(self):
+        search_stats.record(1)
+        search_stats.record(1)
+        self.hour += 1
+        search_stats.record(2)
+        self.assertEqual(search_stats.top('24h'), [(1, 2), (2, 1)])
+
+        self.hour += 23  # první hodina vypadla z 24h okna, druhá ještě ne
+        self.assertEqual(search_stats.top('24h'), [(2, 1)])
+        self.assertEqual(search_stats.top('7d'), [(1, 2), (2, 1)])
+
+        self.hour += 7 * 24
+        self.assertEqual(search_stats.top('7d'), [])
+        self.assertEqual(search_stats.scores('30d'), {1: 2, 2: 1})
+
+
+class RecommendationTests(SimpleTestCase):
+    def matrix(self, rows):
+        return sparse.csr_matrix(np.array(rows, dtype=np.float64))
+
+    def test_encode_normalises_rows(self):
+        matrix = recommendations.encode([{'a': 1, 'b': 1}, {'a': 1}, {}])
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        np.testing.assert_allclose(norms, [1, 1, 0])
+        # Vzácný rys "b" váží víc než "a", který má každý
+        self.assertGreater(matrix[0, 1], matrix[0, 0])
+
+    def test_top_k_ordering(self):
+        matrix = self.matrix([[1, 0, 0], [0.8, 0.6, 0], [0, 1, 0], [0, 0, 1]])
+        neighbours = dict(recommendations.nearest_neighbours(matrix, k=2, chunk_size=3))
+        self.assertEqual([row for row, _ in neighbours[1]], [0, 2])
+        np.testing.assert_allclose([score for _, score in neighbours[1]], [0.8, 0.6])
+        self.assertEqual([row for row, _ in neighbours[0]], [1])  # nulová podobnost se vynechá
+        self.assertEqual(neighbours[3], [])
+
+    def test_top_k_limit_and_ties(self):
+        matrix = self.matrix([[1, 0], [1, 0], [1, 0], [0.6, 0.8]])
+        neighbours = dict(recommendations.nearest_neighbours(matrix, k=2, chunk_size=2))
+        self.assertEqual([row for row, _ in neighbours[0]], [1, 2])  # shoda podobnosti podle pořadí
+        np.testing.assert_allclose([score for _, score in neighbours[3]], [0.6, 0.6])
+
+
+class FeedTests(QueryBudgetTestCase):
+    def test_feed_rebuilds_when_enclosures_are_generated(self):
+        Rendition = get_image_model().get_rendition_model()
+        Rendition.objects.all().delete()
+        cache.clear()
+        with mock.patch.object(renditions, 'warm_in_background'):
+            before = self.client.get('/rss/blog/').content
+        self.assertFalse(Rendition.objects.exists())
+
+        for image in get_image_model().objects.all():
+            renditions.warm(image)
+        after = self.client.get('/rss/blog/').content
+        enclosure = Rendition.objects.filter(filter_spec=renditions.get_specs()['feed_enclosure']).first()
+        self.assertNotIn(enclosure.file.url.encode(), before)
+        self.assertIn(enclosure.file.url.encode(), after)
+
+
+class CacheInvalidationTests(TestCase):
+    def test_only_cached_models_invalidate(self):
+        game, = create_games(('Hra', (), (), None, None))
+        with mock.patch.object(signals, 'invalidate_caches') as invalidate_caches:
+            search.index_page(Game.objects.get(pk=game.pk))
+            invalidate_caches.assert_not_called()
+            Genre.objects.create(name='RPG')
+            invalidate_caches.assert_called_once()
+            self.assertIs(invalidate_caches.call_args.args[0], Genre)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.game, = create_games(('Hra <b>tučně</b>', (), (), None, None))
+        Game.objects.filter(pk=self.game.pk).update(description='<p>Ukázka &lt;script&gt;alert(1)&lt;/script&gt; hra</p>')
+
+    def test_index_keeps_markup_escaped(self):
+        document = search.index_page(Game.objects.get(pk=self.game.pk))
+        self.assertEqual(document.body, 'Ukázka &lt;script&gt;alert(1)&lt;/script&gt; hra')
+        self.assertEqual(document.title, 'Hra <b>tučně</b>')
+
+    @skipUnless(connection.vendor == 'postgresql', "full-text search needs PostgreSQL")
+    def test_highlights_are_escaped(self):
+        search.index_page(Game.objects.get(pk=self.game.pk))
+        result, = search.search('ukázka hra')
+        for html in (result.snippet, result.title_highlight):
+            self.assertNotIn('<script>', html)
+            self.assertNotIn('<b>', html)
+            self.assertIn('<mark>', html)
+
+
+class MetricsAccessTests(TestCase):
+    @override_settings(METRICS={'TOKEN': '', 'ALLOWED_IPS': []})
+    def test_closed_by_default(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS={'TOKEN': 'secret', 'ALLOWED_IPS': []})
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_requests_total', response.content)
+
+    @override_settings(METRICS={'TOKEN': '', 'ALLOWED_IPS': ['10.0.0.5']})
+    def test_allowed_ip(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.6').status_code, 404)
@@ -0,0 +1,150 @@
+"""
+Time-decayed trending scores for articles, reviews and games.
+
+``compute()`` loads the counters of every live item of a content type in one
+``values_list`` query, adds live readers from the presence leaderboard
+(``api.active_users``) and scores the whole catalogue at once with numpy:
+
+    score = engagement * 0.5 ** (age_hours / HALF_LIFE_HOURS)
+    engagement = reads * w_read + likes * w_like - dislikes * w_dislike + active * w_active
+
+The top ``STORED`` items are written to the Redis sorted set
+``trending:<type>``, replaced atomically. The ``compute_trending`` command
+runs it periodically; ``/api/trending/`` only reads the precomputed top-N.
+If the job stops, reads keep serving the last set and start one recompute
+in a background thread per content type across all workers.
+"""
+import logging
+import threading
+
+import numpy as np # type: ignore
+from django.conf import settings # type: ignore
+from django.db import connections # type: ignore
+from django.utils import timezone # type: ignore
+
+from .active_users import RANK_KEY
+from .models import BlogPost, Game, Review
+from .redis_client import get_redis
+
+TRENDING_KEY = 'trending:{content_type}'
+# Značka posledního přepočtu; když vyprší (job neběží), čtení spustí přepočet na pozadí
+COMPUTED_KEY = 'trending:computed:{content_type}'
+RECOMPUTE_LOCK_KEY = 'trending:recompute_lock:{content_type}'
+
+logger = logging.getLogger(__name__)
+
+# Typ obsahu -> model (hry nemají read_count ani sledování aktivních čtenářů)
+CONTENT_MODELS = {
+    'article': BlogPost,
+    'review': Review,
+    'game': Game,
+}
+
+
+def get_config():
+    return settings.TRENDING
+
+
+def load(content_type):
+    """
+    Returns ``(ids, reads, likes, dislikes, published timestamps)`` arrays.
+    """
+    model = CONTENT_MODELS[content_type]
+    has_reads = any(field.name == 'read_count' for field in model._meta.fields)
+    fields = ['id', 'like_count', 'dislike_count', 'first_published_at'] + (['read_count'] if has_reads else [])
+    rows = list(model.objects.live().values_list(*fields))
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    likes = np.array([row[1] for row in rows], dtype=np.float64)
+    dislikes = np.array([row[2] for row in rows], dtype=np.float64)
+    published = np.array([row[3].timestamp() if row[3] else np.nan for row in rows], dtype=np.float64)
+    reads = np.array([row[4] for row in rows], dtype=np.float64) if has_reads else np.zeros(len(rows))
+    return ids, reads, likes, dislikes, published
+
+
+def load_active(content_type, ids):
+    """ Live readers per item aligned with ``ids`` (zeros for untracked types) """
+    active = np.zeros(len(ids))
+    ranked = get_redis().zrange(RANK_KEY.format(content_type=content_type), 0, -1, withscores=True)
+    if not ranked:
+        return active
+    position = {content_id: index for index, content_id in enumerate(ids.tolist())}
+    for member, count in ranked:
+        index = position.get(int(member))
+        if index is not None:
+            active[index] = count
+    return active
+
+
+def score(reads, likes, dislikes, active, published, now):
+    config = get_config()
+    weights = config['WEIGHTS']
+    engagement = (
+        reads * weights['read']
+        + likes * weights['like']
+        - dislikes * weights['dislike']
+        + active * weights['active']
+    )
+    # Bez data publikace bereme položku jako starou jeden poločas
+    age_hours = np.nan_to_num((now - published) / 3600, nan=config['HALF_LIFE_HOURS'])
+    decay = np.power(0.5, np.clip(age_hours, 0, None) / config['HALF_LIFE_HOURS'])
+    return np.clip(engagement, 0, None) * decay
+
+
+def compute(content_type):
+    """
+    Recomputes and stores the trending set of ``content_type``. Returns the
+    number of stored items.
+    """
+    ids, reads, likes, dislikes, published = load(content_type)
+    active = load_active(content_type, ids)
+    scores = score(reads, likes, dislikes, active, published, timezone.now().timestamp())
+
+    stored = get_config()['STORED']
+    top = np.argsort(-scores, kind='stable')[:stored]
+    top = top[scores[top] > 0]
+    mapping = {str(content_id): float(value) for content_id, value in zip(ids[top].tolist(), scores[top].tolist())}
+
+    key = TRENDING_KEY.format(content_type=content_type)
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.delete(key)
+    if mapping:
+        pipe.zadd(key, mapping)
+    pipe.set(COMPUTED_KEY.format(content_type=content_type), 1, ex=int(get_config()['INTERVAL'] * 3))
+    pipe.execute()
+    return len(mapping)
+
+
+def compute_all():
+    return {content_type: compute(content_type) for content_type in CONTENT_MODELS}
+
+
+def _recompute_in_background(content_type, client):
+    lock_key = RECOMPUTE_LOCK_KEY.format(content_type=content_type)
+    # Jediný přepočet na typ obsahu napříč workery
+    if not client.set(lock_key, 1, nx=True, ex=int(get_config()['INTERVAL'])):
+        return
+
+    def run():
+        try:
+            compute(content_type)
+        except Exception as e:
+            logger.warning(f"Trending recompute of {content_type} failed: {e}")
+        finally:
+            client.delete(lock_key)
+            connections.close_all()  # spojení vlákna by jinak zůstalo otevřené (CONN_MAX_AGE)
+
+    threading.Thread(target=run, name=f"trending-recompute-{content_type}", daemon=True).start()
+
+
+def top(content_type, limit=10):
+    """
+    Returns ``[(id, score)]`` of the precomputed trending set. Never computes
+    on the request; if the job has not run for three intervals the last set
+    (possibly empty) is returned and a recompute is started in the background.
+    """
+    key = TRENDING_KEY.format(content_type=content_type)
+    client = get_redis()
+    if not client.exists(COMPUTED_KEY.format(content_type=content_type)):
+        _recompute_in_background(content_type, client)
+    return [(int(content_id), value) for content_id, value in client.zrevrange(key, 0, limit - 1, withscores=True)]
@@ -1,21 +1,23 @@
 from django.views.decorators.csrf import csrf_exempt # type: ignore
-from rest_framework.decorators import api_view, permission_classes # type: ignore
+from rest_framework.decorators import action, api_view, permission_classes # type: ignore
 from rest_framework.views import APIView # type: ignore
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly # type: ignore
 from rest_framework import viewsets # type: ignore
 from .models import Aktualita, ContestEntry, BlogPost, Review, Game, BlogIndexPage, ReviewIndexPage, GameIndexPage, ProductIndexPage, HomePage, Comment, ArticleCategory
-from .serializers import AktualitaSerializer, ContestEntrySerializer, HomePageContentSerializer,UserProfileSerializer, ContactMessageSerializer, BlogPostSerializer, ReviewSerializer, GameSerializer, BlogIndexPageSerializer, ReviewIndexPageSerializer, GameIndexPageSerializer, ProductIndexPageSerializer, HomePageSerializer, CommentSerializer, ArticleCategorySerializer
-from django.http import JsonResponse # type: ignore
+from .serializers import AktualitaSerializer, ContestEntrySerializer, UserProfileSerializer, ContactMessageSerializer, BlogPostSerializer, ReviewSerializer, GameSerializer, GameCardSerializer, DESCRIPTION_PREVIEW_LENGTH, BlogIndexPageSerializer, ReviewIndexPageSerializer, GameIndexPageSerializer, ProductIndexPageSerializer, HomePageSerializer, CommentSerializer, ArticleCategorySerializer
+from django.http import Http404, HttpResponse, JsonResponse # type: ignore
+from django.db.models import Prefetch # type: ignore
+from django.db.models.functions import Left # type: ignore
 from rest_framework.response import Response # type: ignore
 from rest_framework import status # type: ignore
 from django.shortcuts import redirect # type: ignore
-from django.shortcuts import get_object_or_404 # type: ignore
-from django.utils import timezone # type: ignore
 import logging
-import requests
-from django.conf import settings
 
-import redis # type: ignore
+from . import active_users, autocomplete, catalogue, counters, homepage, metrics, pandascore, recommendations, search, search_stats, trending
+from .conditional import ConditionalGetMixin, conditional_response
+from .filters import QueryParamFilterMixin, PUBLISHED_FILTERS, parse_int, parse_int_list, query_param_list
+from .pagination import CreatedCursorPagination, PublishedCursorPagination
+from .response_cache import BLOGPOST_DEPENDENCIES, ESPORT_TAG, GAME_DEPENDENCIES, CachedResponseMixin, cached
 
 from wagtail.images.models import Image # type: ignore
 from rest_framework.decorators import api_view, permission_classes # type: ignore
@@ -26,6 +28,9 @@ from django.contrib.auth import get_user_model # type: ignore
 
 User = get_user_model()
 
+CATALOGUE_PAGE_SIZE = 24
+CATALOGUE_MAX_PAGE_SIZE = 100
+
 class ContestEntryAPI(APIView):
     def post(self, request):
         print("Přijatá data:", request.data)  # Debugging
@@ -37,32 +42,16 @@ class ContestEntryAPI(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-PANDASCORE_API_KEY = settings.PANDASCORE_API_KEY  
-
-def fetch_pandascore_data(endpoint):
-    url = f"https://api.pandascore.co/{endpoint}"
-    headers = {
-        "Authorization": f"Bearer {PANDASCORE_API_KEY}",
-        "Accept": "application/json"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
-
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def fetch_live_esports_matches(request):
-    data = fetch_pandascore_data("matches/running")
+    data = pandascore.fetch("matches/running")
     return JsonResponse(data, safe=False)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def fetch_recent_esports_results(request):
-    data = fetch_pandascore_data("matches/past")
+    data = pandascore.fetch("matches/past")
     return JsonResponse(data, safe=False)
 
 
@@ -82,32 +71,12 @@ def most_liked_article(request):
     """
     Returns the most liked article based on like_count.
     """
-    most_liked = BlogPost.objects.order_by('-like_count').first()
+    most_liked = homepage.get_section('most_liked_article')
 
     if not most_liked:
         return Response({'error': 'No articles found'}, status=status.HTTP_404_NOT_FOUND)
 
-    response_data = {
-        "id": most_liked.id,
-        "title": most_liked.title,
-        "slug": most_liked.slug,
-        "first_published_at": most_liked.first_published_at,
-        "like_count": most_liked.like_count,
-        "read_count":most_liked.read_count,
-        "main_image": {
-            "id": most_liked.main_image.id,
-            "url": most_liked.main_image.file.url
-        } if most_liked.main_image else None,
-        "owner": {
-            "id": most_liked.owner.id,
-            "username": most_liked.owner.username,
-            "first_name": most_liked.owner.first_name,
-            "last_name": most_liked.owner.last_name
-        } if most_liked.owner else None,
-        "categories": [{"id": cat.id, "name": cat.name} for cat in most_liked.categories.all()]
-    }
-
-    return Response(response_data, status=status.HTTP_200_OK)
+    return Response(most_liked, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -116,19 +85,7 @@ def upcoming_games(request):
     """
     Returns 3 games with the closest release date.
     """
-    upcoming_games = Game.objects.filter(release_date__gte=timezone.now()).order_by('release_date')[:3]
-    
-    game_data = []
-    for game in upcoming_games:
-        game_data.append({
-            "id": game.id,
-            "title": game.title,
-            "slug": game.slug,
-            "release_date": game.release_date,
-            "main_image": game.main_image.file.url if game.main_image else None,
-        })
-    
-    return Response(game_data, status=status.HTTP_200_OK)
+    return Response(homepage.get_section('upcoming_games'), status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -137,37 +94,50 @@ def latest_posts(request):
     """
     Returns the 10 latest published blog posts, including the owner's information, categories, and properly formatted main image.
     """
-    latest_posts = BlogPost.objects.live().select_related('owner', 'main_image').prefetch_related('categories').order_by('-first_published_at')[:5]
-    
-    post_data = []
-    for post in latest_posts:
-        owner_data = {
-            "id": post.owner.id if post.owner else None,
-            "username": post.owner.username if post.owner else "Unknown",
-            "first_name": post.owner.first_name if post.owner else "",
-            "last_name": post.owner.last_name if post.owner else ""
-        }
+    return Response(homepage.get_section('latest_posts'), status=status.HTTP_200_OK)
 
-        category_data = [{"id": category.id, "name": category.name} for category in post.categories.all()]
-
-        main_image_data = {
-            "id": post.main_image.id,
-            "url": post.main_image.file.url
-        } if post.main_image else None
-
-        post_data.append({
-            "id": post.id,
-            "title": post.title,
-            "slug": post.slug,
-            "intro": post.intro,
-            "read_count": post.read_count,
-            "first_published_at": post.first_published_at,
-            "main_image": main_image_data,  # Správně formátovaný hlavní obrázek
-            "owner": owner_data,  # Přidání ownera do odpovědi
-            "categories": category_data  # Přidání kategorií do odpovědi
-        })
-    
-    return Response(post_data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def homepage_bundle(request):
+    """
+    Returns all homepage sections in one response (see api/homepage.py).
+    """
+    return Response(homepage.get_bundle(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_content(request):
+    """
+    Full-text search across games, articles and reviews (see api/search.py).
+    ``?q=`` is the query, ``?type=game,article,review`` narrows the content
+    types and ``?limit=`` caps the number of results.
+    """
+    query = request.query_params.get('q', '').strip()
+    if len(query) < 2:
+        return Response({'error': 'Query must be at least 2 characters long'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = parse_int(request.query_params.get('limit', search.get_config()['LIMIT']))
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+    content_types = [content_type for content_type in query_param_list(request, 'type') if content_type in search.CONTENT_MODELS]
+    results = search.search(query, content_types, limit)
+    return Response([
+        {
+            'id': document.page_id,
+            'content_type': document.content_type,
+            'title': document.title,
+            'title_highlight': document.title_highlight,
+            'slug': document.page.slug,
+            'snippet': document.snippet,
+            'main_image': document.main_image.file.url if document.main_image else None,
+            'rank': document.rank,
+        }
+        for document in results
+    ], status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -183,123 +153,109 @@ def get_image_url(request, image_id):
         return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-# Connect to Redis
-r = redis.Redis(host='localhost', port=6379, db=1)
-
-def get_content_model(content_type):
-    if content_type == 'article':
-        return BlogPost
-    elif content_type == 'review':
-        return Review
-    else:
-        return None
-
 def get_top_most_read(request, content_type):
-    model = get_content_model(content_type)
-    if model is None:
+    if content_type not in homepage.CONTENT_MODELS:
         return JsonResponse({"error": "Invalid content type"}, status=400)
 
-    top_content = model.objects.all()
-
-    content_data = []
+    content_data = homepage.top_most_read(content_type)
+    counters.overlay_rows(homepage.CONTENT_MODELS[content_type], content_data)
+    return JsonResponse(content_data, safe=False)
 
-    for content in top_content:
-        key = f"active_users:{content_type}:{content.id}"
-        active_users = r.get(key)
-        active_users_count = int(active_users) if active_users else 0
-        
-        content_data.append({
-            'id': content.id,
-            'title': content.title,
-            'slug': content.slug,
-            'read_count': content.read_count,
-            'active_users': active_users_count,
-            'content_type': content_type,  # Add content_type to the response
 
-        })
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_trending(request):
+    """
+    Precomputed trending content (see api/trending.py). ``?type=article|review|game``
+    returns one list, without it all types; ``?limit=`` max 50.
+    """
+    content_types = query_param_list(request, 'type') or list(trending.CONTENT_MODELS)
+    if any(content_type not in trending.CONTENT_MODELS for content_type in content_types):
+        return Response({'error': 'Invalid content type'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(1, parse_int(request.query_params.get('limit', 10))), 50)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Seřadit obsah podle počtu aktivních uživatelů v sestupném pořadí
-    content_data_sorted = sorted(content_data, key=lambda x: x['active_users'], reverse=True)
+    data = {}
+    for content_type in content_types:
+        data[content_type] = counters.overlay_rows(
+            trending.CONTENT_MODELS[content_type], homepage.trending_items(content_type, limit)
+        )
+    if request.query_params.get('type') and len(content_types) == 1:
+        return Response(data[content_types[0]], status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_200_OK)
 
-    # Vrátit pouze tři záznamy s největším počtem aktivních uživatelů
-    top_three_content = content_data_sorted[:3]
 
-    return JsonResponse(top_three_content, safe=False)
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint (see api/metrics.py); 404 for clients without
+    the ``METRICS['TOKEN']`` bearer token or an address in ``ALLOWED_IPS``.
+    """
+    if not metrics.is_allowed(request):
+        raise Http404
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
 
 
 def get_active_users(request, content_type, content_id):
-    key = f"active_users:{content_type}:{content_id}"
-    active_users = r.get(key)
-    active_users_count = int(active_users) if active_users else 0
-    return JsonResponse({"active_users": active_users_count})
+    return JsonResponse({"active_users": active_users.get_count(content_type, content_id)})
 
+# Heartbeat – frontend volá pravidelně, dokud je stránka otevřená
 def increment_active_users(request, content_type, content_id):
-    key = f"active_users:{content_type}:{content_id}"
-    current_count = r.incr(key)
-    
-    # Zajistit, že hodnota je vždy alespoň 1 po zvýšení
-    if current_count is None or int(current_count) < 1:
-        r.set(key, 1)
-        current_count = 1
-    
-    return JsonResponse({"active_users": int(current_count)})
+    visitor_id = active_users.visitor_id_for(request)
+    return JsonResponse({"active_users": active_users.heartbeat(content_type, content_id, visitor_id)})
 
 def decrement_active_users(request, content_type, content_id):
-    key = f"active_users:{content_type}:{content_id}"
-    current_count = r.get(key)
-    
-    if current_count and int(current_count) > 0:
-        r.decr(key)
-    else:
-        r.set(key, 0)
-    
-    active_users = r.get(key)
-    return JsonResponse({"active_users": int(active_users)})
+    visitor_id = active_users.visitor_id_for(request)
+    return JsonResponse({"active_users": active_users.leave(content_type, content_id, visitor_id)})
 
 
 @csrf_exempt
 def increment_search_week(request, game_id):
-    if request.method == 'POST':
-        try:
-            game = Game.objects.get(pk=game_id)
-            logger.info(f"Found game: {game}")
-            game.search_week += 1
-            game.save()
-            logger.info(f"Successfully incremented search_week for game: {game_id}")
-            return JsonResponse({'status': 'success', 'search_week': game.search_week})
-        except Game.DoesNotExist:
-            logger.error(f"Game with id {game_id} does not exist.")
-            return JsonResponse({'status': 'error', 'message': 'Game not found'}, status=404)
-        except Exception as e:
-            logger.error(f"An error occurred: {e}")
-            return JsonResponse({'status': 'error', 'message': 'An internal error occurred'}, status=500)
-    return JsonResponse({'status': 'error', 'message': 'Invalid method'}, status=405)
+    """
+    Records one search of a game into the hourly buckets (see api/search_stats.py).
+    ``search_week`` in the response is the count over the last 7 days.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid method'}, status=405)
+    if not Game.objects.filter(pk=game_id, live=True).exists():
+        logger.error(f"Game with id {game_id} does not exist.")
+        return JsonResponse({'status': 'error', 'message': 'Game not found'}, status=404)
+    try:
+        counts = search_stats.record(game_id)
+    except Exception as e:
+        logger.error(f"Recording search of game {game_id} failed: {e}")
+        return JsonResponse({'status': 'error', 'message': 'An internal error occurred'}, status=500)
+    return JsonResponse({'status': 'success', 'search_week': counts['7d'], 'searches': counts})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def most_searched_games(request):
+    """
+    Most searched games in ``?window=24h|7d|30d`` (default 7d), ``?limit=`` max 50.
+    """
+    window = request.query_params.get('window', search_stats.DEFAULT_WINDOW)
+    if window not in search_stats.WINDOWS:
+        return Response({'error': f"Unknown window, use one of {', '.join(search_stats.WINDOWS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(1, parse_int(request.query_params.get('limit', 10))), 50)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(homepage.most_searched_games(window, limit), status=status.HTTP_200_OK)
+
 
 def most_searched_game_of_week(request):
     try:
-        most_searched_game = Game.objects.order_by('-search_week').first()
+        most_searched_game = homepage.get_section('most_searched_game')
         if most_searched_game:
-            main_image_url = None
-            if most_searched_game.main_image:
-                # Získáme URL k obrázku, včetně domény, pokud je dostupná
-                main_image_url = most_searched_game.main_image.get_rendition('original').url
-            
-            return JsonResponse({
-                'id': most_searched_game.id,
-                'title': most_searched_game.title,
-                'description': most_searched_game.description,
-                'slug': most_searched_game.slug,
-                'search_week': most_searched_game.search_week,
-                'main_image': {
-                    'url': main_image_url
-                },
-                'release_date': most_searched_game.release_date,
-            })
+            return JsonResponse(most_searched_game)
         return JsonResponse({'error': 'No games found'}, status=404)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-class AktualitaViewSet(viewsets.ModelViewSet):
+class AktualitaViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Aktualita.objects.filter(is_active=True)
     serializer_class = AktualitaSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -315,13 +271,13 @@ def increment_read_count(request, content_type, pk):
     }
 
     model = model_map.get(content_type)
-    if not model:
+    if not model or not counters.is_tracked(model, 'read_count'):
         return Response({'error': 'Invalid content type'}, status=400)
 
-    content_object = get_object_or_404(model, pk=pk)
-    content_object.read_count += 1
-    content_object.save()
-    return Response({'status': 'success', 'read_count': content_object.read_count})
+    read_count = bump_counter(model, pk, 'read_count')
+    if read_count is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'status': 'success', 'read_count': read_count})
 
 class ContactMessageView(APIView):
     def post(self, request, *args, **kwargs):
@@ -337,157 +293,250 @@ def esport_blogposts(request):
     """
     Vrací blogposty pouze s kategorií 'Esport'.
     """
-    try:
-        esport_category = ArticleCategory.objects.get(name__iexact="Esport")
-        blogposts = BlogPost.objects.live().filter(categories=esport_category).distinct().order_by('-first_published_at')
-        
-        serializer = BlogPostSerializer(blogposts, many=True, context={"request": request})
-        return Response(serializer.data, status=200)
-
-    except ArticleCategory.DoesNotExist:
-        return Response({"error": "Kategorie 'Esport' nebyla nalezena."}, status=404)
+    def build():
+        try:
+            esport_category = ArticleCategory.objects.get(name__iexact="Esport")
+            blogposts = BlogPostSerializer.setup_eager_loading(
+                BlogPost.objects.live().filter(categories=esport_category).distinct().order_by('-first_published_at')
+            )
+
+            serializer = BlogPostSerializer(blogposts, many=True, context={"request": request, "overlay_counters": False})
+            return Response(serializer.data, status=200)
+
+        except ArticleCategory.DoesNotExist:
+            return Response({"error": "Kategorie 'Esport' nebyla nalezena."}, status=404)
+
+    return cached(request, (ESPORT_TAG, *BLOGPOST_DEPENDENCIES), build, BlogPost)
     
-class BlogPostViewSet(viewsets.ModelViewSet):
-    queryset = BlogPost.objects.all()
+class BlogPostViewSet(ConditionalGetMixin, CachedResponseMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
+    queryset = BlogPostSerializer.setup_eager_loading(BlogPost.objects.live())
     serializer_class = BlogPostSerializer
+    cache_dependencies = BLOGPOST_DEPENDENCIES
+    pagination_class = PublishedCursorPagination
+    filter_params = {
+        'linked_game': ('linked_game_id', parse_int),
+        'categories': ('categories__in', parse_int_list),
+        'owner': ('owner_id', parse_int),
+        **PUBLISHED_FILTERS,
+    }
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.prefetch_related('attributes').all()
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """ Similar articles, precomputed by build_recommendations """
+        return related_response(BlogPost, pk)
+
+class ReviewViewSet(ConditionalGetMixin, CachedResponseMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
+    queryset = ReviewSerializer.setup_eager_loading(Review.objects.live())
     serializer_class = ReviewSerializer
+    pagination_class = PublishedCursorPagination
+    filter_params = {
+        'linked_game': ('linked_game_id', parse_int),
+        'owner': ('owner_id', parse_int),
+        'review_type': ('review_type', str),
+        **PUBLISHED_FILTERS,
+    }
 
 logger = logging.getLogger(__name__)
 
-@csrf_exempt
-def increment_search_week(request, game_id):
-    if request.method == 'POST':
-        try:
-            game = Game.objects.get(pk=game_id)
-            logger.info(f"Incrementing search_week for game: {game_id}")
-            game.search_week += 1
-            game.save()
-            return JsonResponse({'status': 'success', 'search_week': game.search_week})
-        except Game.DoesNotExist:
-            logger.error(f"Game with id {game_id} does not exist.")
-            return JsonResponse({'status': 'error', 'message': 'Game not found'}, status=404)
-    return JsonResponse({'status': 'error', 'message': 'Invalid method'}, status=405)
-6.
-class GameViewSet(viewsets.ModelViewSet):
-    queryset = Game.objects.prefetch_related('linked_blog_posts', 'linked_reviews').filter(live=True)
+class GameViewSet(ConditionalGetMixin, CachedResponseMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
+    """
+    Seznam vrací kompaktní karty her (GameCardSerializer) se začátkem popisu,
+    detail plný tvar. Vnořené relace a celý popis lze v seznamu vyžádat přes ?expand=linked_blog_posts,linked_reviews,description.
+    """
+    queryset = Game.objects.filter(live=True)
     serializer_class = GameSerializer
     lookup_field = 'pk'  # Změněno z 'slug' na 'pk'
+    pagination_class = PublishedCursorPagination
+    cache_dependencies = GAME_DEPENDENCIES + BLOGPOST_DEPENDENCIES  # detail obsahuje celé články
+    filter_params = PUBLISHED_FILTERS
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'catalogue'):
+            return GameCardSerializer
+        return GameSerializer
+
+    def get_queryset(self):
+        if self.action not in ('list', 'catalogue'):
+            return GameSerializer.setup_eager_loading(super().get_queryset())
+
+        queryset = super().get_queryset().select_related(
+            'developer', 'publisher', 'main_image'
+        ).prefetch_related('genres', 'platforms').annotate(
+            # O znak delší než náhled, aby serializer poznal zkrácený popis
+            description_start=Left('description', DESCRIPTION_PREVIEW_LENGTH + 1),
+        )
+        expand = query_param_list(self.request, 'expand')
+        if 'description' not in expand:
+            queryset = queryset.defer('description')  # největší sloupec, karta vrací jen náhled
+        linked = {'linked_blog_posts': BlogPostSerializer, 'linked_reviews': ReviewSerializer}
+        for name, serializer_class in linked.items():
+            model = serializer_class.Meta.model
+            if name in expand:
+                linked_queryset = serializer_class.setup_eager_loading(model.objects.all())
+            else:
+                # Karta potřebuje jen odkazy, nenačítáme celá těla článků
+                linked_queryset = model.objects.only('id', 'title', 'slug', 'linked_game')
+            queryset = queryset.prefetch_related(Prefetch(name, queryset=linked_queryset))
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """ Similar games, precomputed by build_recommendations """
+        return related_response(Game, pk)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Title suggestions for ?q= (see api/autocomplete.py), ranked by
+        search_week and like_count. Served from memory, no database query.
+        """
+        try:
+            limit = parse_int(request.query_params.get('limit', autocomplete.get_config()['LIMIT']))
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(autocomplete.suggest(request.query_params.get('q', ''), limit))
+
+    @action(detail=False, methods=['get'])
+    def catalogue(self, request):
+        """
+        Faceted catalogue (see api/catalogue.py): ?genre=1,2&platform=3
+        &developer=&publisher=&year=&year_from=&year_to=&offset=&limit=
+        returns matching game cards plus counts for every facet value.
+        """
+        try:
+            filters = {facet: parse_int_list(request.query_params.get(facet, '')) for facet in catalogue.FACETS}
+            year_from, year_to = (
+                parse_int(request.query_params[name]) if request.query_params.get(name) else None
+                for name in ('year_from', 'year_to')
+            )
+            offset = max(0, parse_int(request.query_params.get('offset', 0)))
+            limit = min(max(1, parse_int(request.query_params.get('limit', CATALOGUE_PAGE_SIZE))), CATALOGUE_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'Invalid filter value'}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            count, page, facets = catalogue.query(filters, year_from, year_to, offset, limit)
+            games = self.get_queryset().in_bulk(page)
+            results = self.get_serializer([games[pk] for pk in page if pk in games], many=True).data
+            return Response({'count': count, 'results': results, 'facets': facets})
+
+        return cached(request, self.list_cache_tags(), build, self.counter_model())
     
-class BlogIndexPageViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = BlogIndexPage.objects.all()
+class BlogIndexPageViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = BlogIndexPage.objects.select_related('main_image')
     serializer_class = BlogIndexPageSerializer
 
-class ReviewIndexPageViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ReviewIndexPage.objects.all()
+class ReviewIndexPageViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ReviewIndexPage.objects.select_related('main_image')
     serializer_class = ReviewIndexPageSerializer
 
-class GameIndexPageViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = GameIndexPage.objects.all()
+class GameIndexPageViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = GameIndexPage.objects.select_related('main_image')
     serializer_class = GameIndexPageSerializer
 
-class ProductIndexPageViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ProductIndexPage.objects.all()
+class ProductIndexPageViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ProductIndexPage.objects.select_related('main_image')
     serializer_class = ProductIndexPageSerializer
 
-class HomePageViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = HomePage.objects.all()
+class HomePageViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = HomePage.objects.select_related('main_image')
     serializer_class = HomePageSerializer
 
 class HomePageContentView(APIView):
     def get(self, request, *args, **kwargs):
-        homepage = HomePage.objects.live().first()
-        if homepage:
-            serializer = HomePageContentSerializer(homepage)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        version = HomePage.objects.live().values_list('live_revision_id', 'last_published_at').first() or (None, None)
+        return conditional_response(
+            request, self.build, version, ('api.homepage', 'api.partner'), version[1]
+        )
+
+    def build(self):
+        content = homepage.get_section('homepage_content')
+        if content:
+            return Response(content, status=status.HTTP_200_OK)
         return Response({"detail": "HomePage not found"}, status=status.HTTP_404_NOT_FOUND)
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedResponseMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.filter(is_approved=True)
     serializer_class = CommentSerializer
+    pagination_class = CreatedCursorPagination
+    filter_params = {
+        'page': ('page_id', parse_int),
+    }
 
-class ArticleCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ArticleCategoryViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ArticleCategory.objects.all()
     serializer_class = ArticleCategorySerializer
 
+def bump_counter(model, pk, field):
+    """
+    Records one increment through the write-behind counters and returns the
+    merged count, or None if the object does not exist. Only the counter
+    column is read; the page row is never saved here.
+    """
+    persisted = model.objects.filter(pk=pk).values_list(field, flat=True).first()
+    if persisted is None:
+        return None
+    return counters.increment(model, pk, field, persisted=persisted)
+
+def related_response(model, pk):
+    """
+    Recommendations of a live page; 404 for unknown or unpublished ids, so
+    they differ from a page without neighbours yet (``[]``).
+    """
+    try:
+        exists = model.objects.live().filter(pk=parse_int(pk)).exists()
+    except ValueError:
+        exists = False
+    if not exists:
+        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(recommendations.related(pk))
+
+def counter_response(model, pk, field):
+    count = bump_counter(model, pk, field)
+    if count is None:
+        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'status': 'success', field: count}, status=status.HTTP_200_OK)
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def like_article(request, pk):
-    try:
-        article = BlogPost.objects.get(pk=pk)
-        article.like_count += 1
-        article.save()
-        return Response({'status': 'success', 'like_count': article.like_count}, status=status.HTTP_200_OK)
-    except BlogPost.DoesNotExist:
-        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return counter_response(BlogPost, pk, 'like_count')
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def dislike_article(request, pk):
-    try:
-        article = BlogPost.objects.get(pk=pk)
-        article.dislike_count += 1
-        article.save()
-        return Response({'status': 'success', 'dislike_count': article.dislike_count}, status=status.HTTP_200_OK)
-    except BlogPost.DoesNotExist:
-        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return counter_response(BlogPost, pk, 'dislike_count')
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def like_review(request, pk):
-    try:
-        review = Review.objects.get(pk=pk)
-        review.like_count += 1
-        review.save()
-        return Response({'status': 'success', 'like_count': review.like_count}, status=status.HTTP_200_OK)
-    except Review.DoesNotExist:
-        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return counter_response(Review, pk, 'like_count')
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def dislike_review(request, pk):
-    try:
-        review = Review.objects.get(pk=pk)
-        review.dislike_count += 1
-        review.save()
-        return Response({'status': 'success', 'dislike_count': review.dislike_count}, status=status.HTTP_200_OK)
-    except Review.DoesNotExist:
-        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return counter_response(Review, pk, 'dislike_count')
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def like_game(request, pk):
-    try:
-        game = Game.objects.get(pk=pk)
-        game.like_count += 1
-        game.save()
-        return Response({'status': 'success', 'like_count': game.like_count}, status=status.HTTP_200_OK)
-    except Game.DoesNotExist:
-        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return counter_response(Game, pk, 'like_count')
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def dislike_game(request, pk):
-    try:
-        game = Game.objects.get(pk=pk)
-        game.dislike_count += 1
-        game.save()
-        return Response({'status': 'success', 'dislike_count': game.dislike_count}, status=status.HTTP_200_OK)
-    except Game.DoesNotExist:
-        return Response({'status': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
+    return counter_response(Game, pk, 'dislike_count')
     
 
 def home_redirect(request):
@@ -0,0 +1,131 @@
+"""
+Background WebP conversion of uploaded images.
+
+A newly uploaded image is stored untouched and its file name is queued in
+Redis once the upload transaction commits (``signals.py``). The ``convert_webp`` management
+command drains the queue: every image is encoded by a process pool straight
+into a temporary file next to the original (animated GIFs keep all frames),
+atomically renamed to ``<name>.webp`` and then swapped into the model fields
+listed in ``WEBP_CONVERT['REFERENCES']``. The original file stays on disk so
+already rendered HTML and renditions keep working.
+"""
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps # type: ignore
+from django.conf import settings # type: ignore
+from django.db import transaction # type: ignore
+from PIL import Image # type: ignore
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'webp:queue'
+
+
+def get_config():
+    return settings.WEBP_CONVERT
+
+
+def is_convertible(name):
+    ext = os.path.splitext(name)[1].lower().lstrip('.')
+    return get_config()['ENABLED'] and ext in get_config()['ORIGINAL_EXTENSION_TO_WEBP_CONVERT']
+
+
+def enqueue(name):
+    """
+    Queues ``name`` (storage-relative) after the current transaction commits,
+    so the worker never sees a file whose model row is not saved yet.
+    """
+    def push():
+        try:
+            get_redis().lpush(QUEUE_KEY, name)
+        except Exception as e:
+            # Originál zůstává, konverze jen neproběhne
+            logger.error(f"Queueing WebP conversion of {name} failed: {e}")
+    transaction.on_commit(push)
+
+
+def encode(source_path, target_path, quality):
+    """
+    Encodes one image in a pool process. Returns ``(bytes written, seconds)``.
+    """
+    started = time.perf_counter()
+    fd, temp_path = tempfile.mkstemp(suffix='.webp', dir=os.path.dirname(target_path))
+    try:
+        with os.fdopen(fd, 'wb') as output, Image.open(source_path) as img:
+            animated = getattr(img, 'is_animated', False)
+            img.save(output, format='WEBP', quality=quality, save_all=animated)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return os.path.getsize(target_path), time.perf_counter() - started
+
+
+def swap_references(name, webp_name, size):
+    """
+    Points every configured file field that still holds ``name`` to the WebP.
+    """
+    updated = 0
+    for label, field in get_config()['REFERENCES']:
+        model = apps.get_model(label)
+        values = {field: webp_name}
+        if any(f.name == 'file_size' for f in model._meta.fields):
+            values['file_size'] = size
+        updated += model.objects.filter(**{field: name}).update(**values)
+    return updated
+
+
+def convert_pending(storage, workers=None, batch_size=None):
+    """
+    Converts queued images until the queue is empty and returns a list of
+    ``(name, original size, webp size, seconds)`` for converted images.
+    """
+    client = get_redis()
+    workers = workers or get_config()['WORKERS']
+    batch_size = batch_size or workers * 4
+    quality = get_config()['QUALITY']
+    report = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            pipe = client.pipeline()
+            pipe.lrange(QUEUE_KEY, -batch_size, -1)  # nejstarší úlohy jsou na konci
+            pipe.ltrim(QUEUE_KEY, 0, -batch_size - 1)
+            names = [name.decode() for name in reversed(pipe.execute()[0])]
+            if not names:
+                return report
+
+            futures = {}
+            reserved = set()
+            for name in names:
+                if not storage.exists(name):
+                    logger.warning(f"WebP conversion skipped, {name} no longer exists")
+                    continue
+                root = os.path.splitext(name)[0]
+                webp_name = storage.get_available_name(root + '.webp')
+                while webp_name in reserved:  # foo.jpg a foo.png ve stejné dávce
+                    webp_name = storage.get_available_name(storage.get_alternative_name(root, '.webp'))
+                reserved.add(webp_name)
+                future = pool.submit(encode, storage.path(name), storage.path(webp_name), quality)
+                futures[future] = (name, webp_name)
+
+            for future in as_completed(futures):
+                name, webp_name = futures[future]
+                try:
+                    size, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"WebP conversion of {name} failed: {e}")
+                    continue
+                if not swap_references(name, webp_name, size):
+                    # Soubor mezitím nikdo nepoužívá – WebP by byl sirotek
+                    storage.delete(webp_name)
+                    continue
+                original_size = storage.size(name)
+                logger.info(f"WebP {name}: {original_size} -> {size} B in {seconds:.2f} s")
+                report.append((name, original_size, size, seconds))
@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'wagtail.contrib.forms',
     'wagtail.contrib.redirects',
     'wagtail.embeds',
@@ -47,6 +48,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Musí být první, aby měřil i ostatní middleware
+    'api.instrumentation.InstrumentationMiddleware',
+    # Před session middleware, aby i session četla z vybrané databáze
+    'api.db_routing.DatabaseRoutingMiddleware',
 
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -62,11 +67,36 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# Měření dotazů a času na request (api/instrumentation.py)
+INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,  # hlavička Server-Timing v odpovědích
+    'SLOW_REQUEST_MS': 1000,  # pomalejší requesty se logují s rozpadem času
+    'MAX_QUERIES': 50,  # stejně tak requesty s více SQL dotazy
+}
+
+# Benchmarky rout (api/benchmark.py, manage.py run_benchmarks)
+BENCHMARK = {
+    'BASELINE': os.path.join(BASE_DIR, 'benchmarks', 'baseline.json'),
+    'ITERATIONS': 10,
+    'LATENCY_TOLERANCE': 0.2,  # medián smí být o 20 % horší...
+    'LATENCY_SLACK_MS': 5,  # ...a zároveň o víc než 5 ms, jinak jde o šum
+    'PAYLOAD_TOLERANCE': 0.05,
+}
+
+# Prometheus /metrics (api/metrics.py); s více workery nastavit PROMETHEUS_MULTIPROC_DIR
+METRICS = {
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),  # Authorization: Bearer <token>; bez tokenu ani povolené IP vrací 404
+    'ALLOWED_IPS': [ip for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip],  # scraper bez tokenu
+}
+
 WEBP_CONVERT = {
     'ENABLED': True,
-    'FORCE_ON_REQUEST': True,
-    'ORIGINAL_EXTENSION_TO_WEBP_CONVERT': ['jpg', 'jpeg', 'png'],
+    'ORIGINAL_EXTENSION_TO_WEBP_CONVERT': ['jpg', 'jpeg', 'png', 'gif'],
     'QUALITY': 80,  # kvalita komprese
+    'WORKERS': int(os.getenv('WEBP_WORKERS', os.cpu_count() or 2)),  # procesy pro `manage.py convert_webp`
+    # Pole, která se po převodu přepnou na .webp (model label, pole)
+    'REFERENCES': [('wagtailimages.image', 'file')],
 }
 
 
@@ -103,6 +133,19 @@ CORS_ALLOWED_ORIGINS = [
 ]
 PANDASCORE_API_KEY = os.getenv('PANDASCORE_API_KEY', 'U_11M6DKn0NKcsfvC6APXT-tTe6uNBXf-SbfjSmoSr0svr520wg')
 
+# Proxy na PandaScore (api/pandascore.py) – TTL v sekundách podle endpointu
+PANDASCORE = {
+    'BASE_URL': os.getenv('PANDASCORE_BASE_URL', 'https://api.pandascore.co'),
+    'TIMEOUT': 5,
+    'POOL_SIZE': 10,
+    'TTL': {
+        'matches/running': 30,
+        'matches/past': 600,
+    },
+    'DEFAULT_TTL': 60,
+    'STALE_TTL': 60 * 60,  # jak dlouho smí být servírována stará data
+}
+
 CSRF_COOKIE_HTTPONLY = False
 CSRF_COOKIE_SAMESITE = None
 CSRF_COOKIE_SECURE = True  # True v produkci
@@ -140,11 +183,35 @@ DATABASES = {
         'NAME': 'development_db',
         'USER': 'admin',
         'PASSWORD': 'Hostinger123:',
-        'HOST': '185.170.196.118',
-        'PORT': '5432',
+        'HOST': os.getenv('DB_HOST', '185.170.196.118'),
+        'PORT': os.getenv('DB_PORT', '5432'),
+        # Spojení se drží mezi requesty (ušetří TCP + auth handshake na vzdálený server), před použitím se ověří
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        # Django 4.2 nemá vlastní pool; s více workery dát před Postgres PgBouncer (DB_HOST/DB_PORT na něj)
+        # a v transaction módu nastavit DB_DISABLE_SERVER_SIDE_CURSORS=1
+        'DISABLE_SERVER_SIDE_CURSORS': bool(os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS')),
     }
 }
 
+# Read replika (api/db_routing.py); bez DB_REPLICA_HOST jde všechno na primární databázi
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.db_routing.ReplicaRouter']
+
+DATABASE_ROUTING = {
+    'REPLICA': 'replica',  # alias z DATABASES; když chybí, router nic nedělá
+    'READ_PREFIXES': ('/api/', '/rss/', '/sitemap.xml'),  # jen GET/HEAD, zápisy vždy na primární
+    'PIN_COOKIE': 'db_primary',
+    'PIN_SECONDS': 5,  # po zápisu čte prohlížeč z primární databáze; musí být delší než zpoždění repliky
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -165,16 +232,70 @@ LOGGING = {
 }
 
 
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1')
+
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': 'redis://127.0.0.1:6379/1',  # Ensure the location is correct
+        'LOCATION': REDIS_URL,  # Ensure the location is correct
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
         }
     }
 }
 
+# Renditions, které vrací API a feedy – generují se předem (api/renditions.py)
+RENDITION_SPECS = {
+    'feed_enclosure': 'fill-800x450',
+    'original': 'original',
+}
+
+# Cache odpovědí REST API (api/response_cache.py), zneplatňuje se publikací
+RESPONSE_CACHE = {
+    'TIMEOUT': 10 * 60,
+}
+
+# Fulltextové vyhledávání /api/search/ (viz api/search.py)
+SEARCH = {
+    'CONFIG': 'czech_unaccent',  # textová konfigurace z migrace 0064
+    'LIMIT': 20,
+    'MAX_LIMIT': 50,
+    'TRIGRAM_WEIGHT': 0.5,  # váha podobnosti titulku vůči ts_rank
+    'SNIPPET_WORDS': 35,
+}
+
+# Našeptávač názvů her /api/games/autocomplete/ (viz api/autocomplete.py)
+AUTOCOMPLETE = {
+    'LIMIT': 8,
+    'MAX_LIMIT': 20,
+    'MAX_CANDIDATES': 500,  # kolik shod prefixu se nejvýš řadí
+    'SYNC_INTERVAL': 1,  # s, jak často worker kontroluje log změn v Redisu
+    'SCORE_REFRESH': 5 * 60,  # s, obnova search_week/like_count pro řazení
+    'MAX_CHANGES': 1000,  # délka logu změn
+}
+
+# Trendy /api/trending/ (viz api/trending.py, přepočet příkazem compute_trending)
+TRENDING = {
+    'HALF_LIFE_HOURS': 48,  # za kolik hodin klesne skóre na polovinu
+    'WEIGHTS': {'read': 1, 'like': 5, 'dislike': 3, 'active': 20},
+    'STORED': 200,  # kolik nejlepších položek se drží v Redisu
+    'INTERVAL': 5 * 60,  # s, pro compute_trending --watch
+}
+
+# Podobný obsah /api/games/<id>/related/, /api/posts/<id>/related/ (viz api/recommendations.py)
+RECOMMENDATIONS = {
+    'K': 6,  # počet doporučení na stránku
+    'CHUNK_SIZE': 512,  # řádků matice podobnosti najednou (paměť CHUNK_SIZE x počet stránek)
+    'GAME_WEIGHTS': {'genre': 1.0, 'platform': 0.5, 'developer': 1.5, 'publisher': 1.0},
+    'POST_WEIGHTS': {'category': 1.0, 'linked_game': 2.0, 'linked_game_genre': 0.5},
+}
+
+# Write-behind čítače like/dislike/read (viz api/counters.py)
+COUNTERS = {
+    'BACKEND': os.getenv('COUNTERS_BACKEND', 'redis'),  # 'redis' nebo 'local' (in-process náhrada)
+    'FLUSH_INTERVAL': 30,  # max. jeden dávkový zápis do DB za N sekund
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -1,13 +1,13 @@
 from django.contrib import admin # type: ignore
 from django.urls import path, include # type: ignore
 from rest_framework.routers import DefaultRouter # type: ignore
-from api.views import ( get_top_most_read, increment_search_week, most_searched_game_of_week, esport_blogposts,
+from api.views import ( get_top_most_read, get_trending, increment_search_week, most_searched_game_of_week, most_searched_games, esport_blogposts,
     increment_active_users, decrement_active_users, get_active_users,
     increment_read_count, ContactMessageView, HomePageContentView, get_user_profile,
     BlogPostViewSet, ReviewViewSet, GameViewSet, ContestEntryAPI, fetch_live_esports_matches, fetch_recent_esports_results,
-    BlogIndexPageViewSet, ReviewIndexPageViewSet, most_liked_article, upcoming_games, latest_posts, GameIndexPageViewSet, CommentViewSet,
+    BlogIndexPageViewSet, ReviewIndexPageViewSet, most_liked_article, upcoming_games, latest_posts, homepage_bundle, search_content, GameIndexPageViewSet, CommentViewSet,
     ProductIndexPageViewSet, HomePageViewSet, ArticleCategoryViewSet, AktualitaViewSet,
-    like_article, dislike_article, like_review, dislike_review, like_game, dislike_game, get_image_url
+    like_article, dislike_article, like_review, dislike_review, like_game, dislike_game, get_image_url, prometheus_metrics
 )
 
 from wagtail.contrib.sitemaps.views import sitemap # type: ignore
@@ -39,9 +39,11 @@ urlpatterns = [
     path('cms/', include('wagtail.admin.urls')),
     path('documents/', include('wagtail.documents.urls')),
     path('sitemap.xml', sitemap),
+    path('metrics', prometheus_metrics, name='metrics'),
     path('api/esport/matches/live/', fetch_live_esports_matches, name='live_esports_matches'),
     path('api/esport/matches/results/', fetch_recent_esports_results, name='recent_esports_results'),
     path('api/most-searched-game-week/', most_searched_game_of_week, name='most_searched_game_of_week'),
+    path('api/most-searched-games/', most_searched_games, name='most_searched_games'),
     path('api/upcoming-games/', upcoming_games, name='upcoming_games'),
     path('api/latest-posts/', latest_posts, name='latest_posts'),
     path('api/most-liked-article/', most_liked_article, name='most_liked_article'),
@@ -59,11 +61,14 @@ urlpatterns = [
     path('api/increment-read-count/<str:content_type>/<int:pk>/', increment_read_count, name='increment-read-count'),
     path('api/contact_message/', ContactMessageView.as_view(), name='contact_message'),
     path('api/homepage-content/', HomePageContentView.as_view(), name='homepage-content'),
+    path('api/homepage-bundle/', homepage_bundle, name='homepage_bundle'),
+    path('api/search/', search_content, name='search'),
     path('', home_redirect),
     path('api/active-users/<str:content_type>/<int:content_id>/', get_active_users, name='get_active_users'),
     path('api/increment-active-users/<str:content_type>/<int:content_id>/', increment_active_users, name='increment_active_users'),
     path('api/decrement-active-users/<str:content_type>/<int:content_id>/', decrement_active_users, name='decrement_active_users'),
     path('api/top-most-read/<str:content_type>/', get_top_most_read, name='top_most_read'),
+    path('api/trending/', get_trending, name='trending'),
     path('api/increment-search-week/<int:game_id>/', increment_search_week, name='increment_search_week'),
     path('api/get-image-url/<int:image_id>/', get_image_url, name='get_image_url'),
 
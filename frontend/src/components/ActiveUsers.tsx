@@ -4,6 +4,9 @@ import React, { useState, useEffect } from 'react';
 import { incrementActiveUsers, decrementActiveUsers } from '../services/api';
 import { ActiveUsersProps } from '../types';
 
+// Backend zapomíná návštěvníky po 90 s bez heartbeatu
+const HEARTBEAT_INTERVAL = 30000;
+
 const ActiveUsers: React.FC<ActiveUsersProps> = ({ contentType, contentId }) => {
   const [activeUsers, setActiveUsers] = useState(0);
   const [isClient, setIsClient] = useState(false);
@@ -39,11 +42,19 @@ const ActiveUsers: React.FC<ActiveUsersProps> = ({ contentType, contentId }) =>
 
     handleIncrementActiveUsers();
 
+    // Heartbeat jen u viditelné stránky, skrytá karta po TTL sama vypadne
+    const heartbeat = window.setInterval(() => {
+      if (document.visibilityState === 'visible') {
+        handleIncrementActiveUsers();
+      }
+    }, HEARTBEAT_INTERVAL);
+
     // Přidání události visibilitychange a beforeunload
     document.addEventListener('visibilitychange', handleVisibilityChange);
     window.addEventListener('beforeunload', handleDecrementActiveUsers);
 
     return () => {
+      window.clearInterval(heartbeat);
       document.removeEventListener('visibilitychange', handleVisibilityChange);
       window.removeEventListener('beforeunload', handleDecrementActiveUsers);
       handleDecrementActiveUsers();
@@ -32,10 +32,8 @@ const GameDetailModal: React.FC<GameDetailModalProps> = ({ isOpen, onClose, game
   const daysUntilRelease = releaseDate.diff(today, 'day');
 
   const maxLength = 200;
-  const truncatedDescription =
-    game.description.length > maxLength
-      ? game.description.substring(0, maxLength) + '...'
-      : game.description;
+  // Zkrácený popis posílá API (description_preview), delší než maxLength je jen se "..."
+  const truncatedDescription = game.description_preview ?? '';
 
   return (
     <div
@@ -71,7 +69,7 @@ const GameDetailModal: React.FC<GameDetailModalProps> = ({ isOpen, onClose, game
           <div
             dangerouslySetInnerHTML={{ __html: truncatedDescription }}
           />
-          {game.description.length > maxLength && (
+          {truncatedDescription.length > maxLength && (
             <a
               href={`/games/${game.slug}`}
               className="text-purple-700"
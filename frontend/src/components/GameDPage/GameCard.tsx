@@ -20,9 +20,8 @@ const platformIcons = {
 const GameCard: React.FC<{ game: Game; info?: boolean }> = ({ game, info = false }) => {
   const [isHovered, setIsHovered] = useState(false);
 
-  const truncatedDescription = game.description.length > 200 
-    ? `${game.description.substring(0, 200)}...` 
-    : game.description;
+  // Zkrácený popis posílá API (description_preview)
+  const truncatedDescription = game.description_preview ?? '';
 
     const platformGroups = (game.platforms || []).reduce<Record<string, string[]>>((acc, platform) => {
       if (['Windows', 'Linux', 'macOS'].includes(platform.name)) {
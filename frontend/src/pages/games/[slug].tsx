@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import Head from 'next/head';
 import { GetStaticPaths, GetStaticProps } from 'next';
-import { fetchGames, fetchArticlesByGameId, fetchReviewsByGameId, incrementSearchWeek } from '../../services/api';
+import { fetchGames, fetchGameById, fetchArticlesByGameId, fetchReviewsByGameId, incrementSearchWeek } from '../../services/api';
 import CommentShareLike from '../../components/CommentShareLike';
 import GameHeader from '../../components/GameDetailPage/GameHeader';
 import GameContent from '../../components/GameDetailPage/GameContent';
@@ -109,14 +109,17 @@ export const getStaticPaths: GetStaticPaths = async () => {
 export const getStaticProps: GetStaticProps = async ({ params }) => {
   try {
     const games: Game[] = await fetchGames();
-    const game = games.find((g: Game) => g.slug === params?.slug);
+    const gameCard = games.find((g: Game) => g.slug === params?.slug);
 
-    if (!game) {
+    if (!gameCard) {
       return {
         notFound: true,
       };
     }
 
+    // Seznam vrací jen kompaktní karty, plný tvar (enriched_description...) má detail
+    const game = (await fetchGameById(gameCard.id)) as unknown as Game;
+
     game.developer = game.developer || { name: 'Unknown Developer' };
     game.publisher = game.publisher || { name: 'Unknown Publisher' };
 
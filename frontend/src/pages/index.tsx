@@ -7,11 +7,7 @@ import SmallArticleCard from '../components/BlogPage/SmallArticleCard';
 import LoadingPlaceholder from '../components/LoadingPlaceholder';
 import {
   fetchHomePageSEO,
-  fetchAktuality,
-  fetchLatestArticles,
-  fetchMostLikedArticle,
-  fetchReviews,
-  fetchGamesHomepage,
+  fetchHomepageBundle,
 } from '../services/api';
 import { Article, Review } from '../types';
 import InstagramPhotos from '@/components/InstagramPhotos';
@@ -79,25 +75,17 @@ const HomePage = () => {
       }
   
       try {
-        const [
-          seo,
-          aktualityData,
-          latestArticles,
-          likedArticle,
-          reviewsData,
-          upcomingGamesData
-        ] = await Promise.all([
-          fetchHomePageSEO(),
-          fetchAktuality(),
-          fetchLatestArticles(),  // Nový endpoint
-          fetchMostLikedArticle(),
-          fetchReviews(),
-          fetchGamesHomepage(),  // Nový endpoint
-        ]);
+        const bundle = await fetchHomepageBundle();
+        const seo = bundle.seo || {};
+        const aktualityData = bundle.aktuality || [];
+        const latestArticles = bundle.latest_posts || [];
+        const likedArticle = bundle.most_liked_article;
+        const reviewsData = bundle.latest_reviews || [];
+        const upcomingGamesData = bundle.upcoming_games || [];
   
         // Nastavení dat
-        setSeoData(seo[0]);
-        localStorage.setItem('seoData', JSON.stringify(seo[0]));
+        setSeoData(seo);
+        localStorage.setItem('seoData', JSON.stringify(seo));
   
         const aktualityTexty = aktualityData.map((aktualita: { text: string }) => aktualita.text);
         setAktuality(aktualityTexty);
@@ -177,7 +165,7 @@ const HomePage = () => {
               <div className="bg-white p-4 h-full rounded-lg shadow-md">
               <h2 className="text-xl font-semibold mb-4 text-black">Nejnovější Recenze:</h2>
               <div className="space-y-4">
-                {reviews.slice().reverse().slice(0, 3).map((review) => (
+                {reviews.slice(0, 3).map((review) => (
                 <SmallReviewCard key={review.id} review={review} />
                 ))}
               </div>
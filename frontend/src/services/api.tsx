@@ -90,9 +90,12 @@ export const fetchReviews = async () => {
   }
 };
 
-export const fetchGames = async () => {
+// Seznam vrací kompaktní karty; popis a plné vazby jen přes expand (např. ['description'])
+export const fetchGames = async (expand: string[] = []) => {
   try {
-    const response = await axiosInstance.get('/games/');
+    const response = await axiosInstance.get('/games/', {
+      params: expand.length ? { expand: expand.join(',') } : undefined,
+    });
     return response.data;
   } catch (error) {
     console.error('Error fetching games:', error);
@@ -209,6 +212,17 @@ export const fetchHomePageSEO = async () => {
 };
 
 
+// Všechny sekce homepage jedním requestem (předpočítané na backendu)
+export const fetchHomepageBundle = async () => {
+  try {
+    const response = await axiosInstance.get('/homepage-bundle/');
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching homepage bundle:', error);
+    throw error;
+  }
+};
+
 export const fetchHomePageContent = async () => {
   try {
     const response = await axiosInstance.get('/homepage-content/');
@@ -351,9 +365,20 @@ export const incrementReadCount = async (contentType: string, id: number) => {
   return null;
 };
 
+// Náhodné id návštěvníka – backend podle něj počítá heartbeaty (presence s TTL)
+const getVisitorId = () => {
+  let visitorId = localStorage.getItem('visitor_id');
+  if (!visitorId) {
+    visitorId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    localStorage.setItem('visitor_id', visitorId);
+  }
+  return visitorId;
+};
+
 export const incrementActiveUsers = async (contentType: string, contentId: number) => {
   try {
     const response = await axios.post(`${API_URL}/increment-active-users/${contentType}/${contentId}/`, null, {
+      params: { visitor_id: getVisitorId() },
       withCredentials: false,  // Ensure credentials are sent with requests
     });
     return response.data.active_users;
@@ -367,6 +392,7 @@ export const incrementActiveUsers = async (contentType: string, contentId: numbe
 export const decrementActiveUsers = async (contentType: string, contentId: number) => {
   try {
     const response = await axios.post(`${API_URL}/decrement-active-users/${contentType}/${contentId}/`, null, {
+      params: { visitor_id: getVisitorId() },
       withCredentials: false,  // Ensure credentials are sent with requests
     });
     return response.data.active_users;
@@ -237,6 +237,7 @@ export interface BlogIndexProps {
     id: number;
     slug: string;
     description: string;
+    description_preview?: string; // Karty v seznamu (/api/games/) místo celého popisu
     title: string;
     seo_title?: string;
     search_description?: string;